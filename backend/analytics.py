@@ -0,0 +1,305 @@
+"""
+Activity analytics: task history rolled up server-side, so every chart on the
+analytics page is a small precomputed payload instead of a scan of the whole
+history on the phone.
+
+The rollup is a dense NumPy cube of counters:
+
+    cube[metric, subject, day]    metric: planned / done / done minutes
+
+Ingesting a history is a few vectorized np.add.at calls; a new completion is a
+single cell increment (add()). Charts are slices and sums over the last N days.
+The rollup round-trips through a sparse compact form (to_compact / from_compact)
+so clients or a store can keep it and send only new completions.
+"""
+from datetime import date, datetime
+
+import numpy as np
+
+from logging_setup import get_logger
+
+log = get_logger("ANALYTICS")
+
+ROLLUP_VERSION = 1
+PLANNED, DONE, MINUTES = range(3)
+# Heatmap intensity levels, same buckets as public/analytics.js: 0 | 1-2 | 3-4 | 5+
+LEVEL_EDGES = (1, 3, 5)
+# Window of the completion rates fed to StrictoBrain.get_performance_adjustment
+RATE_WINDOW_DAYS = 14
+# Client-supplied history is bounded: days kept before the request date (the longest
+# chart covers 151), one day after it for client time zones, and subjects per rollup
+WINDOW_DAYS = 366
+MAX_SPAN_DAYS = WINDOW_DAYS + 1
+MAX_SUBJECTS = 32
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+_MAX_ORDINAL = date.max.toordinal()
+
+
+def _day(value):
+    """date / datetime / 'YYYY-MM-DD[T...]' / ordinal -> proleptic ordinal."""
+    if value is None:
+        return date.today().toordinal()
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    if isinstance(value, str):
+        return datetime.strptime(value[:10], '%Y-%m-%d').toordinal()
+    return value.toordinal()
+
+
+def _minutes(task):
+    if task.get("minutes") is not None:
+        return int(task["minutes"])
+    try:
+        return int(round(float(str(task.get("duration", "0")).split()[0]) * 60))
+    except ValueError:
+        return 0
+
+
+def parse_history(tasks):
+    """
+    Task history (dashboard/Firestore records) -> columns.
+
+    A record is counted on its completion day ("completedAt", else "created") under
+    its "subject" (or dashboard "category"). Records without a date are skipped.
+
+    Returns:
+        (subjects, days, done, minutes): list of names + int64/bool/int64 arrays
+    """
+    subjects, stamps, done, minutes = [], [], [], []
+    for task in tasks:
+        stamp = task.get("completedAt") or task.get("created") or task.get("date")
+        subject = task.get("subject") or task.get("category")
+        if not stamp or not subject:
+            continue
+        subjects.append(subject)
+        stamps.append(str(stamp)[:10])
+        done.append(bool(task.get("completed")))
+        minutes.append(_minutes(task))
+    days = np.array(stamps, dtype="datetime64[D]").astype(np.int64) + _EPOCH_ORDINAL
+    return subjects, days, np.array(done, dtype=bool), np.array(minutes, dtype=np.int64)
+
+
+def window_mask(days, end):
+    """
+    Mask of the ordinals in `days` inside the WINDOW_DAYS ending on `end` (None = keep all).
+
+    Raises:
+        ValueError: a day later than the day after `end`
+    """
+    if end is None:
+        return np.ones(len(days), dtype=bool)
+    end = _day(end)
+    if len(days) and int(days.max()) > end + 1:
+        raise ValueError(f"activity dated after {date.fromordinal(end).isoformat()}")
+    return days > end - WINDOW_DAYS
+
+
+def intensity_levels(counts):
+    """Heatmap level (0-3) per count."""
+    return np.searchsorted(LEVEL_EDGES, counts, side="right").tolist()
+
+
+class ActivityRollup:
+    """
+    Per-subject daily counters (planned tasks, completed tasks, completed minutes).
+
+    Args:
+        normalize: subject name normalizer (e.g. brain_engine.normalize_subject)
+    """
+
+    def __init__(self, normalize=str):
+        self._normalize = normalize
+        self.subjects = []
+        self._codes = {}
+        self.base = None  # ordinal of column 0
+        self._cube = np.zeros((3, 0, 0), dtype=np.int64)
+        self._span = 0  # columns in use
+
+    def __len__(self):
+        """Days covered (first to last active day)."""
+        return self._span
+
+    def _code(self, subject):
+        subject = self._normalize(subject)
+        code = self._codes.get(subject)
+        if code is None:
+            if len(self.subjects) >= MAX_SUBJECTS:
+                raise ValueError(f"more than {MAX_SUBJECTS} subjects")
+            code = self._codes[subject] = len(self.subjects)
+            self.subjects.append(subject)
+        return code
+
+    def _reserve(self, first, last):
+        """
+        Grow the cube to hold every subject and days first..last (amortized doubling).
+
+        Raises:
+            ValueError: the rollup would span more than MAX_SPAN_DAYS
+        """
+        metrics, rows, capacity = self._cube.shape
+        base = first if self.base is None else self.base
+        shift = max(0, base - first)
+        need = max(self._span + shift, last - base + shift + 1)
+        if need > MAX_SPAN_DAYS:
+            raise ValueError(f"activity spans more than {MAX_SPAN_DAYS} days")
+        self.base = base
+        if len(self.subjects) > rows or need > capacity or shift:
+            grown = np.zeros((metrics, max(len(self.subjects), rows), max(need, capacity * 2 if need > capacity else capacity)), dtype=np.int64)
+            grown[:, :rows, shift:shift + self._span] = self._cube[:, :, :self._span]
+            self._cube = grown
+            self.base -= shift
+        self._span = need
+
+    def ingest(self, tasks, end=None):
+        """
+        Add a batch of task records (see parse_history). Returns the number counted.
+
+        Args:
+            end: request date; records older than the window before it are skipped,
+                later ones rejected (see window_mask). None = no window
+        """
+        names, days, done, minutes = parse_history(tasks)
+        keep = window_mask(days, end)
+        names = [name for name, kept in zip(names, keep) if kept]
+        days, done, minutes = days[keep], done[keep], minutes[keep]
+        if not names:
+            return 0
+        lookup = {name: self._code(name) for name in set(names)}
+        codes = np.fromiter((lookup[name] for name in names), dtype=np.int64, count=len(names))
+        self._reserve(int(days.min()), int(days.max()))
+        cols = days - self.base
+        np.add.at(self._cube[PLANNED], (codes, cols), 1)
+        np.add.at(self._cube[DONE], (codes[done], cols[done]), 1)
+        np.add.at(self._cube[MINUTES], (codes[done], cols[done]), minutes[done])
+        return len(names)
+
+    def add(self, subject, day=None, completed=True, minutes=0, planned=True):
+        """Incremental update: one task record (a completion by default) on `day`."""
+        code = self._code(subject)
+        ordinal = _day(day)
+        self._reserve(ordinal, ordinal)
+        col = ordinal - self.base
+        if planned:
+            self._cube[PLANNED, code, col] += 1
+        if completed:
+            self._cube[DONE, code, col] += 1
+            self._cube[MINUTES, code, col] += int(minutes)
+
+    def window(self, end=None, days=7):
+        """Counters for the `days` days ending on `end` (inclusive), zero-filled: (3, subjects, days)."""
+        end = _day(end)
+        out = np.zeros((3, len(self.subjects), days), dtype=np.int64)
+        if self.base is None:
+            return out
+        first = end - days + 1 - self.base
+        lo, hi = max(first, 0), min(first + days, self._span)
+        if lo < hi:
+            out[:, :, lo - first:hi - first] = self._cube[:, :len(self.subjects), lo:hi]
+        return out
+
+    # ============================================
+    # CHART PAYLOADS
+    # ============================================
+
+    def daily(self, end=None, days=7):
+        """Completed tasks per day, all subjects (weekly bar chart)."""
+        return self.window(end, days)[DONE].sum(axis=0).tolist()
+
+    def heatmaps(self, end=None, days=32):
+        """Per-subject daily completions with heatmap levels."""
+        done = self.window(end, days)[DONE]
+        return {
+            subject: {"counts": done[code].tolist(), "levels": intensity_levels(done[code])}
+            for code, subject in enumerate(self.subjects)
+        }
+
+    def matrix(self, end=None, days=151):
+        """All-subject daily completions with levels (activity matrix)."""
+        counts = self.window(end, days)[DONE].sum(axis=0)
+        return {"counts": counts.tolist(), "levels": intensity_levels(counts)}
+
+    def velocity(self, end=None, weeks=8):
+        """Completed tasks and minutes per 7-day bin (oldest first), plus the last-vs-previous bin change."""
+        cube = self.window(end, weeks * 7)
+        done = cube[DONE].sum(axis=0).reshape(weeks, 7).sum(axis=1)
+        minutes = cube[MINUTES].sum(axis=0).reshape(weeks, 7).sum(axis=1)
+        trend = int(done[-1] - done[-2]) if weeks > 1 else 0
+        return {"done": done.tolist(), "minutes": minutes.tolist(), "trend": trend}
+
+    def completion_rates(self, end=None, days=RATE_WINDOW_DAYS):
+        """
+        {subject: done / planned} over the last `days` days, for subjects with planned
+        tasks - the completionHistory shape get_performance_adjustment expects.
+        """
+        cube = self.window(end, days)
+        planned, done = cube[PLANNED].sum(axis=1), cube[DONE].sum(axis=1)
+        return {
+            subject: round(float(done[code] / planned[code]), 4)
+            for code, subject in enumerate(self.subjects) if planned[code]
+        }
+
+    def summary(self, end=None):
+        """Everything the analytics page draws, as of `end` (default today)."""
+        end = _day(end)
+        return {
+            "date": date.fromordinal(end).isoformat(),
+            "weekly": self.daily(end, 7),
+            "heatmaps": self.heatmaps(end, 32),
+            "matrix": self.matrix(end, 151),
+            "velocity": self.velocity(end, 8),
+            "completion_rates": self.completion_rates(end),
+        }
+
+    # ============================================
+    # COMPACT FORM
+    # ============================================
+
+    def to_compact(self):
+        """Sparse JSON-friendly form: one [subject, day offset, planned, done, minutes] row per active cell."""
+        if self.base is None:
+            return {"v": ROLLUP_VERSION, "base": 0, "subjects": [], "cells": []}
+        cube = self._cube[:, :len(self.subjects), :self._span]
+        codes, cols = np.nonzero(cube[PLANNED] | cube[DONE])
+        cells = np.stack([codes, cols, cube[PLANNED, codes, cols], cube[DONE, codes, cols], cube[MINUTES, codes, cols]], axis=1)
+        return {"v": ROLLUP_VERSION, "base": self.base, "subjects": list(self.subjects), "cells": cells.tolist()}
+
+    @classmethod
+    def from_compact(cls, data, normalize=str, end=None):
+        """
+        Rollup from to_compact() output, which clients send back: validated before any
+        cube is allocated.
+
+        Args:
+            end: request date, as for ingest()
+
+        Raises:
+            ValueError: unsupported version, malformed cells, a subject code outside
+                "subjects", days out of range, or the span / subject limits
+        """
+        rollup = cls(normalize)
+        if not data or not data.get("cells"):
+            return rollup
+        if data.get("v") != ROLLUP_VERSION:
+            raise ValueError(f"Unsupported rollup version: {data.get('v')}")
+        # Position in "subjects" -> code (names that normalize alike share one)
+        codes = np.array([rollup._code(subject) for subject in data["subjects"]], dtype=np.int64)
+        try:
+            cells = np.asarray(data["cells"], dtype=np.int64).reshape(-1, 5)
+        except OverflowError as e:
+            raise ValueError(f"rollup cell out of range: {e}") from e
+        if int(cells[:, 0].min()) < 0 or int(cells[:, 0].max()) >= len(codes):
+            raise ValueError("rollup cell names a subject outside \"subjects\"")
+        base = int(data["base"])
+        if not 0 < base <= _MAX_ORDINAL or int(cells[:, 1].min()) < -_MAX_ORDINAL or int(cells[:, 1].max()) > _MAX_ORDINAL:
+            raise ValueError("rollup dates out of range")
+        days = cells[:, 1] + base
+        keep = window_mask(days, end)
+        cells, days = cells[keep], days[keep]
+        if not len(cells):
+            return rollup
+        rollup._reserve(int(days.min()), int(days.max()))
+        rows, cols = codes[cells[:, 0]], days - rollup.base
+        for metric in (PLANNED, DONE, MINUTES):
+            np.add.at(rollup._cube[metric], (rows, cols), cells[:, 2 + metric])
+        return rollup
@@ -0,0 +1,452 @@
+"""
+ASGI serving mode: the /get-daily-task, /get-daily-plan and /get-calendar
+contracts of server.py on an event loop, plus batch planning on /get-daily-plans.
+
+    uvicorn asgi_app:create_asgi_app --factory --workers 4
+    gunicorn -k uvicorn.workers.UvicornWorker "asgi_app:create_asgi_app()"
+
+A sync worker is held for the whole request, including the seconds a mobile
+client takes to upload its body; here a waiting connection costs one coroutine.
+A day's tasks take microseconds and are planned inline on the loop. Calendars and
+batches take milliseconds and run in a bounded process pool so they never stall
+it; each pool process builds a brain per exam syllabus version on first use.
+Syllabus loads and progress-store lookups block, so they run on the loop's thread pool.
+Bodies pick their exam with "exam", as on the Flask app.
+
+Admission control, checked before any work is done:
+    ASGI_MAX_IN_FLIGHT   requests in progress on this worker   -> 503 + Retry-After
+    ASGI_POOL_QUEUE      pool jobs queued or running           -> 503 + Retry-After
+    ASGI_MAX_BODY        request body bytes                    -> 413
+    ASGI_BODY_TIMEOUT    seconds to receive the body           -> 408
+
+Config, syllabus registry, response cache and progress store come from
+server.create_app(), so both modes read the same keys and env vars. /complete-task,
+/analytics, /topics/search, profiling and the admin endpoints stay on the Flask app.
+Responses are encoded with orjson when it is installed (compact stdlib json otherwise).
+"""
+import asyncio
+import json
+import logging
+import multiprocessing
+import time
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+
+try:
+    import orjson
+except ImportError:  # optional: compact stdlib json instead
+    orjson = None
+
+import metrics
+from brain_engine import StrictoBrain
+from bulk_plans import _plan_chunk
+from logging_setup import ROOT_LOGGER, configure_logging, get_logger
+from metrics import REQUEST_SECONDS, stage
+from server import (SyllabusUnavailable, calendar_lines, calendar_range, create_app, daily_plan, daily_task, init_snapshot,
+                    wants_compact)
+from shared_index import MappedTopicIndex
+from syllabus_loader import load_syllabus
+from tasks import plan_to_wire
+
+log = get_logger("ASGI")
+
+# (status, body bytes, content type, extra headers)
+Reply = namedtuple("Reply", ["status", "body", "content_type", "headers"], defaults=("application/json", ()))
+
+RETRY_AFTER = (b"retry-after", b"1")
+CORS_HEADERS = [(b"access-control-allow-origin", b"*"), (b"access-control-expose-headers", b"ETag")]
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message, headers=()):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers
+
+
+class ClientGone(Exception):
+    """The client disconnected before its request body arrived."""
+
+
+def dumps(obj):
+    """Compact UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def loads(body):
+    return orjson.loads(body) if orjson is not None else json.loads(body)
+
+
+def json_reply(obj, status=200, headers=()):
+    with stage("encode"):
+        return Reply(status, dumps(obj), "application/json", headers)
+
+
+def etag_matches(if_none_match, etag):
+    """If-None-Match header (bytes or None) lists `etag` (or is "*")."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.decode("latin-1").split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/").strip('"') == etag:
+            return True
+    return False
+
+
+# ==========================================
+# PROCESS POOL (calendar / batch work)
+# ==========================================
+
+# Per-process brains by syllabus version, loaded on first use (a pool serves every exam)
+_WORKER_BRAINS = OrderedDict()
+WORKER_BRAINS_KEPT = 4
+
+
+def _init_worker(log_level):
+    # Spawned workers do not inherit the parent's logging setup
+    configure_logging({"level": log_level})
+
+
+def _worker_brain(source):
+    """
+    Brain for source = (version, syllabus_dir, subjects, shared index or None): over the
+    shared index mapping when the parent uses one, else from the binary syllabus cache.
+    """
+    version, syllabus_dir, subjects, shared = source
+    brain = _WORKER_BRAINS.get(version)
+    if brain is None:
+        brain = _WORKER_BRAINS[version] = StrictoBrain(shared if shared is not None else load_syllabus(syllabus_dir, subjects))
+        while len(_WORKER_BRAINS) > WORKER_BRAINS_KEPT:
+            _WORKER_BRAINS.popitem(last=False)
+    _WORKER_BRAINS.move_to_end(version)
+    return brain
+
+
+def _calendar_body(source, profile, start, end, brain=None):
+    return "".join(calendar_lines(brain or _worker_brain(source), profile, start, end)).encode("utf-8")
+
+
+def _plan_batch(source, profiles, today, brain=None):
+    plans = _plan_chunk(profiles, today, brain or _worker_brain(source))
+    return [plan_to_wire(plan, wants_compact(profile)) for profile, plan in zip(profiles, plans)]
+
+
+class PlanPool:
+    """
+    Bounded process pool for the millisecond-scale endpoints.
+
+    Args:
+        workers: processes (0 = run jobs inline on the event loop, for tests / tiny deployments)
+        max_pending: jobs queued or running before admit() refuses more
+    """
+
+    def __init__(self, workers, max_pending):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self._pool = None
+
+    def admit(self, jobs=1):
+        """Refuse early: HTTPError(503) when `jobs` more would exceed max_pending."""
+        if self.pending + jobs > self.max_pending:
+            raise HTTPError(503, "Server busy, retry shortly", [RETRY_AFTER])
+
+    def _executor(self):
+        if self._pool is None:
+            log_level = logging.getLogger(ROOT_LOGGER).getEffectiveLevel()
+            # spawn: forking a process that runs threads (event loop, syllabus watcher) can deadlock
+            self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"),
+                                             initializer=_init_worker, initargs=(log_level,))
+            log.info("Plan pool: %d processes", self.workers)
+        return self._pool
+
+    def submit(self, registry, snapshot, fn, *args):
+        """
+        Future of fn(source, *args) in a pool process, where source names `snapshot` of
+        `registry` so the worker builds (once) the same brain (call admit() first).
+        """
+        loop = asyncio.get_running_loop()
+        shared = snapshot.task_db if isinstance(snapshot.task_db, MappedTopicIndex) else None  # pickles as its path
+        source = (snapshot.version, registry.syllabus_dir, registry.subjects, shared)
+        self.pending += 1
+        if self.workers <= 0:
+            future = loop.create_future()
+            try:
+                future.set_result(fn(source, *args, brain=snapshot.brain))
+            except Exception as e:
+                future.set_exception(e)
+        else:
+            future = loop.run_in_executor(self._executor(), fn, source, *args)
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, future):
+        self.pending -= 1
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+# ==========================================
+# ASGI APPLICATION
+# ==========================================
+
+class StrictoASGI:
+    """ASGI 3 application over the state of a server.create_app() Flask app."""
+
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        self.config = flask_app.config
+        self.exams = flask_app.extensions["stricto_exams"]
+        self.cache = flask_app.extensions["stricto_cache"]
+        self.store = flask_app.extensions["stricto_store"]
+        self.pool = PlanPool(self.config["ASGI_POOL_WORKERS"], self.config["ASGI_POOL_QUEUE"])
+        self.in_flight = 0
+        self.rejected = 0
+        # path -> (metrics endpoint label, handler); all POST with a JSON object body
+        self.routes = {
+            "/get-daily-task": ("stricto.get_task", self.get_task),
+            "/get-daily-plan": ("stricto.get_plan", self.get_plan),
+            "/get-daily-plans": ("stricto.get_plans", self.get_plans),
+            "/get-calendar": ("stricto.get_calendar", self.get_calendar),
+        }
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self.lifespan(receive, send)
+        elif scope["type"] == "http":
+            await self.http(scope, receive, send)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await self.shard({})  # load the default exam now rather than on the first request
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self.close()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    def close(self):
+        self.pool.shutdown()
+        self.exams.stop()
+        if self.store is not None:
+            self.store.close()
+
+    def blocking(self, fn, *args):
+        """Future of fn(*args) on the loop's thread pool: syllabus loads and SQLite lookups never run on the loop."""
+        return asyncio.get_running_loop().run_in_executor(None, fn, *args)
+
+    async def shard(self, payload):
+        """
+        (SyllabusRegistry, snapshot) of the exam a body names (default exam when none),
+        loaded off the loop on first use; the caller pins the snapshot for the whole request.
+        Raises HTTPError(400) for unknown exams, HTTPError(503) when the syllabus fails to load.
+        """
+        exam = payload.get('exam')
+        try:
+            registry = self.exams.shard(exam)
+        except KeyError:
+            raise HTTPError(400, f"Unknown exam: {exam}") from None
+        # Pinned here: an eviction by another exam's load must not pull it from under us
+        try:
+            return registry, registry.snapshot or await self.blocking(init_snapshot, self.flask_app, exam)
+        except SyllabusUnavailable as e:
+            raise HTTPError(503, str(e)) from None
+
+    def stored(self, payload):
+        """True when the body's state lives in the progress store (such requests are not cached)."""
+        return self.store is not None and 'userId' in payload
+
+    async def with_stored_states(self, payloads):
+        """Bodies with the stored state of their "userId" filled in, looked up off the loop."""
+        if not any(self.stored(payload) for payload in payloads):
+            return payloads
+        return await self.blocking(lambda: [self.store.merge_profile(payload) for payload in payloads])
+
+    async def http(self, scope, receive, send):
+        started = time.perf_counter()
+        method, route = scope["method"], self.routes.get(scope["path"])
+        if method == "OPTIONS" and route is not None:
+            # CORS preflight (the Flask app answers these through flask-cors)
+            headers = dict(scope["headers"])
+            await self.send_reply(send, Reply(204, b"", "text/plain", [
+                (b"access-control-allow-methods", b"POST, OPTIONS"),
+                (b"access-control-allow-headers", headers.get(b"access-control-request-headers", b"*")),
+                (b"access-control-max-age", b"600"),
+            ]))
+            return
+        if route is None:
+            await self.send_reply(send, json_reply({"error": "Not found"}, 404))
+            return
+        if method != "POST":
+            await self.send_reply(send, json_reply({"error": "Method not allowed"}, 405, [(b"allow", b"POST, OPTIONS")]))
+            return
+        if self.in_flight >= self.config["ASGI_MAX_IN_FLIGHT"]:
+            self.rejected += 1
+            await self.send_reply(send, json_reply({"error": "Server busy, retry shortly"}, 503, [RETRY_AFTER]))
+            return
+
+        endpoint, handler = route
+        self.in_flight += 1
+        try:
+            try:
+                reply = await handler(await self.read_json(receive), dict(scope["headers"]))
+            except HTTPError as e:
+                if RETRY_AFTER in e.headers:  # admission control, not a failed syllabus load
+                    self.rejected += 1
+                reply = json_reply({"error": str(e)}, e.status, e.headers)
+            except ClientGone:
+                return
+            except Exception as e:
+                log.exception("%s failed: %s", endpoint, e)
+                reply = json_reply({"error": str(e)}, 500)
+            await self.send_reply(send, reply)
+        finally:
+            self.in_flight -= 1
+            if metrics.enabled():
+                REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint)
+
+    async def read_json(self, receive):
+        """The request body as a JSON object (empty body = {})."""
+        async def read_body():
+            chunks, size = [], 0
+            while True:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    raise ClientGone()
+                chunk = message.get("body", b"")
+                size += len(chunk)
+                if size > self.config["ASGI_MAX_BODY"]:
+                    raise HTTPError(413, f"Body over {self.config['ASGI_MAX_BODY']} bytes")
+                chunks.append(chunk)
+                if not message.get("more_body"):
+                    return b"".join(chunks)
+
+        try:
+            body = await asyncio.wait_for(read_body(), self.config["ASGI_BODY_TIMEOUT"])
+        except asyncio.TimeoutError:
+            raise HTTPError(408, "Request body not received in time") from None
+        try:
+            payload = loads(body) if body.strip() else {}
+        except ValueError as e:
+            raise HTTPError(400, f"Invalid JSON body: {e}") from None
+        if not isinstance(payload, dict):
+            raise HTTPError(400, "Body must be a JSON object")
+        return payload
+
+    async def send_reply(self, send, reply):
+        headers = [(b"content-type", reply.content_type.encode()), (b"content-length", str(len(reply.body)).encode())]
+        await send({"type": "http.response.start", "status": reply.status, "headers": headers + CORS_HEADERS + list(reply.headers)})
+        await send({"type": "http.response.body", "body": reply.body})
+
+    def cached(self, payload, headers, snapshot, render):
+        """Reply for render() through the response cache (same rules as server.cached_response)."""
+        if self.cache is None or snapshot is None or self.stored(payload):
+            return json_reply(render())
+
+        key = self.cache.key(payload, snapshot.version)
+        entry = self.cache.get(key)
+        if entry is None:
+            body = render()
+            reply = json_reply(body)
+            if 'error' in body:
+                return reply
+            entry = self.cache.put(key, reply.body, reply.content_type)
+
+        etag = [(b"etag", f'"{entry.etag}"'.encode()), (b"cache-control", b"private, no-cache")]
+        if etag_matches(headers.get(b"if-none-match"), entry.etag):
+            self.cache.not_modified += 1
+            return Reply(304, b"", entry.mimetype, etag)
+        return Reply(200, entry.body, entry.mimetype, etag)
+
+    # --- ENDPOINTS ---
+
+    async def get_task(self, payload, headers):
+        _, snapshot = await self.shard(payload)
+        brain = snapshot.brain if snapshot else None
+        if self.stored(payload):
+            return json_reply(await self.blocking(daily_task, brain, payload, self.store))
+        return self.cached(payload, headers, snapshot, lambda: daily_task(brain, payload))
+
+    async def get_plan(self, payload, headers):
+        _, snapshot = await self.shard(payload)
+        brain = snapshot.brain if snapshot else None
+        if self.stored(payload):
+            [profile] = await self.with_stored_states([payload])
+            return json_reply(daily_plan(brain, profile))
+        return self.cached(payload, headers, snapshot, lambda: daily_plan(brain, payload))
+
+    async def get_calendar(self, payload, headers):
+        """Whole calendar as one NDJSON body, built in the pool (see server.get_calendar)."""
+        registry, snapshot = await self.shard(payload)
+        if snapshot is None:
+            return json_reply({"error": "Brain not initialized."})
+        [profile] = await self.with_stored_states([payload])
+        try:
+            start, end = calendar_range(profile, self.config["CALENDAR_MAX_DAYS"])
+        except ValueError as e:
+            return json_reply({"error": str(e)}, 400)
+        self.pool.admit()
+        body = await self.pool.submit(registry, snapshot, _calendar_body, profile, start, end)
+        return Reply(200, body, "application/x-ndjson")
+
+    async def get_plans(self, payload, headers):
+        """
+        Batch of /get-daily-plan profiles: {"profiles": [...]} -> {"plans": [...]} in input
+        order, split across the pool; a failing profile gets {"error"} in its slot.
+        Each profile's "exam" defaults to the batch's.
+        """
+        profiles = payload.get('profiles')
+        if not isinstance(profiles, list) or not all(isinstance(p, dict) for p in profiles):
+            return json_reply({"error": '"profiles" must be a list of objects'}, 400)
+        if len(profiles) > self.config["ASGI_MAX_BATCH"]:
+            return json_reply({"error": f"Batch too large: {len(profiles)} profiles (max {self.config['ASGI_MAX_BATCH']})"}, 413)
+        merged = await self.with_stored_states(profiles)
+        by_exam = {}
+        for i, profile in enumerate(profiles):
+            by_exam.setdefault(profile.get('exam', payload.get('exam')), []).append(i)
+
+        # Every shard resolved and every chunk admitted before any work is queued
+        size = -(-len(profiles) // max(self.pool.workers, 1)) or 1
+        jobs = []
+        for exam, indices in by_exam.items():
+            registry, snapshot = await self.shard({"exam": exam})
+            if snapshot is None:
+                return json_reply({"error": "Brain not initialized."})
+            jobs += [(registry, snapshot, indices[i:i + size]) for i in range(0, len(indices), size)]
+        self.pool.admit(len(jobs))
+
+        today = date.today()
+        results = await asyncio.gather(*(
+            self.pool.submit(registry, snapshot, _plan_batch, [merged[i] for i in indices], today)
+            for registry, snapshot, indices in jobs))
+        plans = [None] * len(profiles)
+        for (_, _, indices), chunk in zip(jobs, results):
+            for i, plan in zip(indices, chunk):
+                plans[i] = plan
+        return json_reply({"plans": plans})
+
+
+def create_asgi_app(config=None):
+    """
+    Build the ASGI app.
+
+    Args:
+        config: dict overriding server.DEFAULT_CONFIG (ASGI_* keys included)
+
+    Returns:
+        StrictoASGI; the Flask app holding its shared state is .flask_app
+    """
+    return StrictoASGI(create_app(config))
+
+
+if __name__ == '__main__':
+    import uvicorn  # optional: only needed to serve the ASGI mode
+    uvicorn.run("asgi_app:create_asgi_app", factory=True, port=5000)
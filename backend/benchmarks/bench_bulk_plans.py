@@ -0,0 +1,60 @@
+"""
+Benchmark: cohort plan generation throughput (profiles/minute).
+
+Usage:
+    python benchmarks/bench_bulk_plans.py [--profiles 20000] [--workers N]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from brain_engine import StrictoBrain  # noqa: E402
+from logging_setup import configure_logging  # noqa: E402
+from syllabus_loader import load_syllabus  # noqa: E402
+
+SUBJECTS = ("MATH", "REASONING", "ENGLISH", "GA")
+
+
+def make_profiles(count, today, seed=7):
+    rng = random.Random(seed)
+    for user in range(count):
+        yield {
+            "userId": f"u{user}",
+            "levels": {s: rng.choice(("weak", "average", "strong")) for s in SUBJECTS},
+            "examStage": rng.choice(("Prelims", "Mains")),
+            "examDate": (today + timedelta(days=rng.randint(5, 360))).isoformat(),
+            "userType": rng.choice(("beginner", "repeater")),
+            "syllabusCompleted": rng.randint(0, 100),
+            "dailyHours": rng.randint(2, 10),
+            "topicProgress": {"Math": rng.randint(0, 150), "English": rng.randint(0, 100)},
+            "completionHistory": {"Math": rng.random(), "Reasoning": rng.random()},
+        }
+
+
+def run(brain, count, workers, today):
+    started = time.perf_counter()
+    plans = sum(1 for _ in brain.generate_plans_bulk(make_profiles(count, today), today, workers))
+    elapsed = time.perf_counter() - started
+    print(f"    workers={workers:<3} {plans} plans in {elapsed:6.2f}s  -> {plans / elapsed * 60:12,.0f} profiles/min")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--profiles", type=int, default=20000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    configure_logging({"level": "WARNING"})
+    brain = StrictoBrain(load_syllabus())
+
+    today = date.today()
+    print(f"[bulk] {args.profiles} synthetic profiles")
+    run(brain, args.profiles, 1, today)
+    if args.workers > 1:
+        run(brain, args.profiles, args.workers, today)
@@ -0,0 +1,53 @@
+"""
+Benchmark: whole-horizon calendar (generate_calendar) vs one generate_plan call per day.
+
+Usage:
+    python benchmarks/bench_calendar.py [--days 300] [--runs 5]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from brain_engine import StrictoBrain  # noqa: E402
+from syllabus_loader import load_syllabus  # noqa: E402
+
+START = date(2025, 1, 10)
+
+
+def best_of(runs, fn):
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return min(samples), statistics.median(samples)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--days", type=int, default=300)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    brain = StrictoBrain(load_syllabus())
+    profile = {
+        "levels": {"Math": "weak", "English": "strong", "Reasoning": "average", "GA": "weak"},
+        "examDate": (START + timedelta(days=args.days)).isoformat(), "userType": "beginner",
+    }
+
+    def calendar():
+        return list(brain.generate_calendar(profile, START))
+
+    def per_day():
+        # Stateless: no topic pointer / reviews carried forward, just the call cost
+        return [brain.generate_plan(profile, START + timedelta(days=i)) for i in range(args.days)]
+
+    for label, fn in (("generate_calendar", calendar), ("generate_plan x days", per_day)):
+        best, median = best_of(args.runs, fn)
+        print(f"[calendar] {label:<22} {args.days} days x 4 subjects: best {best * 1000:7.1f} ms  median {median * 1000:7.1f} ms")
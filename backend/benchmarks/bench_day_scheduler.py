@@ -0,0 +1,69 @@
+"""
+Benchmark: pack_day cost per profile, and how far the legacy 10-task cap lands
+from the student's dailyHours budget.
+
+Usage:
+    python benchmarks/bench_day_scheduler.py [--profiles 2000]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import date
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from brain_engine import DEFAULT_SUBJECTS, MAX_TASKS_LIMIT, StrictoBrain  # noqa: E402
+from day_scheduler import pack_day  # noqa: E402
+from syllabus_loader import load_syllabus  # noqa: E402
+
+TODAY = date(2025, 1, 10)
+
+
+def random_profile(rng):
+    return {
+        "levels": {s: rng.choice(["weak", "average", "strong"]) for s in DEFAULT_SUBJECTS},
+        "examDate": rng.choice(["2025-01-25", "2025-03-01", "2025-06-15", "2025-12-01"]),
+        "examStage": rng.choice(["Prelims", "Prelims", "Mains"]),
+        "userType": rng.choice(["beginner", "repeater"]),
+        "syllabusCompleted": rng.randrange(0, 101, 10),
+        "dailyHours": rng.randrange(2, 13),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--profiles", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    brain = StrictoBrain(load_syllabus())
+    rng = random.Random(args.seed)
+    profiles = [random_profile(rng) for _ in range(args.profiles)]
+
+    # Candidate tasks per profile: the legacy plan before the cross-subject cap
+    candidates, legacy_gap = [], []
+    for profile in profiles:
+        plan = brain.generate_plan(dict(profile, schedule="packed"), TODAY)
+        legacy = brain.generate_plan(profile, TODAY)
+        budget = profile["dailyHours"] * 60
+        legacy_gap.append(abs(sum(t.minutes for t in legacy["tasks"]) - budget))
+        tasks = []
+        for subject in DEFAULT_SUBJECTS:
+            tasks.extend(brain.generate_task(
+                subject, profile["levels"][subject], profile["examStage"], plan["days_left"],
+                profile["userType"], profile["syllabusCompleted"], profile["dailyHours"], {}, {}, None, TODAY,
+            ))
+        candidates.append((tasks, budget))
+
+    started = time.perf_counter()
+    packed = [pack_day(tasks, budget, MAX_TASKS_LIMIT) for tasks, budget in candidates]
+    elapsed = time.perf_counter() - started
+
+    print(f"[pack_day] {args.profiles} profiles, {statistics.mean(len(t) for t, _ in candidates):.1f} candidates avg")
+    print(f"    {elapsed / args.profiles * 1e6:8.1f} us/profile")
+    print(f"    budget gap  legacy cap: median {statistics.median(legacy_gap):.0f} min, max {max(legacy_gap)} min")
+    print(f"    budget gap  packed:     median {statistics.median(p.slack for p in packed):.0f} min, max {max(p.slack for p in packed)} min")
@@ -0,0 +1,72 @@
+"""
+Benchmark: /get-daily-task latency (p50/p99) under different logging setups.
+
+"DEBUG text" emits every line the old print() calls did, so it stands in for the
+pre-logging behaviour; INFO/WARNING are the production settings.
+
+Usage:
+    python benchmarks/bench_logging.py [--requests 3000] [--sink devnull|stdout]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+SETUPS = (
+    ("DEBUG text (old print path)", {"level": "DEBUG"}),
+    ("INFO text", {"level": "INFO"}),
+    ("INFO json, 1% sampled", {"level": "INFO", "format": "json", "sample": 0.01}),
+    ("WARNING text", {"level": "WARNING"}),
+)
+
+PAYLOAD = {
+    "subject": "MATH", "level": "weak", "examStage": "Prelims", "examDate": "other",
+    "userType": "beginner", "syllabusCompleted": 40, "dailyHours": 6,
+    "topicProgress": {"Math": 12, "English": 30, "Reasoning": 4, "GA": 9},
+}
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def run(client, requests):
+    samples = []
+    for _ in range(requests):
+        started = time.perf_counter_ns()
+        client.post("/get-daily-task", json=PAYLOAD)
+        samples.append((time.perf_counter_ns() - started) / 1000)
+    return samples
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--sink", choices=("devnull", "stdout"), default="devnull")
+    args = parser.parse_args()
+
+    sink = open(os.devnull, "w") if args.sink == "devnull" else sys.stdout
+    os.environ["STRICTO_LOG_LEVEL"] = "WARNING"  # quiet import-time init
+    import server
+    from logging_setup import configure_logging
+
+    client = server.app.test_client()
+    run(client, 200)  # warm-up
+
+    # Interleave setups over several rounds so drift hits them all equally
+    samples = {label: [] for label, _ in SETUPS}
+    rounds = 5
+    for _ in range(rounds):
+        for label, config in SETUPS:
+            configure_logging(config, stream=sink)
+            samples[label].extend(run(client, args.requests // rounds))
+
+    configure_logging({"level": "WARNING"})
+    print(f"{'setup':32} {'p50 us':>10} {'p99 us':>10}", file=sys.stderr)
+    for label, _ in SETUPS:
+        print(f"{label:32} {statistics.median(samples[label]):10.1f} {percentile(samples[label], 99):10.1f}", file=sys.stderr)
@@ -0,0 +1,102 @@
+"""
+Memory per worker: every worker building its own TopicIndex vs mapping the shared
+index file (shared_index.py), for a synthetic syllabus.
+
+Each mode starts --workers spawned processes. Every worker loads the brain, plans
+for a spread of profiles, and reports how much its private memory grew (Linux
+/proc/self/smaps_rollup; shared file pages are not counted).
+
+Usage:
+    python benchmarks/bench_memory.py [--topics 100000] [--workers 4]
+                                      [--json memory.json] [--baseline memory_baseline.json]
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+from datetime import date
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_micro import write_syllabi  # noqa: E402
+from results import compare, load_results, metric, print_comparison, write_results  # noqa: E402
+
+SMAPS = "/proc/self/smaps_rollup"
+
+
+def private_bytes():
+    """Private_Clean + Private_Dirty of this process."""
+    total = 0
+    with open(SMAPS) as f:
+        for line in f:
+            if line.startswith(("Private_Clean:", "Private_Dirty:")):
+                total += int(line.split()[1]) * 1024
+    return total
+
+
+def worker(mode, directory, per_subject, results):
+    from brain_engine import StrictoBrain
+    from logging_setup import configure_logging
+    from shared_index import load_shared_index
+    from syllabus_loader import load_syllabus
+
+    configure_logging({"level": "WARNING"})
+    before = private_bytes()
+    brain = StrictoBrain(load_shared_index(directory) if mode == "shared" else load_syllabus(directory))
+    for n in range(0, per_subject, max(1, per_subject // 500)):
+        brain.generate_task("Math", "average", "Prelims", 90, "beginner", 30, 6, {"Math": n}, None, None, date(2025, 1, 10))
+    results.put(private_bytes() - before)
+
+
+def measure(mode, directory, per_subject, workers):
+    """Mean private MB added per worker."""
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    processes = [context.Process(target=worker, args=(mode, directory, per_subject, results)) for _ in range(workers)]
+    for process in processes:
+        process.start()
+    grown = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return sum(grown) / len(grown) / 2 ** 20
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--topics", type=int, default=100000, help="total syllabus topics (split over 4 subjects)")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--baseline", help="compare against this results file (exit 1 on regression)")
+    parser.add_argument("--tolerance", type=float, default=0.15)
+    args = parser.parse_args(argv)
+    if not os.path.exists(SMAPS):
+        print(f"[memory] {SMAPS} not available (Linux only)")
+        return 0
+
+    per_subject = args.topics // 4
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        write_syllabi(directory, per_subject)
+        # Warm both caches so workers measure steady-state boots, not the first build
+        measure("private", directory, per_subject, 1)
+        measure("shared", directory, per_subject, 1)
+        for mode in ("private", "shared"):
+            results[f"worker_private_mb[{mode}]"] = metric(measure(mode, directory, per_subject, args.workers), "MB")
+
+    print(f"[memory] {args.topics} topics, {args.workers} workers")
+    for name, result in results.items():
+        print(f"    {name:<32} {result['value']:10.2f} {result['unit']}")
+    if args.json:
+        write_results(args.json, "memory", results)
+    if args.baseline:
+        rows = compare({"results": results}, load_results(args.baseline), args.tolerance)
+        print_comparison(rows)
+        return 1 if any(row[4] == "regressed" for row in rows) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+"""
+Microbenchmarks: get_strategy and generate_task over a synthetic profile grid, and
+syllabus loading (cold parse / warm cache), for syllabus sizes up to 100k topics.
+
+Usage:
+    python benchmarks/bench_micro.py [--sizes 1000,10000,100000] [--json micro.json]
+                                     [--baseline micro_baseline.json --tolerance 0.15]
+"""
+import argparse
+import itertools
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from brain_engine import StrictoBrain  # noqa: E402
+from logging_setup import configure_logging  # noqa: E402
+from results import compare, load_results, metric, print_comparison, write_results  # noqa: E402
+from syllabus_loader import SUBJECT_FILES, load_syllabus  # noqa: E402
+
+TODAY = date(2025, 1, 10)
+
+# Every combination is one profile shape (4 * 2 * 3 * 8 * 6 * 2 * 2 = 4608 shapes)
+GRID = {
+    "subject": ("Math", "English", "Reasoning", "GA"),
+    "exam_stage": ("Prelims", "Mains"),
+    "level": ("weak", "average", "strong"),
+    "days_left": (5, 15, 25, 45, 75, 120, 200, 330),
+    "syllabus_percent": (0, 20, 40, 60, 85, 100),
+    "user_type": ("beginner", "repeater"),
+    "daily_hours": (3, 8),
+}
+
+
+def profile_grid():
+    keys = list(GRID)
+    return [dict(zip(keys, values)) for values in itertools.product(*GRID.values())]
+
+
+def write_syllabi(directory, topics_per_subject, seed=7):
+    rng = random.Random(seed)
+    for key, subject in SUBJECT_FILES.items():
+        with open(os.path.join(directory, f"topics_{key}.csv"), "w", encoding="utf-8") as f:
+            f.write("id,topic,sub-topic\n")
+            for topic_id in range(1, topics_per_subject + 1):
+                level = "Mains level drill" if rng.random() < 0.1 else "Basics"
+                f.write(f"{topic_id},{subject} Topic {topic_id},Practice: {level}\n")
+
+
+def per_call(fn, calls, repeat=3):
+    """Best-of-`repeat` microseconds per call."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best / calls * 1e6
+
+
+def bench_strategy(brain, grid):
+    def run():
+        for p in grid:
+            brain.get_strategy(p["subject"], p["level"], p["exam_stage"], p["days_left"], p["syllabus_percent"], p["user_type"], p["daily_hours"])
+    return per_call(run, len(grid))
+
+
+def bench_generate(brain, grid, topics_per_subject, seed=7):
+    rng = random.Random(seed)
+    progress = [{p["subject"]: rng.randrange(topics_per_subject)} for p in grid]
+
+    def run():
+        for p, topic_progress in zip(grid, progress):
+            brain.generate_task(p["subject"], p["level"], p["exam_stage"], p["days_left"], p["user_type"],
+                                p["syllabus_percent"], p["daily_hours"], topic_progress, None, None, TODAY)
+    return per_call(run, len(grid))
+
+
+def bench_load(directory):
+    """(cold parse ms, warm cache ms) for one syllabus directory."""
+    cache = os.path.join(directory, "syllabus.pkl")
+    started = time.perf_counter()
+    load_syllabus(directory, cache_path=cache)
+    cold = (time.perf_counter() - started) * 1000
+    warm = per_call(lambda: load_syllabus(directory, cache_path=cache), 1) / 1000
+    return cold, warm
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000,100000", help="total syllabus topics (split over 4 subjects)")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--baseline", help="compare against this results file (exit 1 on regression)")
+    parser.add_argument("--tolerance", type=float, default=0.15)
+    args = parser.parse_args(argv)
+    configure_logging({"level": "WARNING"})
+
+    grid = profile_grid()
+    results = {}
+    print(f"[micro] profile grid: {len(grid)} shapes")
+
+    brain = StrictoBrain(load_syllabus(cache_path="off"))
+    results["get_strategy"] = metric(bench_strategy(brain, grid), "us/op")
+    results["generate_task[real]"] = metric(bench_generate(brain, grid, 50), "us/op")
+
+    for total in (int(size) for size in args.sizes.split(",")):
+        per_subject = total // len(SUBJECT_FILES)
+        with tempfile.TemporaryDirectory() as directory:
+            write_syllabi(directory, per_subject)
+            cold, warm = bench_load(directory)
+            brain = StrictoBrain(load_syllabus(directory, cache_path="off"))
+        label = f"{total // 1000}k" if total >= 1000 else str(total)
+        results[f"generate_task[{label}]"] = metric(bench_generate(brain, grid, per_subject), "us/op")
+        results[f"load_syllabus_cold[{label}]"] = metric(cold, "ms")
+        results[f"load_syllabus_warm[{label}]"] = metric(warm, "ms")
+
+    for name, result in results.items():
+        print(f"    {name:<32} {result['value']:10.3f} {result['unit']}")
+
+    if args.json:
+        write_results(args.json, "micro", results)
+    if args.baseline:
+        rows = compare({"results": results}, load_results(args.baseline), args.tolerance)
+        print_comparison(rows)
+        return 1 if any(row[4] == "regressed" for row in rows) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
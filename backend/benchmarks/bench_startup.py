@@ -0,0 +1,97 @@
+"""
+Benchmark: worker cold start - import cost of `server` and time to first response.
+
+Every measurement runs in a fresh interpreter (what an autoscaled worker pays).
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 5] [--json startup.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs inside the fresh interpreter: import, first /get-daily-plan, report timings as JSON
+FIRST_RESPONSE = """
+import json, sys, time
+started = time.perf_counter()
+import server
+imported = time.perf_counter()
+client = server.app.test_client()
+response = client.post("/get-daily-plan", json={"levels": {"Math": "weak", "English": "strong"}})
+assert response.status_code == 200 and response.json["tasks"], response.json
+done = time.perf_counter()
+print(json.dumps({"import_ms": (imported - started) * 1000, "first_response_ms": (done - imported) * 1000,
+                  "total_ms": (done - started) * 1000, "pandas_loaded": "pandas" in sys.modules}))
+"""
+
+
+def run_python(args, env=None):
+    return subprocess.run([sys.executable, *args], cwd=BACKEND_DIR, env=dict(os.environ, **(env or {})),
+                          capture_output=True, text=True, check=True)
+
+
+def import_profile(top=8):
+    """`python -X importtime -c 'import server'`: total and the heaviest direct imports (ms)."""
+    stderr = run_python(["-X", "importtime", "-c", "import server"], {"STRICTO_LOG_LEVEL": "WARNING"}).stderr
+    total, children, pending = 0.0, [], []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or line.count("|") != 2:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue  # header
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 1:
+            pending.append((name.strip(), int(cumulative) / 1000))
+        elif depth == 0:
+            # importtime lists a module's children just before the module itself
+            if name.strip() == "server":
+                total, children = int(cumulative) / 1000, pending
+            pending = []
+    return total, sorted(children, key=lambda m: -m[1])[:top]
+
+
+def first_response(runs, cache_env):
+    samples = []
+    for _ in range(runs):
+        out = run_python(["-c", FIRST_RESPONSE], dict(cache_env, STRICTO_LOG_LEVEL="WARNING", STRICTO_SYLLABUS_POLL="0"))
+        samples.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return {
+        key: round(statistics.median(s[key] for s in samples), 1)
+        for key in ("import_ms", "first_response_ms", "total_ms")
+    } | {"pandas_loaded": any(s["pandas_loaded"] for s in samples)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args()
+
+    total, heaviest = import_profile()
+    print(f"[startup] import server: {total:.1f} ms (-X importtime, cumulative)")
+    for name, ms in heaviest:
+        print(f"    {name:<24} {ms:8.1f} ms")
+
+    results = {"import_server_ms": round(total, 1)}
+    with tempfile.TemporaryDirectory() as directory:
+        cache = os.path.join(directory, "syllabus.pkl")
+        results["cold_cache"] = first_response(1, {"STRICTO_SYLLABUS_CACHE": cache})  # first run writes it
+        results["warm_cache"] = first_response(args.runs, {"STRICTO_SYLLABUS_CACHE": cache})
+        results["no_cache"] = first_response(args.runs, {"STRICTO_SYLLABUS_CACHE": "off"})
+
+    print(f"[startup] time to first response (median of {args.runs}, fresh interpreter each)")
+    for label in ("cold_cache", "warm_cache", "no_cache"):
+        r = results[label]
+        print(f"    {label:<12} import {r['import_ms']:7.1f} ms  first response {r['first_response_ms']:7.1f} ms"
+              f"  total {r['total_ms']:7.1f} ms  pandas={'yes' if r['pandas_loaded'] else 'no'}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
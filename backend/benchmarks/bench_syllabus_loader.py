@@ -0,0 +1,70 @@
+"""
+Benchmark: syllabus load time, legacy iterrows loader vs cold parse vs warm cache.
+
+Usage:
+    python benchmarks/bench_syllabus_loader.py [--topics 5000] [--subjects 20]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from logging_setup import configure_logging  # noqa: E402
+from syllabus_loader import load_task_db  # noqa: E402
+
+
+def legacy_load(syllabus_dir, subjects):
+    """The original init_brain loop: iterrows() into dicts, then a new DataFrame."""
+    all_topics = []
+    for filename_key, subject_name in subjects.items():
+        df = pd.read_csv(os.path.join(syllabus_dir, f"topics_{filename_key}.csv"))
+        for _, row in df.iterrows():
+            all_topics.append({
+                "Subject": subject_name,
+                "Topic": row.get('topic', 'Unknown'),
+                "SubTopic": row.get('sub-topic', ''),
+                "ID": row.get('id', '')
+            })
+    return pd.DataFrame(all_topics)
+
+
+def write_syllabi(directory, subjects, topics):
+    for key in subjects:
+        with open(os.path.join(directory, f"topics_{key}.csv"), "w", encoding="utf-8") as f:
+            f.write("id,topic,sub-topic\n")
+            for topic_id in range(1, topics + 1):
+                f.write(f"{topic_id},Topic {topic_id // 10},Sub-topic {topic_id}\n")
+
+
+def timed(label, fn, rounds=5):
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    print(f"    {label:<12} {best * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--topics", type=int, default=5000, help="topics per subject")
+    parser.add_argument("--subjects", type=int, default=20)
+    args = parser.parse_args()
+
+    configure_logging({"level": "WARNING"})
+    subjects = {f"s{i}": f"Subject {i}" for i in range(args.subjects)}
+
+    with tempfile.TemporaryDirectory() as directory:
+        write_syllabi(directory, subjects, args.topics)
+        cache = os.path.join(directory, "syllabus.pkl")
+        print(f"[syllabus] {args.subjects} subjects x {args.topics} topics")
+        timed("legacy", lambda: legacy_load(directory, subjects), rounds=1)
+        timed("cold parse", lambda: load_task_db(directory, subjects, cache_path=False))
+        load_task_db(directory, subjects, cache)
+        timed("warm cache", lambda: load_task_db(directory, subjects, cache))
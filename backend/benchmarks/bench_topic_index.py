@@ -0,0 +1,89 @@
+"""
+Benchmark: TopicIndex lookup vs the old per-request pandas masking.
+
+Usage:
+    python benchmarks/bench_topic_index.py [--synthetic 100000]
+"""
+import argparse
+import os
+import random
+import sys
+import timeit
+
+import pandas as pd
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from topic_index import TopicIndex  # noqa: E402
+
+SUBJECT_FILES = {"math": "Math", "english": "English", "reasoning": "Reasoning", "ga": "GA"}
+
+
+def load_real_syllabus():
+    frames = []
+    for key, subject in SUBJECT_FILES.items():
+        path = os.path.join(BACKEND_DIR, "..", f"topics_{key}.csv")
+        df = pd.read_csv(path)
+        frames.append(pd.DataFrame({
+            "Subject": subject,
+            "Topic": df["topic"],
+            "SubTopic": df["sub-topic"],
+            "ID": df["id"],
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def make_synthetic_syllabus(total_topics):
+    per_subject = total_topics // len(SUBJECT_FILES)
+    rows = {"Subject": [], "Topic": [], "SubTopic": [], "ID": []}
+    for subject in SUBJECT_FILES.values():
+        for topic_id in range(1, per_subject + 1):
+            rows["Subject"].append(subject)
+            rows["Topic"].append(f"{subject} Topic {topic_id}")
+            rows["SubTopic"].append("Practice: Mains level drill" if topic_id % 7 == 0 else "Practice: Basics")
+            rows["ID"].append(topic_id)
+    return pd.DataFrame(rows)
+
+
+def legacy_pick(kb, subject, last_id, exclude_mains):
+    """The pre-index generate_task path: mask, mask, mask, iloc[0]."""
+    subject_topics = kb[kb['Subject'] == subject] if subject in kb['Subject'].values else pd.DataFrame()
+    if exclude_mains and not subject_topics.empty:
+        subject_topics = subject_topics[
+            ~subject_topics['Topic'].str.contains('mains level', case=False, na=False) &
+            ~subject_topics['SubTopic'].str.contains('mains level', case=False, na=False)
+        ]
+    if last_id is not None and not subject_topics.empty:
+        subject_topics = subject_topics[subject_topics['ID'] > last_id]
+    if subject_topics.empty:
+        return None
+    return subject_topics.iloc[0]
+
+
+def run(kb, label, repeats=200):
+    index = TopicIndex(kb)
+    max_id = int(kb["ID"].max())
+    rng = random.Random(42)
+    queries = [
+        (rng.choice(list(SUBJECT_FILES.values())), rng.randint(0, max_id), rng.random() < 0.5)
+        for _ in range(repeats)
+    ]
+
+    build = timeit.timeit(lambda: TopicIndex(kb), number=1)
+    legacy = timeit.timeit(lambda: [legacy_pick(kb, *q) for q in queries], number=1) / repeats
+    indexed = timeit.timeit(lambda: [index.next_topic(*q) for q in queries], number=50) / (50 * repeats)
+
+    print(f"[{label}] {len(kb)} topics | index build {build * 1e3:.1f} ms")
+    print(f"    pandas masking : {legacy * 1e6:10.1f} us/lookup")
+    print(f"    TopicIndex     : {indexed * 1e6:10.2f} us/lookup  ({legacy / indexed:,.0f}x faster)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--synthetic", type=int, default=100000, help="synthetic syllabus size (0 to skip)")
+    args = parser.parse_args()
+
+    run(load_real_syllabus(), "real syllabus")
+    if args.synthetic:
+        run(make_synthetic_syllabus(args.synthetic), "synthetic", repeats=50)
@@ -0,0 +1,61 @@
+"""
+Benchmark: /topics/search queries on TopicSearch vs a full scan of the syllabus.
+
+Usage:
+    python benchmarks/bench_topic_search.py [--synthetic 100000]
+"""
+import argparse
+import os
+import sys
+import timeit
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_topic_index import load_real_syllabus, make_synthetic_syllabus  # noqa: E402
+from topic_index import TopicIndex  # noqa: E402
+from topic_search import TopicSearch, tokenize  # noqa: E402
+
+QUERIES = [
+    ("noun", {}),
+    ("bank", {"subject": "GA"}),
+    ("topic 123", {}),
+    ("practice", {"mains": True}),
+    ("practice basics", {"min_id": 100, "max_id": 300}),
+    ("", {"subject": "Math", "mains": False, "offset": 1000}),
+]
+
+
+def full_scan(index, query, subject=None, min_id=None, max_id=None, mains=None, offset=0, limit=20):
+    words = tokenize(query)
+    hits = [
+        (name, row) for name in index.subjects if subject in (None, name) for row in index.subject(name).rows
+        if (min_id is None or row.id >= min_id) and (max_id is None or row.id <= max_id) and mains in (None, row.mains)
+        and all(any(token.startswith(word) for token in tokenize(f"{row.topic} {row.sub_topic}")) for word in words)
+    ]
+    return len(hits), hits[offset:offset + limit]
+
+
+def run(kb, label):
+    index = TopicIndex(kb)
+    build = timeit.timeit(lambda: TopicSearch(index), number=1)
+    search = TopicSearch(index)
+    print(f"[{label}] {len(index)} topics | search index build {build * 1e3:.1f} ms, {len(search)} tokens")
+    for query, filters in QUERIES:
+        cold = timeit.timeit(lambda: search.search(query, **filters), number=1)
+        warm = timeit.timeit(lambda: search.search(query, **filters), number=200) / 200
+        scan = timeit.timeit(lambda: full_scan(index, query, **filters), number=1)
+        total, _ = search.search(query, **filters)
+        print(f"    {query!r:<18} {str(filters):<46} {total:7d} hits | cold {cold * 1e6:8.1f} us"
+              f"  warm {warm * 1e6:6.1f} us  scan {scan * 1e3:8.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--synthetic", type=int, default=100000, help="synthetic syllabus size (0 to skip)")
+    args = parser.parse_args()
+
+    run(load_real_syllabus(), "real syllabus")
+    if args.synthetic:
+        run(make_synthetic_syllabus(args.synthetic), "synthetic")
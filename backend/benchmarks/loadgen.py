@@ -0,0 +1,254 @@
+"""
+Closed-loop HTTP load test against /get-daily-task: sync workers vs the ASGI mode.
+
+Each of --concurrency clients keeps exactly one request in flight on its own
+keep-alive connection (reconnecting when the server closes it) for --duration
+seconds. Clients are coroutines, so 1k concurrent connections cost one process.
+Reports throughput and latency percentiles per server.
+
+Servers are started locally on a free port:
+    sync   gunicorn sync workers on `server:create_app()`; the threaded Werkzeug
+           server when gunicorn is not installed
+    asgi   uvicorn workers on `asgi_app:create_asgi_app` (needs uvicorn)
+--server both runs them one after the other. Pass --url to load an already
+running deployment instead.
+
+Usage:
+    python benchmarks/loadgen.py [--server sync|asgi|both] [--concurrency 1000]
+                                 [--duration 10] [--workers 4] [--profiles 1000]
+                                 [--url http://host:port]
+                                 [--json load.json] [--baseline load_baseline.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from results import compare, load_results, metric, print_comparison, write_results  # noqa: E402
+
+ENDPOINT = "/get-daily-task"
+
+# Fallback when gunicorn is missing: same app factory, threaded dev server
+WERKZEUG_SERVER = """
+import sys
+from werkzeug.serving import WSGIRequestHandler, run_simple
+from server import create_app
+WSGIRequestHandler.protocol_version = "HTTP/1.1"  # keep-alive, like gunicorn
+run_simple("127.0.0.1", int(sys.argv[1]), create_app(), threaded=True)
+"""
+
+
+def request_bodies(count, seed=7):
+    """`count` distinct profile bodies (distinct bodies defeat the response cache)."""
+    rng = random.Random(seed)
+    bodies = []
+    for _ in range(count):
+        subject = rng.choice(("Math", "English", "Reasoning", "GA"))
+        bodies.append(json.dumps({
+            "subject": subject,
+            "level": rng.choice(("weak", "average", "strong")),
+            "examStage": rng.choice(("Prelims", "Mains")),
+            "userType": rng.choice(("beginner", "repeater")),
+            "syllabusCompleted": rng.randrange(0, 101, 5),
+            "dailyHours": rng.randint(2, 10),
+            "topicProgress": {subject: rng.randrange(60)},
+        }).encode())
+    return bodies
+
+
+def raise_fd_limit():
+    """Both ends of every connection need a descriptor: lift the soft limit to the hard one."""
+    try:
+        import resource
+    except ImportError:  # not POSIX
+        return
+    _, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def server_command(kind, port, workers):
+    """(argv, description) for a local server, or (None, reason) when it cannot run here."""
+    bind = f"127.0.0.1:{port}"
+    if kind == "sync":
+        if shutil.which("gunicorn"):
+            return ["gunicorn", "-w", str(workers), "-b", bind, "--backlog", "4096", "--log-level", "warning",
+                    "server:create_app()"], f"gunicorn sync x{workers}"
+        return [sys.executable, "-c", WERKZEUG_SERVER, str(port)], "werkzeug threaded (gunicorn not installed)"
+    if shutil.which("uvicorn"):
+        return ["uvicorn", "asgi_app:create_asgi_app", "--factory", "--workers", str(workers), "--host", "127.0.0.1",
+                "--port", str(port), "--backlog", "4096", "--no-access-log", "--log-level", "warning"], f"uvicorn x{workers}"
+    return None, "uvicorn not installed"
+
+
+async def read_response(reader):
+    """(status, keep-alive) after consuming one HTTP/1.1 response."""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionResetError("server closed the connection")
+    status = int(status_line.split()[1])
+    length, keep_alive = None, True
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        name, value = name.strip().lower(), value.strip().lower()
+        if name == "content-length":
+            length = int(value)
+        elif name == "connection":
+            keep_alive = value != "close"
+    if length is None:
+        await reader.read()  # delimited by close
+        return status, False
+    await reader.readexactly(length)
+    return status, keep_alive
+
+
+async def client_loop(host, port, bodies, offset, stop_at, latencies, errors):
+    reader = writer = None
+    i = offset
+    while time.perf_counter() < stop_at:
+        body = bodies[i % len(bodies)]
+        i += 1
+        head = f"POST {ENDPOINT} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n"
+        started = time.perf_counter()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(host, port)
+            writer.write(head.encode("latin-1") + body)
+            status, keep_alive = await read_response(reader)
+        except (OSError, EOFError, ValueError) as e:  # IncompleteReadError is an EOFError
+            errors.append(type(e).__name__)
+            if writer is not None:
+                writer.close()
+            reader = writer = None
+            await asyncio.sleep(0.01)
+            continue
+        if not keep_alive:
+            writer.close()
+            reader = writer = None
+        if status != 200:
+            errors.append(status)
+            continue
+        latencies.append(time.perf_counter() - started)
+    if writer is not None:
+        writer.close()
+
+
+async def run_load(host, port, bodies, concurrency, duration):
+    """Closed loop for `duration` seconds; returns (sorted latencies in s, errors, elapsed s)."""
+    latencies, errors = [], []
+    started = time.perf_counter()
+    stop_at = started + duration
+    await asyncio.gather(*(client_loop(host, port, bodies, n * 997, stop_at, latencies, errors) for n in range(concurrency)))
+    return sorted(latencies), errors, time.perf_counter() - started
+
+
+def wait_ready(host, port, body, timeout=60):
+    async def probe():
+        reader, writer = await asyncio.open_connection(host, port)
+        writer.write(f"POST {ENDPOINT} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                     f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode("latin-1") + body)
+        status, _ = await read_response(reader)
+        writer.close()
+        return status
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if asyncio.run(probe()) == 200:
+                return
+        except (OSError, EOFError, ValueError):
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"server on {host}:{port} did not become ready in {timeout}s")
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def measure(host, port, bodies, args, label, prefix):
+    wait_ready(host, port, bodies[0])
+    print(f"[load] {label}: {args.concurrency} connections x {args.duration:g}s, {len(bodies)} distinct bodies")
+    latencies, errors, elapsed = asyncio.run(run_load(host, port, bodies, args.concurrency, args.duration))
+    ms = [latency * 1000 for latency in latencies]
+    results = {
+        f"{prefix}.rps": metric(len(ms) / elapsed, "req/s", better="higher"),
+        f"{prefix}.p50": metric(percentile(ms, 0.50), "ms"),
+        f"{prefix}.p95": metric(percentile(ms, 0.95), "ms"),
+        f"{prefix}.p99": metric(percentile(ms, 0.99), "ms"),
+        f"{prefix}.errors": metric(len(errors), "count"),
+    }
+    for name, result in results.items():
+        print(f"    {name:<24} {result['value']:10.2f} {result['unit']}")
+    if errors:
+        print(f"[load] {len(errors)} failed requests, e.g. {errors[:5]}")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--server", choices=("sync", "asgi", "both"), default="both")
+    parser.add_argument("--concurrency", type=int, default=1000, help="connections, one request in flight each")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of load per server")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2, help="server worker processes")
+    parser.add_argument("--profiles", type=int, default=1000, help="distinct request bodies (1 = all cache hits)")
+    parser.add_argument("--url", help="load this running server instead of starting one")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--baseline", help="compare against this results file (exit 1 on regression)")
+    parser.add_argument("--tolerance", type=float, default=0.15)
+    args = parser.parse_args(argv)
+    raise_fd_limit()
+
+    bodies = request_bodies(args.profiles)
+    results = {}
+    if args.url:
+        parts = urlsplit(args.url)
+        results.update(measure(parts.hostname, parts.port or 80, bodies, args, args.url, "loadgen"))
+    for kind in () if args.url else ("sync", "asgi") if args.server == "both" else (args.server,):
+        port = free_port()
+        cmd, label = server_command(kind, port, args.workers)
+        if cmd is None:
+            print(f"[load] skipping {kind}: {label}")
+            continue
+        env = dict(os.environ, STRICTO_LOG_LEVEL="WARNING", STRICTO_PRELOAD_BRAIN="1")
+        process = subprocess.Popen(cmd, cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            results.update(measure("127.0.0.1", port, bodies, args, label, f"loadgen.{kind}"))
+        finally:
+            process.terminate()
+            process.wait(timeout=10)
+
+    if "loadgen.sync.rps" in results and "loadgen.asgi.rps" in results:
+        ratio = results["loadgen.asgi.rps"]["value"] / max(results["loadgen.sync.rps"]["value"], 1e-9)
+        print(f"[load] asgi / sync throughput: {ratio:.2f}x")
+    if args.json:
+        write_results(args.json, "loadgen", results)
+    if args.baseline:
+        rows = compare({"results": results}, load_results(args.baseline), args.tolerance)
+        print_comparison(rows)
+        return 1 if any(row[4] == "regressed" for row in rows) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+"""
+Benchmark results: one JSON format for every suite, plus regression comparison.
+
+    {
+      "suite": "micro",
+      "created": "2025-01-10T12:00:00",
+      "env": {"python": "3.11.7", "platform": "...", "cpus": 8, "commit": "abc1234"},
+      "results": {
+        "generate_task[10k]": {"value": 7.4, "unit": "us/op", "better": "lower"},
+        "loadgen.rps":        {"value": 2150.0, "unit": "req/s", "better": "higher"}
+      }
+    }
+
+Usage:
+    python benchmarks/results.py compare current.json baseline.json [--tolerance 0.10]
+
+Exits 1 when any metric is worse than the baseline by more than the tolerance.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def metric(value, unit, better="lower"):
+    return {"value": round(float(value), 4), "unit": unit, "better": better}
+
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "commit": commit,
+    }
+
+
+def write_results(path, suite, results):
+    document = {
+        "suite": suite,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "env": environment(),
+        "results": results,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(document, f, indent=2)
+    return document
+
+
+def load_results(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(current, baseline, tolerance=0.10):
+    """
+    Metric-by-metric comparison.
+
+    Returns:
+        list of (name, baseline value, current value, relative change, status) where
+        change > 0 means worse and status is "ok", "regressed", "improved" or "new"
+    """
+    rows = []
+    base_results = baseline.get("results", {})
+    for name, cur in sorted(current.get("results", {}).items()):
+        base = base_results.get(name)
+        if base is None or not base["value"]:
+            rows.append((name, None, cur["value"], None, "new"))
+            continue
+        change = (cur["value"] - base["value"]) / base["value"]
+        if cur.get("better", "lower") == "higher":
+            change = -change
+        status = "regressed" if change > tolerance else "improved" if change < -tolerance else "ok"
+        rows.append((name, base["value"], cur["value"], change, status))
+    return rows
+
+
+def print_comparison(rows):
+    for name, base, cur, change, status in rows:
+        if base is None:
+            print(f"    {name:<40} {'-':>12} {cur:>12.4g}   {'new':>9}")
+        else:
+            print(f"    {name:<40} {base:>12.4g} {cur:>12.4g}   {change:+8.1%}  {status}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare benchmark results against a baseline.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    cmp_parser = sub.add_parser("compare")
+    cmp_parser.add_argument("current")
+    cmp_parser.add_argument("baseline")
+    cmp_parser.add_argument("--tolerance", type=float, default=0.10, help="allowed relative slowdown (default 0.10)")
+    args = parser.parse_args(argv)
+
+    rows = compare(load_results(args.current), load_results(args.baseline), args.tolerance)
+    print_comparison(rows)
+    regressed = [row[0] for row in rows if row[4] == "regressed"]
+    if regressed:
+        print(f"[results] {len(regressed)} regression(s) beyond {args.tolerance:.0%}: {', '.join(regressed)}")
+        return 1
+    print(f"[results] no regressions beyond {args.tolerance:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,346 @@
-import pandas as pd
+import logging
 import random
-from datetime import datetime, timedelta
+from bisect import bisect_right
+from datetime import date, datetime, timedelta
+from day_scheduler import pack_day
+from logging_setup import get_logger
+from metrics import FALLBACKS, stage
+from spaced_repetition import ReviewCalendar, get_policy
+from tasks import Priority, Task, TaskType, to_minutes
+from topic_index import TopicIndex
+from topic_search import TopicSearch
+
+adapt_log = get_logger("ADAPT")
+spaced_log = get_logger("SPACED")
+filter_log = get_logger("FILTER")
+progress_log = get_logger("PROGRESS")
+priority_log = get_logger("PRIORITY")
+limit_log = get_logger("LIMIT")
+api_log = get_logger("API")
+
+# Cross-subject cap for one day's protocol
+MAX_TASKS_LIMIT = 10
+# complete_task: weight of today's completion share in the blended completion rate
+COMPLETION_RATE_WEIGHT = 0.3
+
+# Strategy type string -> TaskType (plain dict: faster than TaskType(value) per task)
+TASK_TYPES = {task_type.value: task_type for task_type in TaskType}
+
+# Dashboard order: weak subjects are moved to the front by the client
+DEFAULT_SUBJECTS = ("Math", "Reasoning", "English", "GA")
+
+# Cut points where get_strategy() changes its answer.
+# days_left: everything switches at < 20/30/40/60/120 ...
+DAYS_LEFT_BANDS = (20, 30, 40, 60, 120)
+# ... except GA Current Affairs, which starts at <= 60
+GA_CURRENT_AFFAIRS_DAYS = 60
+# syllabus_percent: beginner phases (sectional mock >= 50, foundation < 60, full mocks >= 80)
+SYLLABUS_PHASES = (50, 60, 80)
+
+
+def strategy_key(subject, exam_stage, days_left, syllabus_percent=0, user_type='repeater', daily_hours=6):
+    """
+    Discretised inputs of get_strategy(): two requests with the same key get the same strategy list.
+    
+    Returns:
+        (subject_class, is_prelims, user_type_class, syllabus_phase, days_left_band,
+         ga_current_affairs_window, hours_5_plus)
+    """
+    return (
+        subject if subject in ('English', 'Math', 'GA') else None,
+        exam_stage == 'Prelims',
+        user_type if user_type in ('beginner', 'repeater') else None,
+        bisect_right(SYLLABUS_PHASES, syllabus_percent),
+        bisect_right(DAYS_LEFT_BANDS, days_left),
+        days_left <= GA_CURRENT_AFFAIRS_DAYS,
+        daily_hours >= 5,
+    )
+
+
+def strategy_rules(subject, exam_stage, days_left, syllabus_percent=0, user_type='repeater', daily_hours=6):
+    """
+    Advanced Coaching Strategy with Spaced Repetition & Progressive Mocks
+    
+    The raw decision tree. Requests go through StrictoBrain.get_strategy(), which
+    looks the answer up in STRATEGY_TABLE (compiled from this function at import).
+    """
+    strategies = []
+    
+    # ============================================
+    # DAILY HABITS (ALL STUDENTS) - DYNAMIC TIME
+    # ============================================
+    # Allocate time based on daily_hours: 5+ hrs = 40min/20min, <5 hrs = 30min/20min
+    # USER REQUIREMENT: MAX caps - Editorial 1hr, Calculation 30min
+    if daily_hours >= 5:
+        editorial_time = min(0.67, 1.0)  # 40 minutes, MAX 1 hour
+        calculation_time = min(0.33, 0.5)  # 20 minutes, MAX 30 min
+    else:
+        editorial_time = min(0.5, 1.0)  # 30 minutes, MAX 1 hour  
+        calculation_time = min(0.33, 0.5)  # 20 minutes, MAX 30 min
+    
+    if subject == 'English':
+        strategies.append(("Learning", "Editorial Reading (The Hindu)", editorial_time))
+        
+    if subject == 'Math':
+        strategies.append(("Practice", "Speed Calculation Drill", calculation_time))
+    
+    # ============================================
+    # GENERAL AWARENESS (GA) LOGIC
+    # ============================================
+    if subject == 'GA':
+        # Static GK - Part of Foundation/Regular Study
+        strategies.append(("Learning", "Static GK Chapter", 1.0))
+        
+        # Current Affairs - ONLY for Mains Preparation
+        # Prelims mein CA nahi aata, but Mains ke liye 60 days pehle se start
+        if days_left <= 60:
+            strategies.append(("Learning", "Daily Current Affairs (For Mains)", 1.0))
+            # Weekend Revision
+            strategies.append(("Revision", "Weekly Current Affairs Revision (Weekend)", 0.5))
+        
+        # For Repeaters - GA syllabus from start
+        if user_type == 'repeater':
+            strategies.append(("Practice", "GA Static GK Practice Questions", 1.0))
+        
+        return strategies
+    
+    # Spaced repetition (3/7/21) applies to BOTH beginners and repeaters:
+    # see get_spaced_repetition_tasks(), called from generate_task()
+    # ============================================
+    # BEGINNER STRATEGY
+    # ============================================
+    if user_type == 'beginner':
+        # Phase 1: Foundation (0-60%)
+        if syllabus_percent < 60:
+            strategies.append(("Learning", "Foundation Concept Building", 1.5))
+            strategies.append(("Practice", "Basic Practice Questions", 1.0))
+            
+        # Phase 2: Practice + Sectional Mocks (60-80%)
+        elif syllabus_percent < 80:
+            strategies.append(("Learning", "Advanced Concept Revision", 1.0))
+            strategies.append(("Practice", "Moderate Practice (50 Questions)", 1.5))
+            
+            # Sectional Mock after 50%
+            if syllabus_percent >= 50:
+                strategies.append(("Test", "Sectional Mock (Subject-wise)", 1.0))
+        
+        # Phase 3: Full Mock Phase (80%+)
+        else:
+            strategies.append(("Practice", "Previous Year Questions", 1.0))
+            
+            # MOCK STRATEGY - Depends on exam_stage
+            if exam_stage == 'Prelims':
+                # Pre exam phase - Only Prelims mocks
+                if days_left < 20:
+                    # Crisis: 3 Prelims Full Mock Daily
+                    strategies.append(("Test", "Prelims Full Mock #1", 2.0))
+                    strategies.append(("Test", "Prelims Full Mock #2", 2.0))
+                    strategies.append(("Test", "Prelims Full Mock #3", 2.0))
+                    
+                elif days_left < 40:
+                    strategies.append(("Test", "Prelims Full Mock (Daily)", 2.0))
+                    
+                elif days_left < 120:
+                    strategies.append(("Test", "Prelims Full Mock (3-4 per week)", 1.5))
+                    
+                else:
+                    strategies.append(("Test", "Prelims Full Mock (1-2 per week)", 1.0))
+            
+            else:  # exam_stage == 'Mains'
+                # After Prelims - Only Mains mocks
+                if days_left < 20:
+                    strategies.append(("Test", "Mains Full Mock #1", 2.5))
+                    strategies.append(("Test", "Mains Full Mock #2", 2.5))
+                elif days_left < 40:
+                    strategies.append(("Test", "Mains Full Mock (Daily)", 2.5))
+                else:
+                    strategies.append(("Test", "Mains Full Mock (2-3 per week)", 2.0))
+    
+    # ============================================
+    # REPEATER STRATEGY
+    # ============================================
+    else:
+        # MOCK STRATEGY - Progressive for both Pre and Mains
+        
+        if exam_stage == 'Prelims':
+            # Before Prelims Exam
+            
+            if days_left < 30:
+                # Critical Phase: Only Prelims Mocks (2-3 daily)
+                strategies.append(("Revision", "Rapid Fire Formulas", 1.0))
+                strategies.append(("Test", "Prelims Full Mock #1", 2.0))
+                strategies.append(("Test", "Prelims Full Mock #2", 2.0))
+                strategies.append(("Test", "Prelims Full Mock #3 (Optional)", 1.5))
+                strategies.append(("Practice", "Error Analysis", 1.0))
+                
+            elif days_left < 60:
+                # Near Phase: Daily Full Mock (Both Pre + Mains)
+                strategies.append(("Revision", "Chapter-wise Revision", 1.0))
+                strategies.append(("Practice", "High-Difficulty Questions", 1.5))
+                strategies.append(("Test", "Prelims Full Mock (Daily)", 2.0))
+                strategies.append(("Test", "Mains Full Mock", 2.5))  # 1 per day
+                
+            elif days_left < 120:
+                # Moderate Phase: 2 Pre + 1 Mains per week
+                strategies.append(("Revision", "Topic-wise Revision", 1.0))
+                strategies.append(("Practice", "Previous Year Questions", 1.5))
+                strategies.append(("Test", "Prelims Full Mock (2 per week)", 1.0))
+                strategies.append(("Test", "Mains Full Mock (1 per week)", 1.0))
+                
+            else:
+                # Far Phase: 2 Pre + 1 Mains per week
+                strategies.append(("Revision", "Concept Revision", 1.5))
+                strategies.append(("Practice", "Advanced Practice", 1.5))
+                strategies.append(("Test", "Prelims Full Mock (2 per week)", 1.0))
+                strategies.append(("Test", "Mains Full Mock (1 per week)", 1.0))
+        
+        else:  # exam_stage == 'Mains'
+            # After Prelims - Only Mains Mocks
+            if days_left < 30:
+                strategies.append(("Revision", "Mains Topics Rapid Revision", 1.5))
+                strategies.append(("Test", "Mains Full Mock #1", 2.5))
+                strategies.append(("Test", "Mains Full Mock #2", 2.5))
+                strategies.append(("Practice", "Answer Writing Practice", 1.5))
+                
+            elif days_left < 60:
+                strategies.append(("Revision", "Mains Syllabus Revision", 1.5))
+                strategies.append(("Test", "Mains Full Mock (Daily)", 2.5))
+                strategies.append(("Practice", "Descriptive Practice", 1.5))
+                
+            else:
+                strategies.append(("Revision", "Mains Topics Deep Dive", 2.0))
+                strategies.append(("Test", "Mains Full Mock (2-3 per week)", 2.0))
+                strategies.append(("Practice", "Essay Writing", 1.0))
+    
+    return strategies
+
+
+def _build_strategy_table():
+    """
+    Compile strategy_rules() into {strategy_key: tuple of (type, task, hours)}.
+    One representative input per discretised bucket; the grid is tiny (< 2k keys).
+    """
+    subjects = ('English', 'Math', 'GA', 'Reasoning')  # Reasoning stands in for "any other subject"
+    user_types = ('beginner', 'repeater', 'other')
+    day_samples = sorted({DAYS_LEFT_BANDS[0] - 1, GA_CURRENT_AFFAIRS_DAYS, GA_CURRENT_AFFAIRS_DAYS + 1} | set(DAYS_LEFT_BANDS))
+    syllabus_samples = (SYLLABUS_PHASES[0] - 1,) + SYLLABUS_PHASES
+    
+    table = {}
+    for subject in subjects:
+        for exam_stage in ('Prelims', 'Mains'):
+            for user_type in user_types:
+                for syllabus_percent in syllabus_samples:
+                    for days_left in day_samples:
+                        for daily_hours in (4, 5):
+                            key = strategy_key(subject, exam_stage, days_left, syllabus_percent, user_type, daily_hours)
+                            rules = strategy_rules(subject, exam_stage, days_left, syllabus_percent, user_type, daily_hours)
+                            table[key] = tuple(rules)
+    return table
+
+
+# Immutable, shared answers: get_strategy() is a dict lookup on the hot path
+STRATEGY_TABLE = _build_strategy_table()
+
+
+def strategy_text(task):
+    """A task's strategy description without its bound-topic suffix (": Topic - SubTopic")."""
+    if task.topic is not None:
+        suffix = f": {task.topic} - {task.sub_topic}"
+        if task.task.endswith(suffix):
+            return task.task[:-len(suffix)]
+    return task.task
+
+
+def normalize_subject(subject_raw):
+    """'MATH' / 'math' -> 'Math', 'ga' -> 'GA'"""
+    if subject_raw.upper() == 'GA':
+        return 'GA'
+    return subject_raw.title()
+
+
+def resolve_exam_date(user_date_str, today=None):
+    """
+    Parse the exam date sent by the client (Robust Banking Logic)
+    
+    Args:
+        user_date_str: 'YYYY-MM-DD', 'DD-MM-YYYY', 'other' or empty
+        today: date to count from (defaults to today)
+    
+    Returns:
+        (exam_date, system_note)
+    """
+    today = today or date.today()
+    
+    if not user_date_str or user_date_str.lower() == 'other':
+        # Default to Banking Season Start (June 15th of current/next year)
+        target_year = today.year
+        if today.month > 6:
+            target_year += 1 # Next season
+        return date(target_year, 6, 15), "Auto-Target: Banking Season (June " + str(target_year) + ")"
+    
+    # Try ISO Format first YYYY-MM-DD, then Indian Format DD-MM-YYYY
+    for date_format in ('%Y-%m-%d', '%d-%m-%Y'):
+        try:
+            return datetime.strptime(user_date_str, date_format).date(), f"Target: {user_date_str}"
+        except ValueError:
+            continue
+    
+    # Fallback
+    return today + timedelta(days=150), "Invalid Date. Defaulting to 5 Months."
+
+
+def plan_note(system_note, days_left, user_type, exam_stage):
+    """
+    "note" of a task or plan response: the exam-date note, plus the timeline estimate
+    for beginners (userType, not the subject level), or the critical-mode banner
+    in the last 20 days before Prelims.
+    """
+    if user_type == 'beginner' and days_left > 140:
+        system_note += " | Est. Syllabus Completion: 5 Months (Steady Pace)"
+    elif user_type == 'beginner' and days_left < 90:
+        system_note += " | ⚠️ Warning: Short Timeline for Beginner!"
+    if days_left < 20 and exam_stage == 'Prelims':
+        system_note = "CRITICAL MODE: Exam in < 20 days. New topics stopped. Revision & Mocks Only."
+    return f"AI Plan ({days_left} days left): " + system_note
+
+
+def apply_task_limit(generated_tasks, limit=MAX_TASKS_LIMIT):
+    """
+    TASK LIMIT CONTROL: keep at most `limit` tasks
+    
+    Smart Reduction Strategy:
+    1. Keep all high-priority tasks
+    2. Keep daily habits (Editorial, Calculation)
+    3. Reduce optional/lower-priority tasks
+    """
+    if len(generated_tasks) <= limit:
+        return generated_tasks
+    
+    limit_log.debug("Generated %d tasks, reducing to %d", len(generated_tasks), limit)
+    
+    priority_tasks = []
+    optional_tasks = []
+    
+    for task in generated_tasks:
+        # Keep high priority and daily habits
+        if task.priority is Priority.HIGH or 'Editorial' in task.task or 'Calculation Drill' in task.task:
+            priority_tasks.append(task)
+        else:
+            optional_tasks.append(task)
+    
+    # Calculate how many optional tasks we can keep
+    remaining_slots = limit - len(priority_tasks)
+    
+    if remaining_slots > 0:
+        # Keep the most important optional tasks
+        generated_tasks = priority_tasks + optional_tasks[:remaining_slots]
+    else:
+        # If even priority tasks exceed limit, keep first `limit`
+        generated_tasks = priority_tasks[:limit]
+    
+    limit_log.debug("Reduced to %d tasks (Priority: %d, Optional: %d)", len(generated_tasks), len(priority_tasks), max(0, min(remaining_slots, len(optional_tasks))))
+    return generated_tasks
+
 
 class StrictoBrain:
     """
@@ -8,8 +348,13 @@ class StrictoBrain:
     Implements 3/7/21 days revision cycle for permanent retention.
     """
     
-    def __init__(self, task_db):
+    def __init__(self, task_db, search=False):
         self.kb = task_db
+        # Immutable per-subject index: ID-sorted rows + precomputed mains flag
+        # (a prebuilt TopicIndex, e.g. a shared_index mapping, is used as is)
+        self.topic_index = task_db if isinstance(task_db, TopicIndex) else TopicIndex(task_db)
+        # Inverted index for /topics/search; only the serving brains need one (not pool workers)
+        self.topic_search = TopicSearch(self.topic_index) if search else None
     
     def get_performance_adjustment(self, completion_history):
         """
@@ -19,10 +364,14 @@ class StrictoBrain:
         Args:
             completion_history: dict with subject-wise completion rates
                 Example: {"Math": 0.45, "English": 0.85, "Reasoning": 0.60}
+                or an analytics.ActivityRollup (its recent completion_rates() are used)
         
         Returns:
             dict with adjustment factors for each subject
         """
+        from analytics import ActivityRollup
+        if isinstance(completion_history, ActivityRollup):
+            completion_history = completion_history.completion_rates()
         adjustments = {}
         
         for subject, completion_rate in completion_history.items():
@@ -34,17 +383,17 @@ class StrictoBrain:
             if completion_rate < 0.5:
                 task_count_multiplier = 0.7  # 30% fewer tasks
                 difficulty_level = "easier"
-                print(f"📉 [ADAPT] {subject}: Low completion ({completion_rate:.0%}), reducing tasks by 30%")
+                adapt_log.debug("%s: Low completion (%.0f%%), reducing tasks by 30%%", subject, completion_rate * 100)
             
             # DOING GREAT (> 80% completion) - Can handle more
             elif completion_rate > 0.8:
                 task_count_multiplier = 1.2  # 20% more tasks
                 difficulty_level = "harder"
-                print(f"📈 [ADAPT] {subject}: High completion ({completion_rate:.0%}), increasing challenge by 20%")
+                adapt_log.debug("%s: High completion (%.0f%%), increasing challenge by 20%%", subject, completion_rate * 100)
             
             # NORMAL (50-80%) - Keep current pace
             else:
-                print(f"✅ [ADAPT] {subject}: Steady progress ({completion_rate:.0%}), maintaining current level")
+                adapt_log.debug("%s: Steady progress (%.0f%%), maintaining current level", subject, completion_rate * 100)
             
             adjustments[subject] = {
                 "task_multiplier": task_count_multiplier,
@@ -57,227 +406,69 @@ class StrictoBrain:
     def get_strategy(self, subject, level, exam_stage, days_left, syllabus_percent=0, user_type='repeater', daily_hours=6):
         """
         Advanced Coaching Strategy with Spaced Repetition & Progressive Mocks
-        """
-        strategies = []
-        
-        # ============================================
-        # DAILY HABITS (ALL STUDENTS) - DYNAMIC TIME
-        # ============================================
-        # Allocate time based on daily_hours: 5+ hrs = 40min/20min, <5 hrs = 30min/20min
-        # USER REQUIREMENT: MAX caps - Editorial 1hr, Calculation 30min
-        if daily_hours >= 5:
-            editorial_time = min(0.67, 1.0)  # 40 minutes, MAX 1 hour
-            calculation_time = min(0.33, 0.5)  # 20 minutes, MAX 30 min
-        else:
-            editorial_time = min(0.5, 1.0)  # 30 minutes, MAX 1 hour  
-            calculation_time = min(0.33, 0.5)  # 20 minutes, MAX 30 min
-        
-        if subject == 'English':
-            strategies.append(("Learning", "Editorial Reading (The Hindu)", editorial_time))
-            
-        if subject == 'Math':
-            strategies.append(("Practice", "Speed Calculation Drill", calculation_time))
-        
-        # ============================================
-        # GENERAL AWARENESS (GA) LOGIC
-        # ============================================
-        if subject == 'GA':
-            # Static GK - Part of Foundation/Regular Study
-            strategies.append(("Learning", "Static GK Chapter", 1.0))
-            
-            # Current Affairs - ONLY for Mains Preparation
-            # Prelims mein CA nahi aata, but Mains ke liye 60 days pehle se start
-            if days_left <= 60:
-                strategies.append(("Learning", "Daily Current Affairs (For Mains)", 1.0))
-                # Weekend Revision
-                strategies.append(("Revision", "Weekly Current Affairs Revision (Weekend)", 0.5))
-            
-            # For Repeaters - GA syllabus from start
-            if user_type == 'repeater':
-                strategies.append(("Practice", "GA Static GK Practice Questions", 1.0))
-            
-            return strategies
+        (precompiled: see strategy_rules / STRATEGY_TABLE)
         
-        # ============================================
-        # SPACED REPETITION LOGIC (3/7/21 System)
-        # ============================================
-        # FEATURE #1: Automatic review tasks based on completion dates
-        # Implements 3-day, 7-day, and 21-day review cycles for permanent retention
-        
-        def get_spaced_repetition_tasks(self, topic_completion_history, subject):
-            """
-            Generate review tasks based on 3/7/21 day spaced repetition
-            
-            Args:
-                topic_completion_history: dict of {topic_name: completion_date_string}
-                    Example: {"Algebra Basics": "2024-01-10", "Geometry": "2024-01-05"}
-                subject: Current subject being processed
-                
-            Returns:
-                list of review task tuples: [(type, description, duration), ...]
-            """
-            if not topic_completion_history:
-                return []
-            
-            review_tasks = []
-            today = datetime.now().date()
-            
-            for topic_name, completion_date_str in topic_completion_history.items():
-                try:
-                    completion_date = datetime.strptime(completion_date_str, '%Y-%m-%d').date()
-                    days_since_completion = (today - completion_date).days
-                    
-                    # 3-Day Review (First reinforcement)
-                    if days_since_completion == 3:
-                        review_tasks.append(("Revision", f"3-Day Review: {topic_name}", 0.5))
-                        print(f"📝 [SPACED] Adding 3-day review for {topic_name}")
-                    
-                    # 7-Day Review (Second reinforcement)
-                    elif days_since_completion == 7:
-                        review_tasks.append(("Revision", f"7-Day Review: {topic_name}", 0.75))
-                        print(f"📝 [SPACED] Adding 7-day review for {topic_name}")
-                    
-                    # 21-Day Review (Long-term retention)
-                    elif days_since_completion == 21:
-                        review_tasks.append(("Revision", f"21-Day Review: {topic_name}", 1.0))
-                        print(f"📝 [SPACED] Adding 21-day review for {topic_name}")
-                    
-                except ValueError:
-                    print(f"⚠️ [SPACED] Invalid date format for {topic_name}: {completion_date_str}")
-                    continue
-            
-            return review_tasks
+        Returns:
+            tuple of (type, description, duration_hrs) - shared, do not mutate
+        """
+        return STRATEGY_TABLE[strategy_key(subject, exam_stage, days_left, syllabus_percent, user_type, daily_hours)]
+
+    # ============================================
+    # SPACED REPETITION LOGIC (3/7/21 System)
+    # ============================================
+    # FEATURE #1: Automatic review tasks based on completion dates
+    # Implements 3-day, 7-day, and 21-day review cycles for permanent retention
+    
+    def get_spaced_repetition_tasks(self, topic_completion_history, subject, today=None):
+        """
+        Generate review tasks based on 3/7/21 day spaced repetition
         
-        # Apply spaced repetition for BOTH beginners and repeaters
-        # This is called in generate_task() with topic_completion_history parameter
-        # ============================================
-        # BEGINNER STRATEGY
-        # ============================================
-        if user_type == 'beginner':
-            # Phase 1: Foundation (0-60%)
-            if syllabus_percent < 60:
-                strategies.append(("Learning", "Foundation Concept Building", 1.5))
-                strategies.append(("Practice", "Basic Practice Questions", 1.0))
-                
-            # Phase 2: Practice + Sectional Mocks (60-80%)
-            elif syllabus_percent < 80:
-                strategies.append(("Learning", "Advanced Concept Revision", 1.0))
-                strategies.append(("Practice", "Moderate Practice (50 Questions)", 1.5))
-                
-                # Sectional Mock after 50%
-                if syllabus_percent >= 50:
-                    strategies.append(("Test", "Sectional Mock (Subject-wise)", 1.0))
+        Args:
+            topic_completion_history: ReviewCalendar (due-date index, cheap), or the legacy
+                dict of {topic_name: completion_date_string}, indexed on the fly
+                Example: {"Algebra Basics": "2024-01-10", "Geometry": "2024-01-05"}
+            subject: Current subject being processed
+            today: date to count from (defaults to today)
             
-            # Phase 3: Full Mock Phase (80%+)
-            else:
-                strategies.append(("Practice", "Previous Year Questions", 1.0))
-                
-                # MOCK STRATEGY - Depends on exam_stage
-                if exam_stage == 'Prelims':
-                    # Pre exam phase - Only Prelims mocks
-                    if days_left < 20:
-                        # Crisis: 3 Prelims Full Mock Daily
-                        strategies.append(("Test", "Prelims Full Mock #1", 2.0))
-                        strategies.append(("Test", "Prelims Full Mock #2", 2.0))
-                        strategies.append(("Test", "Prelims Full Mock #3", 2.0))
-                        
-                    elif days_left < 40:
-                        strategies.append(("Test", "Prelims Full Mock (Daily)", 2.0))
-                        
-                    elif days_left < 120:
-                        strategies.append(("Test", "Prelims Full Mock (3-4 per week)", 1.5))
-                        
-                    else:
-                        strategies.append(("Test", "Prelims Full Mock (1-2 per week)", 1.0))
-                
-                else:  # exam_stage == 'Mains'
-                    # After Prelims - Only Mains mocks
-                    if days_left < 20:
-                        strategies.append(("Test", "Mains Full Mock #1", 2.5))
-                        strategies.append(("Test", "Mains Full Mock #2", 2.5))
-                    elif days_left < 40:
-                        strategies.append(("Test", "Mains Full Mock (Daily)", 2.5))
-                    else:
-                        strategies.append(("Test", "Mains Full Mock (2-3 per week)", 2.0))
+        Returns:
+            list of review task tuples: [(type, description, duration), ...]
+        """
+        if not topic_completion_history:
+            return []
         
-        # ============================================
-        # REPEATER STRATEGY
-        # ============================================
-        else:
-            # MOCK STRATEGY - Progressive for both Pre and Mains
-            
-            if exam_stage == 'Prelims':
-                # Before Prelims Exam
-                
-                if days_left < 30:
-                    # Critical Phase: Only Prelims Mocks (2-3 daily)
-                    strategies.append(("Revision", "Rapid Fire Formulas", 1.0))
-                    strategies.append(("Test", "Prelims Full Mock #1", 2.0))
-                    strategies.append(("Test", "Prelims Full Mock #2", 2.0))
-                    strategies.append(("Test", "Prelims Full Mock #3 (Optional)", 1.5))
-                    strategies.append(("Practice", "Error Analysis", 1.0))
-                    
-                elif days_left < 60:
-                    # Near Phase: Daily Full Mock (Both Pre + Mains)
-                    strategies.append(("Revision", "Chapter-wise Revision", 1.0))
-                    strategies.append(("Practice", "High-Difficulty Questions", 1.5))
-                    strategies.append(("Test", "Prelims Full Mock (Daily)", 2.0))
-                    strategies.append(("Test", "Mains Full Mock", 2.5))  # 1 per day
-                    
-                elif days_left < 120:
-                    # Moderate Phase: 2 Pre + 1 Mains per week
-                    strategies.append(("Revision", "Topic-wise Revision", 1.0))
-                    strategies.append(("Practice", "Previous Year Questions", 1.5))
-                    strategies.append(("Test", "Prelims Full Mock (2 per week)", 1.0))
-                    strategies.append(("Test", "Mains Full Mock (1 per week)", 1.0))
-                    
-                else:
-                    # Far Phase: 2 Pre + 1 Mains per week
-                    strategies.append(("Revision", "Concept Revision", 1.5))
-                    strategies.append(("Practice", "Advanced Practice", 1.5))
-                    strategies.append(("Test", "Prelims Full Mock (2 per week)", 1.0))
-                    strategies.append(("Test", "Mains Full Mock (1 per week)", 1.0))
-            
-            else:  # exam_stage == 'Mains'
-                # After Prelims - Only Mains Mocks
-                if days_left < 30:
-                    strategies.append(("Revision", "Mains Topics Rapid Revision", 1.5))
-                    strategies.append(("Test", "Mains Full Mock #1", 2.5))
-                    strategies.append(("Test", "Mains Full Mock #2", 2.5))
-                    strategies.append(("Practice", "Answer Writing Practice", 1.5))
-                    
-                elif days_left < 60:
-                    strategies.append(("Revision", "Mains Syllabus Revision", 1.5))
-                    strategies.append(("Test", "Mains Full Mock (Daily)", 2.5))
-                    strategies.append(("Practice", "Descriptive Practice", 1.5))
-                    
-                else:
-                    strategies.append(("Revision", "Mains Topics Deep Dive", 2.0))
-                    strategies.append(("Test", "Mains Full Mock (2-3 per week)", 2.0))
-                    strategies.append(("Practice", "Essay Writing", 1.0))
+        calendar = topic_completion_history
+        if not isinstance(calendar, ReviewCalendar):
+            calendar = ReviewCalendar.from_history(topic_completion_history)
         
-        return strategies
-
-    def generate_task(self, subject, level, exam_stage, days_left, user_type='repeater', syllabus_percent=0, daily_hours=6, topic_progress=None, completion_history=None, topic_completion_history=None):
+        return calendar.due(today)
+    
+    def generate_task(self, subject, level, exam_stage, days_left, user_type='repeater', syllabus_percent=0, daily_hours=6, topic_progress=None, completion_history=None, topic_completion_history=None, today=None, strategies=None):
         """
         Generate tasks with proper coaching logic + Topic Filtering + Subject Priority + Sequential Progress
         MAX 10 TASKS LIMIT ENFORCED + PERFORMANCE-BASED ADAPTATION + SPACED REPETITION (3/7/21)
         
         topic_progress: dict {"Math": 15, "English": 8} - last completed topic ID per subject
         completion_history: dict {"Math": 0.75, "English": 0.50} - completion rates for adaptive learning
-        topic_completion_history: dict {"Algebra": "2024-01-10"} - topic completion dates for spaced repetition
+        topic_completion_history: dict {"Algebra": "2024-01-10"} or ReviewCalendar - for spaced repetition
+        today: date used for spaced repetition (defaults to today)
+        strategies: precomputed get_strategy() result (optional)
+        
+        Returns list of Task (serialize with tasks.tasks_to_wire at the API edge)
         """
-        strategies = self.get_strategy(subject, level, exam_stage, days_left, syllabus_percent, user_type, daily_hours)
+        if strategies is None:
+            with stage("strategy"):
+                strategies = self.get_strategy(subject, level, exam_stage, days_left, syllabus_percent, user_type, daily_hours)
         if not strategies:
             return []
         
         # FEATURE #1: Add spaced repetition review tasks (3/7/21 day reviews)
         if topic_completion_history:
-            spaced_tasks = self.get_spaced_repetition_tasks(topic_completion_history, subject)
+            with stage("reviews"):
+                spaced_tasks = self.get_spaced_repetition_tasks(topic_completion_history, subject, today)
             if spaced_tasks:
                 # Prepend review tasks (high priority)
-                strategies = spaced_tasks + strategies
-                print(f"[SPACED] Added {len(spaced_tasks)} review tasks for {subject}")
+                strategies = spaced_tasks + list(strategies)
+                spaced_log.debug("Added %d review tasks for %s", len(spaced_tasks), subject)
         
         # FEATURE #2: Get performance-based adjustments (initialize here)
         performance_multiplier = 1.0
@@ -285,40 +476,41 @@ class StrictoBrain:
             adjustments = self.get_performance_adjustment({subject: completion_history[subject]})
             if subject in adjustments:
                 performance_multiplier = adjustments[subject]['task_multiplier']
-                print(f"[PERFORMANCE] {subject}: Applying {performance_multiplier}x task adjustment")
+                adapt_log.debug("%s: Applying %sx task adjustment", subject, performance_multiplier)
 
         generated_tasks = []
-        subject_topics = self.kb[self.kb['Subject'] == subject] if subject in self.kb['Subject'].values else pd.DataFrame()
         
+        # TOPIC SELECTION: precomputed TopicIndex (no per-request DataFrame scans)
         # CRITICAL FIX: Filter Mains topics for beginners
-        if user_type == 'beginner' and syllabus_percent < 80:
-            # Exclude topics containing "Mains Level" or "mains level"
-            if not subject_topics.empty:
-                subject_topics = subject_topics[
-                    ~subject_topics['Topic'].str.contains('mains level', case=False, na=False) &
-                    ~subject_topics['SubTopic'].str.contains('mains level', case=False, na=False)
-                ]
-                print(f"[FILTER] Removed Mains topics for beginner ({syllabus_percent}%). Remaining: {len(subject_topics)}")
-        
-        # SEQUENTIAL PROGRESS: Filter topics based on last completed ID
+        exclude_mains = user_type == 'beginner' and syllabus_percent < 80
+        if exclude_mains and subject in self.topic_index and filter_log.isEnabledFor(logging.DEBUG):
+            filter_log.debug("Removed Mains topics for beginner (%s%%). Remaining: %d", syllabus_percent, self.topic_index.remaining(subject, None, True))
+        
+        # SEQUENTIAL PROGRESS: Next topic after the last completed ID
+        last_id = None
         if topic_progress and subject in topic_progress:
             last_id = topic_progress[subject]
-            if not subject_topics.empty and 'ID' in subject_topics.columns:
-                # Get topics AFTER the last completed one
-                subject_topics = subject_topics[subject_topics['ID'] > last_id]
-                print(f"[PROGRESS] {subject}: Filtered to topics after ID {last_id}. Remaining: {len(subject_topics)}")
+            if subject in self.topic_index and progress_log.isEnabledFor(logging.DEBUG):
+                progress_log.debug("%s: Filtered to topics after ID %s. Remaining: %d", subject, last_id, self.topic_index.remaining(subject, last_id, exclude_mains))
+        
+        with stage("topics"):
+            topic_row = self.topic_index.next_topic(subject, last_id, exclude_mains)
         
         # PRIORITY LOGIC: Time multiplier based on proficiency
         # Weak = 1.5x time, Average = 1.0x time, Strong = 0.7x time
         time_multiplier = 1.0  # Default
         if level == 'weak':
             time_multiplier = 1.5  # 50% MORE time for weak subjects
-            print(f"[PRIORITY] Weak subject {subject}: 1.5x time allocation")
+            priority_log.debug("Weak subject %s: 1.5x time allocation", subject)
         elif level == 'strong':
             time_multiplier = 0.7  # 30% LESS time for strong subjects
-            print(f"[PRIORITY] Strong subject {subject}: 0.7x time (maintenance mode)")
+            priority_log.debug("Strong subject %s: 0.7x time (maintenance mode)", subject)
         else:
-            print(f"[PRIORITY] Average subject {subject}: 1.0x time (standard)")
+            priority_log.debug("Average subject %s: 1.0x time (standard)", subject)
+        
+        # Shared by every task of this subject
+        priority = Priority.HIGH if days_left < 30 else Priority.NORMAL
+        strategy_label = f"{user_type.upper()} | {exam_stage} | {days_left}D"
         
         for strategy_type, strategy_desc, duration_hrs in strategies:
             # Apply time multiplier
@@ -328,31 +520,25 @@ class StrictoBrain:
             if strategy_type == "Test" and "Mock" in strategy_desc:
                 adjusted_duration = min(adjusted_duration, 1.0)  # CAP at 1 hour MAX
             
-            task_obj = {
-                "subject": subject,
-                "type": strategy_type,
-                "task": strategy_desc,
-                "duration": f"{adjusted_duration} Hrs",
-                "priority": "high" if days_left < 30 else "normal",
-                "strategy": f"{user_type.upper()} | {exam_stage} | {days_left}D"
-            }
+            topic = sub_topic = None
+            task_desc = strategy_desc
             
-            # Add topic if available - SEQUENTIAL SELECTION (not random)
-            if not subject_topics.empty and strategy_type in ["Learning", "Revision"]:
-                # Use first available topic (sequential progression)
             # Add topic if available - SEQUENTIAL SELECTION (not random)
             # EXCLUDE daily habits: Editorial Reading and Speed Calculation
-             is_daily_habit = ("Editorial Reading" in strategy_desc or "Speed Calculation" in strategy_desc)
+            # EXCLUDE spaced reviews: they already name the topic being reviewed
+            is_daily_habit = ("Editorial Reading" in strategy_desc or "Speed Calculation" in strategy_desc)
+            is_spaced_review = "-Day Review:" in strategy_desc
                 
-            if not subject_topics.empty and strategy_type in ["Learning", "Revision"] and not is_daily_habit:
+            if topic_row is not None and strategy_type in ("Learning", "Revision") and not is_daily_habit and not is_spaced_review:
                 # Use first available topic (sequential progression)
-                topic_row = subject_topics.iloc[0]
-                task_obj["topic"] = str(topic_row.get('Topic', '')).replace('nan', '')
-                task_obj["sub_topic"] = str(topic_row.get('SubTopic', '')).replace('nan', '')
-                task_obj["task"] = f"{strategy_desc}: {task_obj['topic']} - {task_obj['sub_topic']}"
+                topic = topic_row.topic
+                sub_topic = topic_row.sub_topic
+                task_desc = f"{strategy_desc}: {topic} - {sub_topic}"
             
-            
-            generated_tasks.append(task_obj)
+            generated_tasks.append(Task(
+                subject, TASK_TYPES[strategy_type], task_desc, to_minutes(adjusted_duration),
+                priority, strategy_label, topic, sub_topic
+            ))
         
         # ============================================
         # PERFORMANCE-BASED TASK COUNT ADJUSTMENT
@@ -362,40 +548,318 @@ class StrictoBrain:
             if target_count < len(generated_tasks):
                 # Reduce tasks for struggling students
                 generated_tasks = generated_tasks[:target_count]
-                print(f"[ADAPT] Reduced from {len(generated_tasks)} to {target_count} tasks due to performance")
+                adapt_log.debug("%s: Reduced to %d tasks due to performance", subject, target_count)
         
         # ============================================
         # TASK LIMIT CONTROL: MAX 10 TASKS
         # ============================================
-        MAX_TASKS_LIMIT = 10
-        if len(generated_tasks) > MAX_TASKS_LIMIT:
-            print(f"⚠️ [LIMIT] Generated {len(generated_tasks)} tasks, reducing to {MAX_TASKS_LIMIT}")
-            
-            # Smart Reduction Strategy:
-            # 1. Keep all high-priority tasks
-            # 2. Keep daily habits (Editorial, Calculation)
-            # 3. Reduce optional/lower-priority tasks
-            
-            priority_tasks = []
-            optional_tasks = []
-            
-            for task in generated_tasks:
-                # Keep high priority and daily habits
-                if task['priority'] == 'high' or 'Editorial' in task['task'] or 'Calculation Drill' in task['task']:
-                    priority_tasks.append(task)
-                else:
-                    optional_tasks.append(task)
+        with stage("trim"):
+            generated_tasks = apply_task_limit(generated_tasks)
+        
+        return generated_tasks
+
+    def fallback_tasks(self, subject):
+        """Generic fallback when the rule engine produced nothing for a subject"""
+        api_log.info("Fallback triggered for %s", subject)
+        FALLBACKS.inc("generic")
+        return [Task(subject, None, f"Review {subject} Notes", 60, None, "Fallback", topic="General Revision", impact="Fallback")]
+
+    def generate_plans_bulk(self, profiles, today=None, workers=None, chunk_size=500):
+        """
+        Cohort plan generation (nightly precompute). See bulk_plans.generate_plans_bulk
+        
+        Returns:
+            iterator of plans, in the same order as `profiles`
+        """
+        from bulk_plans import generate_plans_bulk
+        return generate_plans_bulk(self, profiles, today, workers, chunk_size)
+
+    def generate_plan(self, profile, today=None):
+        """
+        Generate the WHOLE day's protocol (all subjects) for one user in a single call.
+        Exam date, days_left and "today" are resolved once and shared by every subject;
+        MAX_TASKS_LIMIT is applied to the combined day instead of per subject.
+        
+        Args:
+            profile: dict (same keys as /get-daily-task, plus per-user state)
+                Example: {
+                    "levels": {"Math": "weak", "English": "strong"},  # subject -> proficiency
+                    "examStage": "Prelims", "examDate": "2025-06-15",
+                    "userType": "beginner", "syllabusCompleted": 40, "dailyHours": 6,
+                    "topicProgress": {"Math": 15},
+                    "completionHistory": {"Math": 0.45},
+                    "activity": {...},  # analytics.ActivityRollup.to_compact(); rates for subjects missing above
+                    "topicCompletionHistory": {"Math": {"Algebra": "2024-01-10"}},
+                    "reviewSchedule": {"English": {...}},  # ReviewCalendar.to_compact(), preferred
+                    "reviewPolicy": "ease",  # see spaced_repetition.REVIEW_POLICIES (default "fixed")
+                    "schedule": "packed"  # fit the day to dailyHours (day_scheduler.pack_day); default: 10-task cap
+                }
+                Subjects are generated in "levels" order (DEFAULT_SUBJECTS if absent).
+            today: date to plan for (defaults to today)
+        
+        Returns:
+            dict {"tasks": [Task, ...], "subjects": {subject: task_count}, "days_left": int,
+                  "exam_date": "YYYY-MM-DD", "note": str}
+            plus "budget_minutes" and "planned_minutes" for packed schedules
+        """
+        today = today or date.today()
+        context = self._plan_context(profile, today)
+        days_left = context["days_left"]
+        
+        day_tasks, packed = self._plan_day(context, today, days_left, context["syllabus_percent"], context["topic_progress"])
+        
+        plan = {
+            "tasks": day_tasks,
+            "subjects": self._subject_counts(context["subjects"], day_tasks),
+            "days_left": days_left,
+            "exam_date": context["exam_date"].isoformat(),
+            "note": plan_note(context["note"], days_left, context["user_type"], context["exam_stage"])
+        }
+        if packed is not None:
+            plan["budget_minutes"] = packed.budget
+            plan["planned_minutes"] = packed.minutes
+        return plan
+
+    def generate_calendar(self, profile, start=None, end=None):
+        """
+        Whole-horizon roadmap: one day plan per date from `start` to `end`, in a single pass.
+        
+        Each day assumes the previous days were done as planned: the topic pointer moves
+        past every topic that got a task, completed topics enter the review calendar,
+        scheduled reviews count as done, and syllabusCompleted grows with the topics
+        covered - so phase transitions (syllabus and days-left bands) happen on the way.
+        
+        Args:
+            profile: same dict as generate_plan (state as of `start`)
+            start: first day (defaults to today)
+            end: last day, inclusive (defaults to the day before the exam)
+        
+        Yields:
+            dict {"date": "YYYY-MM-DD", "days_left": int, "syllabus_percent": int,
+                  "tasks": [Task, ...], "subjects": {subject: task_count}}
+            plus "budget_minutes" and "planned_minutes" for packed schedules
+        """
+        start = start or date.today()
+        context = self._plan_context(profile, start)
+        end = end or context["exam_date"] - timedelta(days=1)
+        subjects = context["subjects"]
+        review_policy = context["review_policy"]
+        review_calendars = context["review_calendars"]
+        for subject in subjects:
+            if subject not in review_calendars:
+                ease = review_policy.ease_for(context["completion_history"].get(subject))
+                review_calendars[subject] = ReviewCalendar(review_policy, ease)
+        
+        # Simulated state (the profile itself is never mutated)
+        topic_progress = dict(context["topic_progress"])
+        base_percent = context["syllabus_percent"]
+        to_cover = sum(self.topic_index.remaining(s, topic_progress.get(s)) for s in subjects)
+        covered = 0
+        
+        day = start
+        while day <= end:
+            days_left = (context["exam_date"] - day).days
+            syllabus_percent = base_percent
+            if to_cover:
+                syllabus_percent = min(100, base_percent + (100 - base_percent) * covered // to_cover)
+            day_tasks, packed = self._plan_day(context, day, days_left, syllabus_percent, topic_progress)
             
-            # Calculate how many optional tasks we can keep
-            remaining_slots = MAX_TASKS_LIMIT - len(priority_tasks)
+            for task in day_tasks:
+                if "-Day Review:" in task.task:
+                    review_calendars[task.subject].record_review(task.task.split(": ", 1)[1], day)
+            exclude_mains = context["user_type"] == 'beginner' and syllabus_percent < 80
+            for subject in subjects:
+                row = self.topic_index.next_topic(subject, topic_progress.get(subject), exclude_mains)
+                if row is not None and any(t.subject == subject and t.topic == row.topic for t in day_tasks):
+                    topic_progress[subject] = row.id
+                    review_calendars[subject].record_completion(row.topic, day)
+                    covered += 1
             
-            if remaining_slots > 0:
-                # Keep the most important optional tasks
-                generated_tasks = priority_tasks + optional_tasks[:remaining_slots]
-            else:
-                # If even priority tasks exceed limit, keep first 10
-                generated_tasks = priority_tasks[:MAX_TASKS_LIMIT]
+            calendar_day = {
+                "date": day.isoformat(),
+                "days_left": days_left,
+                "syllabus_percent": syllabus_percent,
+                "tasks": day_tasks,
+                "subjects": self._subject_counts(subjects, day_tasks),
+            }
+            if packed is not None:
+                calendar_day["budget_minutes"] = packed.budget
+                calendar_day["planned_minutes"] = packed.minutes
+            yield calendar_day
             
-            print(f"✅ [LIMIT] Reduced to {len(generated_tasks)} tasks (Priority: {len(priority_tasks)}, Optional: {min(remaining_slots, len(optional_tasks))})")
+            if days_left % 30 == 0:
+                for calendar in review_calendars.values():
+                    calendar.prune(day)
+            day += timedelta(days=1)
+
+    def complete_task(self, profile, plan_tasks, completed, done=(), today=None):
+        """
+        Incremental re-plan after one task is done: only the completed task's subject
+        is regenerated, and only the difference to the current plan is returned.
         
-        return generated_tasks
+        Updates, for that subject: the topic pointer (a topic task moves it past its
+        topic), the review calendar (the topic enters it / a review counts as done)
+        and the completion rate, if the profile has one (start-of-day rate blended
+        with today's share of the subject's tasks done, COMPLETION_RATE_WEIGHT;
+        never lowered mid-day).
+        
+        Args:
+            profile: generate_plan profile (state as of the start of the day)
+            plan_tasks: the current plan's Tasks
+            completed: the Task just completed
+            done: Tasks completed earlier today (kept out of the delta)
+            today: plan date (defaults to today)
+        
+        Returns:
+            dict {"added": [Task], "removed": [Task], "changed": [(old Task, new Task)],
+                  "state": {"topicProgress": {subject: id}, "completionHistory": {subject: rate},
+                            "reviewSchedule": {subject: compact ReviewCalendar}}}
+        """
+        today = today or date.today()
+        subject = normalize_subject(completed.subject)
+        context = self._plan_context(profile, today, review_subjects=(subject,))
+        syllabus_percent = context["syllabus_percent"]
+        exclude_mains = context["user_type"] == 'beginner' and syllabus_percent < 80
+        
+        review_policy = context["review_policy"]
+        completion_history = context["completion_history"]
+        calendar = context["review_calendars"].get(subject)
+        if calendar is None:
+            calendar = context["review_calendars"][subject] = ReviewCalendar(review_policy, review_policy.ease_for(completion_history.get(subject)))
+        
+        # Topic pointer + review calendar
+        topic_progress = context["topic_progress"]
+        if completed.topic is not None:
+            last_id = topic_progress.get(subject)
+            row = self.topic_index.next_topic(subject, last_id, exclude_mains)
+            if row is None or row.topic != completed.topic:
+                row = self.topic_index.find(subject, completed.topic, completed.sub_topic)
+            if row is not None and (last_id is None or row.id > last_id):
+                topic_progress[subject] = row.id
+            calendar.record_completion(completed.topic, today)
+        elif "-Day Review:" in completed.task:
+            calendar.record_review(completed.task.split(": ", 1)[1], today)
+        
+        # Completion rate: today's share of this subject's tasks, blended into the history.
+        # The day is not over, so a completion can raise the rate but never lower it
+        finished = {(t.subject, t.task) for t in done} | {(completed.subject, completed.task)}
+        subject_plan = [t for t in plan_tasks if t.subject == subject]
+        previous = completion_history.get(subject)
+        if previous is not None and subject_plan:
+            share = sum((t.subject, t.task) in finished for t in subject_plan) / len(subject_plan)
+            rate = (1 - COMPLETION_RATE_WEIGHT) * previous + COMPLETION_RATE_WEIGHT * share
+            completion_history[subject] = round(max(previous, rate), 4)
+        
+        new_tasks = self.generate_task(
+            subject, context["levels"].get(subject, 'average'), context["exam_stage"], context["days_left"], context["user_type"],
+            syllabus_percent, context["daily_hours"], topic_progress, completion_history, calendar, today
+        ) or self.fallback_tasks(subject)
+        
+        # Diff by strategy: a finished strategy is not handed out again today
+        finished_keys = {(t.type, strategy_text(t)) for t in subject_plan if (t.subject, t.task) in finished}
+        old = {(t.type, strategy_text(t)): t for t in subject_plan if (t.subject, t.task) not in finished}
+        new = {}
+        for task in new_tasks:
+            key = (task.type, strategy_text(task))
+            if key not in finished_keys:
+                new.setdefault(key, task)
+        
+        changed = []
+        for key in old.keys() & new.keys():
+            before, after = old[key], new[key]
+            if context["packed"]:
+                after = after._replace(minutes=before.minutes)  # keep the packed time budget
+            if after != before:
+                changed.append((before, after))
+        removed = [task for key, task in old.items() if key not in new]
+        added = [task for key, task in new.items() if key not in old]
+        # Cross-subject cap still holds for the whole day
+        added = added[:max(0, MAX_TASKS_LIMIT - (len(plan_tasks) - len(removed)))]
+        
+        return {
+            "added": added,
+            "removed": removed,
+            "changed": changed,
+            "state": {
+                "topicProgress": {subject: topic_progress[subject]} if subject in topic_progress else {},
+                "completionHistory": {subject: completion_history[subject]} if subject in completion_history else {},
+                "reviewSchedule": {subject: calendar.to_compact()},
+            },
+        }
+
+    def _plan_context(self, profile, today, review_subjects=None):
+        """
+        Everything generate_plan/generate_calendar read from a profile, parsed once.
+        Review calendars are built only for `review_subjects` (None = all).
+        """
+        exam_date, system_note = resolve_exam_date(profile.get('examDate'), today)
+        
+        levels = {normalize_subject(subject): str(level).lower() for subject, level in (profile.get('levels') or {}).items()}
+        completion_history = {normalize_subject(s): v for s, v in (profile.get('completionHistory') or {}).items()}
+        if profile.get('activity'):
+            # Server-side rollup (analytics.ActivityRollup.to_compact()): recent rates fill the gaps
+            from analytics import ActivityRollup
+            rates = ActivityRollup.from_compact(profile['activity'], normalize_subject, today).completion_rates(today)
+            completion_history = {**rates, **completion_history}
+        # Review calendars under the requested interval policy (ease factor from the completion rate);
+        # compact calendars (due-date index) win over raw completion histories
+        review_policy = get_policy(profile.get('reviewPolicy'))
+        review_calendars = {}
+        for s, history in (profile.get('topicCompletionHistory') or {}).items():
+            s = normalize_subject(s)
+            if review_subjects is not None and s not in review_subjects:
+                continue
+            review_calendars[s] = ReviewCalendar.from_history(history, review_policy, review_policy.ease_for(completion_history.get(s)))
+        for s, compact in (profile.get('reviewSchedule') or {}).items():
+            s = normalize_subject(s)
+            if review_subjects is not None and s not in review_subjects:
+                continue
+            review_calendars[s] = ReviewCalendar.from_compact(compact, review_policy, review_policy.ease_for(completion_history.get(s)))
+        
+        return {
+            "exam_date": exam_date,
+            "days_left": (exam_date - today).days,
+            "note": system_note,
+            "exam_stage": profile.get('examStage', 'Prelims'),
+            "user_type": str(profile.get('userType', 'repeater')).lower(),
+            "syllabus_percent": int(profile.get('syllabusCompleted', 0)),
+            "daily_hours": int(profile.get('dailyHours', 6)),
+            "levels": levels,
+            "subjects": list(levels) or list(DEFAULT_SUBJECTS),
+            "topic_progress": {normalize_subject(s): v for s, v in (profile.get('topicProgress') or {}).items()},
+            "completion_history": completion_history,
+            "review_policy": review_policy,
+            "review_calendars": review_calendars,
+            "packed": profile.get('schedule') == 'packed',
+        }
+
+    def _plan_day(self, context, today, days_left, syllabus_percent, topic_progress):
+        """
+        One day's combined tasks for a parsed profile.
+        
+        Returns:
+            (tasks, PackedDay or None)
+        """
+        day_tasks = []
+        for subject in context["subjects"]:
+            subject_tasks = self.generate_task(
+                subject, context["levels"].get(subject, 'average'), context["exam_stage"], days_left, context["user_type"],
+                syllabus_percent, context["daily_hours"], topic_progress, context["completion_history"],
+                context["review_calendars"].get(subject), today
+            )
+            day_tasks.extend(subject_tasks or self.fallback_tasks(subject))
+        
+        if context["packed"]:
+            # Fit the day to dailyHours (minutes budget) instead of a flat task count
+            with stage("pack"):
+                packed = pack_day(day_tasks, context["daily_hours"] * 60, MAX_TASKS_LIMIT)
+            return packed.tasks, packed
+        # Cross-subject cap: MAX_TASKS_LIMIT for the whole day
+        return apply_task_limit(day_tasks), None
+
+    @staticmethod
+    def _subject_counts(subjects, day_tasks):
+        subject_counts = {subject: 0 for subject in subjects}
+        for task in day_tasks:
+            subject_counts[task.subject] = subject_counts.get(task.subject, 0) + 1
+        return subject_counts
@@ -0,0 +1,258 @@
+"""
+Bulk cohort plan generation (nightly precompute of tomorrow's plans).
+
+Usage:
+    python bulk_plans.py profiles.jsonl -o plans.jsonl
+    python bulk_plans.py profiles.csv --date 2025-01-11 --workers 8 > plans.jsonl
+
+Input: one profile per line (JSONL) or per row (CSV), same fields as /get-daily-plan
+plus an optional "userId". CSV cells holding JSON objects (levels, topicProgress, ...)
+are decoded. Output: one JSON line per profile, in input order:
+    {"userId": "...", "plan": {...}}
+A row that cannot be read or planned gets {"error": "..."} as its plan instead.
+With --compact, each plan's tasks are {"fields": [...], "rows": [[...], ...]}.
+With --progress-db, stored progress is filled in for each profile's userId.
+With --pack, each day is fitted to the profile's dailyHours (see day_scheduler).
+"""
+import argparse
+import csv
+import json
+import logging
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+from itertools import islice, repeat
+
+from brain_engine import StrictoBrain, resolve_exam_date, strategy_key
+from logging_setup import ROOT_LOGGER, configure_logging, get_logger
+from progress_store import ProgressStore
+from syllabus_loader import DEFAULT_SYLLABUS_DIR, load_syllabus
+from tasks import plan_to_wire
+
+log = get_logger("BULK")
+
+# Profiles read (and re-ordered by strategy group) per round trip to the pool
+BATCH_SIZE = 20000
+
+# DictReader key for the fields of a CSV row beyond the header's
+EXTRA_FIELDS = "__extra__"
+
+# Per-process brain, built once by the pool initializer
+_WORKER_BRAIN = None
+
+
+class ProfileError(ValueError):
+    """A profile row that could not be read or prepared; it is planned as {"error": ...}."""
+
+    def __init__(self, message, user_id=None):
+        super().__init__(message)
+        self.user_id = user_id
+
+
+def _init_worker(task_db, log_level):
+    global _WORKER_BRAIN
+    # Spawned workers do not inherit the parent's logging setup
+    configure_logging({"level": log_level})
+    _WORKER_BRAIN = StrictoBrain(task_db)
+
+
+def _plan_chunk(profiles, today, brain=None):
+    """Plan a chunk of profiles (strategies come from the shared STRATEGY_TABLE)."""
+    brain = brain or _WORKER_BRAIN
+    plans = []
+    for profile in profiles:
+        if isinstance(profile, ProfileError):
+            plans.append({"error": str(profile)})
+            continue
+        try:
+            plans.append(brain.generate_plan(profile, today))
+        except Exception as e:
+            # One broken profile must not abort the whole night
+            plans.append({"error": str(e)})
+    return plans
+
+
+def profile_group(profile, today):
+    """
+    Sort key grouping profiles that share every subject's strategy:
+    (user_type, exam_stage, days_left band, syllabus phase, daily_hours >= 5)
+    """
+    try:
+        exam_date, _ = resolve_exam_date(profile.get('examDate'), today)
+        _, is_prelims, user_type, phase, band, ga_window, hours_5_plus = strategy_key(
+            None,
+            profile.get('examStage', 'Prelims'),
+            (exam_date - today).days,
+            int(profile.get('syllabusCompleted', 0)),
+            str(profile.get('userType', 'repeater')).lower(),
+            int(profile.get('dailyHours', 6)),
+        )
+    except (TypeError, ValueError, AttributeError):
+        # Malformed profile: let _plan_chunk report the error
+        return ("",)
+    return (user_type or "", is_prelims, band, ga_window, phase, hours_5_plus)
+
+
+def generate_plans_bulk(brain, profiles, today=None, workers=None, chunk_size=500):
+    """
+    Generate plans for many profiles, spreading chunks across a process pool.
+
+    Args:
+        brain: StrictoBrain whose knowledge base is shipped to every worker
+        profiles: iterable of profile dicts (see StrictoBrain.generate_plan)
+        today: date to plan for (defaults to today)
+        workers: process count (default: all cores, <= 1 runs in-process)
+        chunk_size: profiles per pool task
+
+    Returns:
+        iterator of plans, in the same order as `profiles`
+    """
+    today = today or date.today()
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    profiles = iter(profiles)
+
+    executor = None
+    if workers > 1:
+        log_level = logging.getLogger(ROOT_LOGGER).getEffectiveLevel()
+        executor = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(brain.kb, log_level))
+
+    try:
+        while True:
+            batch = list(islice(profiles, BATCH_SIZE))
+            if not batch:
+                break
+
+            # Neighbouring profiles share strategies -> same STRATEGY_TABLE rows stay hot per chunk
+            order = sorted(range(len(batch)), key=lambda i: profile_group(batch[i], today))
+            starts = range(0, len(order), chunk_size)
+            chunks = [[batch[i] for i in order[start:start + chunk_size]] for start in starts]
+
+            if executor:
+                results = executor.map(_plan_chunk, chunks, repeat(today))
+            else:
+                results = [_plan_chunk(chunk, today, brain) for chunk in chunks]
+
+            plans = [None] * len(batch)
+            for start, chunk_plans in zip(starts, results):
+                for offset, plan in enumerate(chunk_plans):
+                    plans[order[start + offset]] = plan
+
+            yield from plans
+    finally:
+        if executor:
+            executor.shutdown()
+
+
+def _csv_profile(row, number):
+    """Profile dict of one CSV row (JSON cells decoded); raises ProfileError if malformed."""
+    user_id = row.get('userId') or None
+    if EXTRA_FIELDS in row:
+        header = len(row) - 1
+        raise ProfileError(f"line {number}: {header + len(row[EXTRA_FIELDS])} fields, the header has {header}", user_id)
+    try:
+        return {
+            key: json.loads(value) if value.startswith(('{', '[')) else value
+            for key, value in row.items()
+            if value not in (None, '')
+        }
+    except ValueError as e:
+        raise ProfileError(f"line {number}: {e}", user_id) from e
+
+
+def read_profiles(path):
+    """
+    Stream profiles from a .jsonl or .csv file ('-' = JSONL on stdin).
+
+    A malformed row (extra CSV fields, bad JSON) is yielded as a ProfileError
+    naming its line, so the rows after it are still read and every row keeps
+    its place in the output.
+    """
+    if path.endswith('.csv'):
+        with open(path, newline='', encoding='utf-8') as f:
+            reader = csv.DictReader(f, restkey=EXTRA_FIELDS)
+            for row in reader:
+                try:
+                    profile = _csv_profile(row, reader.line_num)
+                except ProfileError as e:
+                    profile = e
+                yield profile
+    else:
+        f = sys.stdin if path == '-' else open(path, encoding='utf-8')
+        try:
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    profile = json.loads(line)
+                except ValueError as e:
+                    yield ProfileError(f"line {number}: {e}")
+                    continue
+                yield profile if isinstance(profile, dict) else ProfileError(f"line {number}: not a JSON object")
+        finally:
+            if f is not sys.stdin:
+                f.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompute daily plans for a cohort of profiles.")
+    parser.add_argument("profiles", help="profiles .jsonl/.csv ('-' for JSONL on stdin)")
+    parser.add_argument("-o", "--output", default="-", help="plans .jsonl (default: stdout)")
+    parser.add_argument("--date", help="plan date YYYY-MM-DD (default: tomorrow)")
+    parser.add_argument("--workers", type=int, default=None, help="process count (default: all cores)")
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--syllabus-dir", default=DEFAULT_SYLLABUS_DIR)
+    parser.add_argument("--log-level", default="WARNING", help="stricto log level (logs go to stderr)")
+    parser.add_argument("--compact", action="store_true", help="tasks as {fields, rows} instead of one dict per task")
+    parser.add_argument("--progress-db", help="fill each profile's state from this progress store (by userId)")
+    parser.add_argument("--pack", action="store_true", help="fit every plan to the profile's dailyHours (schedule=packed)")
+    args = parser.parse_args(argv)
+
+    configure_logging({"level": args.log_level})
+
+    plan_date = datetime.strptime(args.date, '%Y-%m-%d').date() if args.date else date.today() + timedelta(days=1)
+
+    brain = StrictoBrain(load_syllabus(args.syllabus_dir))
+
+    # Plans come back in input order: pair each with the userId recorded on the way in
+    user_ids = deque()
+
+    store = ProgressStore(args.progress_db) if args.progress_db else None
+
+    def tracked_profiles():
+        for profile in read_profiles(args.profiles):
+            if store is not None and not isinstance(profile, ProfileError):
+                try:
+                    profile = store.merge_profile(profile)
+                except Exception as e:
+                    profile = ProfileError(f"user {profile.get('userId')}: stored progress: {e}", profile.get('userId'))
+            if isinstance(profile, ProfileError):
+                log.warning("Profile skipped: %s", profile)
+                user_ids.append(profile.user_id)
+                yield profile
+                continue
+            user_ids.append(profile.get('userId'))
+            yield dict(profile, schedule='packed') if args.pack else profile
+
+    out = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    started = datetime.now()
+    count = 0
+    try:
+        for plan in brain.generate_plans_bulk(tracked_profiles(), plan_date, args.workers, args.chunk_size):
+            wire_plan = plan_to_wire(plan, args.compact)
+            out.write(json.dumps({"userId": user_ids.popleft(), "plan": wire_plan}, ensure_ascii=False, separators=(",", ":")))
+            out.write("\n")
+            count += 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        if store is not None:
+            store.close()
+
+    elapsed = (datetime.now() - started).total_seconds()
+    log.warning("%d plans for %s in %.1fs (%.0f profiles/min)", count, plan_date, elapsed, count / max(elapsed, 1e-9) * 60)
+
+
+if __name__ == "__main__":
+    main()
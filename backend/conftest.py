@@ -0,0 +1,56 @@
+import pandas as pd
+import pytest
+
+from brain_engine import StrictoBrain
+from server import create_app
+
+MATH_CSV = "id,topic,sub-topic\n1,Algebra,Basics\n2,Geometry,Triangles\n"
+
+
+@pytest.fixture
+def app_config(tmp_path):
+    """create_app() config over a two-topic Math syllabus in tmp_path."""
+    (tmp_path / "topics_math.csv").write_text(MATH_CSV)
+    return {
+        "SYLLABUS_DIR": tmp_path,
+        "SUBJECT_FILES": {"math": "Math"},
+        "SYLLABUS_POLL_SECONDS": 0,
+        "LOGGING": {"level": "WARNING"},
+    }
+
+
+@pytest.fixture
+def make_app(app_config):
+    """create_app(app_config plus overrides); every app built is stopped (and its store closed) afterwards."""
+    apps = []
+
+    def make(**config):
+        apps.append(create_app(dict(app_config, **config)))
+        return apps[-1]
+
+    yield make
+    for app in apps:
+        app.extensions["stricto_exams"].stop()
+        if app.extensions["stricto_store"] is not None:
+            app.extensions["stricto_store"].close()
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def brain():
+    """StrictoBrain over a one- or two-topic syllabus per subject."""
+    return StrictoBrain(pd.DataFrame({
+        "Subject": ["Math", "Math", "English", "Reasoning", "GA"],
+        "Topic": ["Algebra", "Geometry", "Nouns", "Puzzles", "Static GK"],
+        "SubTopic": ["Basics", "Triangles", "Types", "Seating", "Dams"],
+        "ID": [1, 2, 1, 1, 1],
+    }))
@@ -0,0 +1,149 @@
+"""
+Day packing: fit one day's candidate tasks (all subjects) into the student's
+actual time budget (dailyHours * 60 minutes) instead of a flat task count.
+
+    1. Pinned tasks (daily habits: Editorial, Calculation Drill) always stay;
+       if they alone overrun the budget they are shrunk proportionally. Only a
+       budget too small for one GRANULARITY step each drops habits (shortest
+       first); a zero budget is an empty day.
+    2. The rest are taken greedily by rank - high priority first, then the
+       n-th strategy of every subject before the (n+1)-th of any subject - while
+       they fit. A task that does not fit may be trimmed to the remaining time
+       (never below MIN_FRACTION of its length or MIN_MINUTES).
+    3. Leftover minutes are spread over the chosen tasks (up to MAX_STRETCH x
+       their length) so the day adds up to the budget exactly. Mocks never
+       grow past MOCK_CAP_MINUTES.
+
+Everything is a handful of list passes over ~10-40 tasks: microseconds per
+profile, so it runs inline on the request path and in bulk generation.
+"""
+from collections import namedtuple
+
+from tasks import Priority, TaskType
+
+# Minutes are handed out in whole steps of this size
+GRANULARITY = 5
+# A trimmed task keeps at least this share of its length, and at least MIN_MINUTES
+MIN_FRACTION = 0.5
+MIN_MINUTES = 15
+# A stretched task grows to at most this multiple of its length
+MAX_STRETCH = 1.5
+# USER REQUIREMENT: Mock MAX 1 HOUR (same cap as generate_task)
+MOCK_CAP_MINUTES = 60
+
+PackedDay = namedtuple("PackedDay", ["tasks", "budget", "minutes", "slack", "dropped"])
+
+
+def is_pinned(task):
+    """Daily habits, kept whenever the budget allows (same rule as apply_task_limit)."""
+    return 'Editorial' in task.task or 'Calculation Drill' in task.task
+
+
+def is_mock(task):
+    return task.type is TaskType.TEST and 'Mock' in task.task
+
+
+def _cap(task):
+    """Largest length a task may be stretched to."""
+    cap = max(task.minutes, int(task.minutes * MAX_STRETCH) // GRANULARITY * GRANULARITY)
+    if is_mock(task):
+        cap = min(cap, max(task.minutes, MOCK_CAP_MINUTES))
+    return cap
+
+
+def _floor(task):
+    """Smallest length a task may be trimmed to."""
+    floor = -(-int(task.minutes * MIN_FRACTION) // GRANULARITY) * GRANULARITY
+    return min(task.minutes, max(floor, MIN_MINUTES))
+
+
+def _shrink(minutes, budget):
+    """Scale `minutes` down to fit `budget` (each at least one GRANULARITY step; needs len * GRANULARITY <= budget)."""
+    total = sum(minutes)
+    if total <= 0:
+        return list(minutes)
+    scaled = [max(GRANULARITY, m * budget // total // GRANULARITY * GRANULARITY) for m in minutes]
+    # Rounding down left a few steps: give them back, longest task first
+    spare = budget - sum(scaled)
+    for i in sorted(range(len(scaled)), key=lambda i: -minutes[i]):
+        if spare < GRANULARITY:
+            break
+        if scaled[i] + GRANULARITY <= minutes[i]:
+            scaled[i] += GRANULARITY
+            spare -= GRANULARITY
+    return scaled
+
+
+def pack_day(tasks, budget, limit=10):
+    """
+    Choose and size tasks to fill `budget` minutes.
+
+    Args:
+        tasks: candidate Tasks in generation order (subject by subject, each
+            subject's strategies in rule order)
+        budget: available minutes (dailyHours * 60)
+        limit: task count cap (MAX_TASKS_LIMIT)
+
+    Returns:
+        PackedDay(tasks, budget, minutes, slack, dropped): the chosen Tasks in
+        generation order with adjusted minutes, their total, unused minutes and
+        how many candidates were left out
+    """
+    budget = max(0, int(budget))
+    if budget == 0:
+        return PackedDay([], 0, 0, 0, len(tasks))
+    pinned = [i for i, task in enumerate(tasks) if is_pinned(task)][:limit]
+    habits = set(pinned)  # never ranked with the rest, even if dropped below
+    if len(pinned) * GRANULARITY > budget:
+        # Not even one step each: keep the longest habits that get one
+        pinned = sorted(sorted(pinned, key=lambda i: (-tasks[i].minutes, i))[:budget // GRANULARITY])
+    minutes = {i: tasks[i].minutes for i in pinned}
+
+    used = sum(minutes.values())
+    if used > budget:
+        for i, m in zip(pinned, _shrink([minutes[i] for i in pinned], budget)):
+            minutes[i] = m
+        used = sum(minutes.values())
+
+    # Rank: high priority first, then round-robin over subjects by strategy position
+    position, seen = [], {}
+    for task in tasks:
+        position.append(seen.get(task.subject, 0))
+        seen[task.subject] = position[-1] + 1
+    pinned_set = set(pinned)
+    ranked = sorted(
+        (i for i in range(len(tasks)) if i not in habits),
+        key=lambda i: (tasks[i].priority is not Priority.HIGH, position[i], i),
+    )
+
+    slots = limit - len(pinned)
+    for i in ranked:
+        if slots <= 0 or used >= budget:
+            break
+        task = tasks[i]
+        remaining = budget - used
+        if task.minutes <= remaining:
+            minutes[i] = task.minutes
+        elif _floor(task) <= remaining:
+            minutes[i] = remaining // GRANULARITY * GRANULARITY
+        else:
+            continue
+        used += minutes[i]
+        slots -= 1
+
+    # Stretch: one step at a time to the task furthest below its cap (relative)
+    growable = [i for i in minutes if i not in pinned_set and minutes[i] < _cap(tasks[i])]
+    caps = {i: _cap(tasks[i]) for i in growable}
+    while used < budget and growable:
+        i = min(growable, key=lambda i: (minutes[i] / tasks[i].minutes, i))
+        step = min(GRANULARITY, budget - used, caps[i] - minutes[i])
+        minutes[i] += step
+        used += step
+        if minutes[i] >= caps[i]:
+            growable.remove(i)
+
+    chosen = [
+        task if minutes[i] == task.minutes else task._replace(minutes=minutes[i])
+        for i, task in enumerate(tasks) if i in minutes
+    ]
+    return PackedDay(chosen, budget, used, budget - used, len(tasks) - len(chosen))
@@ -0,0 +1,309 @@
+"""
+Golden-output regression harness for the brain engine.
+
+Enumerates a discretised input grid, runs every case, and compares hashes of the
+outputs with the recorded ones in golden/engine_grid.json. Any engine change that
+alters a plan, even by one minute or one character, shows up as a diff.
+
+Suites (product of the axes below, ~135k cases):
+    task   StrictoBrain.generate_task: subject x level x stage x days-left edges x
+           user type x syllabus phase edges x daily hours x topic progress x
+           completion rate (performance multiplier) x due spaced reviews
+    plan   StrictoBrain.generate_plan: whole days (combined 10-task cap, packed
+           schedules) over the same bands
+
+Days-left and syllabus values sit on both sides of every band edge in
+DAYS_LEFT_BANDS / SYLLABUS_PHASES. Cases run against a fixed built-in syllabus on a
+fixed date, so syllabus CSV edits never move the goldens.
+
+The golden file keeps, per suite, a 64-bit digest per chunk of CHUNK_SIZE cases
+(exact detection) and a 1-byte digest per case (which cases changed, for the
+report). Chunks run in parallel across cores.
+
+Usage:
+    python golden.py check [--workers N] [--show 5]    exit 1 on any difference
+    python golden.py record                             after an intended change
+"""
+import argparse
+import base64
+import contextlib
+import hashlib
+import json
+import logging
+import math
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+
+from logging_setup import ROOT_LOGGER, configure_logging, get_logger
+
+log = get_logger("GOLDEN")
+
+GOLDEN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden", "engine_grid.json")
+
+# Bump when the case encoding / hashing below changes
+FORMAT_VERSION = 1
+CHUNK_SIZE = 512
+TODAY = date(2025, 1, 10)
+
+# Fixed syllabus: a few topics per subject, mains-level ones included
+SYLLABUS = {
+    "Subject": ["Math"] * 4 + ["English"] * 3 + ["Reasoning"] * 3 + ["GA"] * 2,
+    "Topic": ["Number System", "Mains level DI", "Algebra", "Geometry",
+              "Nouns", "Mains level Cloze", "Pronouns",
+              "Syllogism", "Puzzles", "Mains level Input-Output",
+              "Banking Awareness", "Static GK"],
+    "SubTopic": ["Basics", "Caselets", "Practice: Mains level drill", "Triangles",
+                 "Basics", "Practice", "Errors",
+                 "Basics", "Seating", "Practice",
+                 "RBI Policy", ""],
+    "ID": [1, 2, 3, 4, 1, 2, 3, 1, 2, 3, 1, 2],
+}
+
+DAYS_LEFT = (5, 19, 20, 29, 30, 39, 40, 59, 60, 61, 119, 120, 200)
+SYLLABUS_PERCENT = (0, 49, 50, 59, 60, 79, 80, 100)
+DAILY_HOURS = (4, 5, 8)
+# No rate, and each side of the 0.5 / 0.8 multiplier bands (0.5-0.8 behaves like no rate)
+COMPLETION = (None, 0.3, 0.9)
+REVIEWS = (None, {"Number System": (TODAY - timedelta(days=3)).isoformat(), "Nouns": (TODAY - timedelta(days=7)).isoformat()})
+
+GRIDS = {
+    "task": {
+        "subject": ("Math", "English", "Reasoning", "GA"),
+        "level": ("weak", "average", "strong"),
+        "exam_stage": ("Prelims", "Mains"),
+        "days_left": DAYS_LEFT,
+        "user_type": ("beginner", "repeater"),
+        "syllabus_percent": SYLLABUS_PERCENT,
+        "daily_hours": (4, 5),  # the only cut point for a subject's tasks
+        "topic_progress": (None, 2),
+        "completion": COMPLETION,
+        "reviews": REVIEWS,
+    },
+    "plan": {
+        "levels": ({"Math": "weak", "English": "weak", "Reasoning": "weak", "GA": "weak"},
+                   {"Math": "weak", "English": "strong", "Reasoning": "average"},
+                   {"GA": "strong", "Math": "average"}),
+        "exam_stage": ("Prelims", "Mains"),
+        "days_left": DAYS_LEFT,
+        "user_type": ("beginner", "repeater"),
+        "syllabus_percent": SYLLABUS_PERCENT,
+        "daily_hours": DAILY_HOURS,
+        "completion": (None, {"Math": 0.3, "English": 0.9}),
+        "schedule": (None, "packed"),
+    },
+}
+
+
+# ==========================================
+# CASES
+# ==========================================
+
+def case_count(suite):
+    return math.prod(len(values) for values in GRIDS[suite].values())
+
+
+def case_inputs(suite, number):
+    """Axis values of case `number` (itertools.product order, last axis fastest)."""
+    values = {}
+    for axis, choices in reversed(GRIDS[suite].items()):
+        number, pick = divmod(number, len(choices))
+        values[axis] = choices[pick]
+    return dict(reversed(values.items()))
+
+
+def run_case(brain, suite, inputs):
+    """JSON-ready engine output for one case."""
+    from tasks import plan_to_wire, tasks_to_wire
+
+    if suite == "task":
+        subject = inputs["subject"]
+        tasks = brain.generate_task(
+            subject, inputs["level"], inputs["exam_stage"], inputs["days_left"], inputs["user_type"],
+            inputs["syllabus_percent"], inputs["daily_hours"],
+            {subject: inputs["topic_progress"]} if inputs["topic_progress"] is not None else None,
+            {subject: inputs["completion"]} if inputs["completion"] is not None else None,
+            inputs["reviews"], TODAY,
+        )
+        return tasks_to_wire(tasks)
+    profile = {
+        "levels": inputs["levels"],
+        "examStage": inputs["exam_stage"],
+        "examDate": (TODAY + timedelta(days=inputs["days_left"])).isoformat(),
+        "userType": inputs["user_type"],
+        "syllabusCompleted": inputs["syllabus_percent"],
+        "dailyHours": inputs["daily_hours"],
+        "completionHistory": inputs["completion"],
+        "schedule": inputs["schedule"],
+    }
+    return plan_to_wire(brain.generate_plan(profile, TODAY))
+
+
+def output_digest(output):
+    encoded = json.dumps(output, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str).encode("utf-8")
+    return hashlib.blake2b(encoded, digest_size=8).digest()
+
+
+def grid_fingerprint(suite):
+    """Changes whenever the suite's axes do (the goldens must then be re-recorded)."""
+    axes = json.dumps(GRIDS[suite], sort_keys=True, default=str)
+    return hashlib.blake2b(f"{FORMAT_VERSION}:{CHUNK_SIZE}:{TODAY}:{SYLLABUS}:{axes}".encode(), digest_size=8).hexdigest()
+
+
+# ==========================================
+# RUNNING
+# ==========================================
+
+_BRAIN = None
+
+
+def _brain():
+    global _BRAIN
+    if _BRAIN is None:
+        from brain_engine import StrictoBrain
+        _BRAIN = StrictoBrain(SYLLABUS)
+    return _BRAIN
+
+
+def run_chunk(suite, chunk):
+    """(64-bit chunk digest, 1-byte digest per case) for cases [chunk * CHUNK_SIZE, ...)."""
+    brain = _brain()
+    start = chunk * CHUNK_SIZE
+    whole = hashlib.blake2b(digest_size=8)
+    per_case = bytearray()
+    for number in range(start, min(start + CHUNK_SIZE, case_count(suite))):
+        digest = output_digest(run_case(brain, suite, case_inputs(suite, number)))
+        whole.update(digest)
+        per_case.append(digest[0])
+    return whole.digest(), bytes(per_case)
+
+
+def _run_chunk(args):
+    return run_chunk(*args)
+
+
+@contextlib.contextmanager
+def _engine_warnings_only():
+    """Hold the stricto loggers at WARNING or above (INFO lines such as fallbacks repeat across ~135k cases)."""
+    root = logging.getLogger(ROOT_LOGGER)
+    level = root.level
+    root.setLevel(max(level, logging.WARNING))
+    try:
+        yield
+    finally:
+        root.setLevel(level)
+
+
+def compute(suites=tuple(GRIDS), workers=None):
+    """
+    Digests of every suite, as stored in the golden file.
+
+    Args:
+        suites: suite names
+        workers: processes (None = one per core, 0 = this process)
+    """
+    jobs = [(suite, chunk) for suite in suites for chunk in range(-(-case_count(suite) // CHUNK_SIZE))]
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    with _engine_warnings_only():
+        if workers > 1:
+            with ProcessPoolExecutor(workers) as pool:
+                digests = list(pool.map(_run_chunk, jobs, chunksize=4))
+        else:
+            digests = [_run_chunk(job) for job in jobs]
+
+    results = {suite: {"grid": grid_fingerprint(suite), "cases": case_count(suite), "chunks": [], "case_digests": bytearray()}
+               for suite in suites}
+    for (suite, _), (chunk_digest, case_digests) in zip(jobs, digests):
+        results[suite]["chunks"].append(chunk_digest.hex())
+        results[suite]["case_digests"] += case_digests
+    for entry in results.values():
+        entry["case_digests"] = base64.b64encode(bytes(entry["case_digests"])).decode("ascii")
+    return results
+
+
+def record(path=GOLDEN_PATH, workers=None):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    golden = {"format": FORMAT_VERSION, "suites": compute(workers=workers)}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(golden, f, indent=1)
+        f.write("\n")
+    return golden
+
+
+def compare(golden, current):
+    """
+    Differences between two compute() results.
+
+    Returns:
+        {suite: {"grid_changed": bool, "chunks": [changed chunk numbers], "cases": [changed case numbers]}}
+        for every suite that differs. Cases are located by their 1-byte digests, so a
+        changed chunk may (rarely) list none of its cases.
+    """
+    differences = {}
+    for suite, entry in current.items():
+        old = golden.get(suite)
+        if old is None or old["grid"] != entry["grid"]:
+            differences[suite] = {"grid_changed": True, "chunks": [], "cases": []}
+            continue
+        chunks = [n for n, (a, b) in enumerate(zip(old["chunks"], entry["chunks"])) if a != b]
+        if not chunks:
+            continue
+        old_cases, new_cases = base64.b64decode(old["case_digests"]), base64.b64decode(entry["case_digests"])
+        cases = [number for chunk in chunks
+                 for number in range(chunk * CHUNK_SIZE, min((chunk + 1) * CHUNK_SIZE, entry["cases"]))
+                 if old_cases[number] != new_cases[number]]
+        differences[suite] = {"grid_changed": False, "chunks": chunks, "cases": cases}
+    return differences
+
+
+def check(path=GOLDEN_PATH, workers=None):
+    """compare() of the recorded goldens with the engine as it is now."""
+    with open(path, encoding="utf-8") as f:
+        golden = json.load(f)
+    if golden.get("format") != FORMAT_VERSION:
+        return {suite: {"grid_changed": True, "chunks": [], "cases": []} for suite in GRIDS}
+    return compare(golden["suites"], compute(workers=workers))
+
+
+def report(differences, show=5):
+    """Human-readable summary, with the inputs and current output of the first changed cases."""
+    lines = []
+    for suite, diff in differences.items():
+        if diff["grid_changed"]:
+            lines.append(f"{suite}: grid or format changed since the goldens were recorded (run: python golden.py record)")
+            continue
+        lines.append(f"{suite}: {len(diff['cases'])} of {case_count(suite)} cases changed ({len(diff['chunks'])} chunks)")
+        for number in diff["cases"][:show]:
+            inputs = case_inputs(suite, number)
+            output = run_case(_brain(), suite, inputs)
+            lines.append(f"  #{number} {json.dumps(inputs, default=str)}")
+            lines.append(f"    now: {json.dumps(output, ensure_ascii=False)[:400]}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("command", choices=("check", "record"))
+    parser.add_argument("--workers", type=int, help="processes (default: one per core)")
+    parser.add_argument("--show", type=int, default=5, help="changed cases reported per suite")
+    parser.add_argument("--path", default=GOLDEN_PATH)
+    parser.add_argument("--log-level", default="WARNING", help="stricto log level (logs go to stderr)")
+    args = parser.parse_args(argv)
+
+    configure_logging({"level": args.log_level})
+
+    if args.command == "record":
+        golden = record(args.path, args.workers)
+        log.warning("Recorded %d cases to %s", sum(entry['cases'] for entry in golden['suites'].values()), args.path)
+        return 0
+    differences = check(args.path, args.workers)
+    if not differences:
+        log.warning("%d cases match", sum(map(case_count, GRIDS)))
+        return 0
+    log.error("Engine output differs from the goldens:\n%s", report(differences, args.show))
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+"""
+Levelled, per-component logging for the brain and the API (replaces print()).
+
+Components (ADAPT, SPACED, FILTER, PROGRESS, PRIORITY, LIMIT, API, INIT, ...) log
+through get_logger("ADAPT") etc., children of the "stricto" logger, so one level
+switch silences the whole hot path.
+
+Configuration (env vars, or a dict passed to configure_logging):
+    STRICTO_LOG_LEVEL   root level for all components        (default INFO)
+    STRICTO_LOG_LEVELS  per-component overrides, "SPACED=DEBUG,API=WARNING"
+    STRICTO_LOG_FORMAT  "text" or "json"                     (default text)
+    STRICTO_LOG_SAMPLE  fraction of sub-WARNING records kept  (default 1.0)
+"""
+import json
+import logging
+import os
+import random
+import sys
+
+ROOT_LOGGER = "stricto"
+
+DEFAULTS = {
+    "level": "INFO",
+    "levels": "",
+    "format": "text",
+    "sample": 1.0,
+}
+
+
+def get_logger(component):
+    """Logger for one component: get_logger("ADAPT") -> "stricto.adapt"."""
+    return logging.getLogger(f"{ROOT_LOGGER}.{component.lower()}")
+
+
+def _component(record):
+    return record.name[len(ROOT_LOGGER) + 1:].upper() if record.name.startswith(ROOT_LOGGER + ".") else record.name
+
+
+class TextFormatter(logging.Formatter):
+    """'[ADAPT] Math: Low completion (45%)' - same shape as the old print() lines."""
+
+    def format(self, record):
+        line = f"[{_component(record)}] {record.getMessage()}"
+        if record.levelno >= logging.WARNING:
+            line = f"{record.levelname}: {line}"
+        if record.exc_info:
+            line += "\n" + self.formatException(record.exc_info)
+        return line
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, for log shippers."""
+
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "component": _component(record),
+            "msg": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    """Keep every WARNING+, and only `rate` of the chatter below it."""
+
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        return record.levelno >= logging.WARNING or random.random() < self.rate
+
+
+def _level(value):
+    """'debug' / 'DEBUG' / 10 / '10' -> a level logging accepts"""
+    value = str(value).strip().upper()
+    return int(value) if value.isdigit() else value
+
+
+def _settings(config):
+    settings = dict(DEFAULTS)
+    for key in DEFAULTS:
+        env_value = os.environ.get(f"STRICTO_LOG_{key.upper()}")
+        if env_value is not None:
+            settings[key] = env_value
+    settings.update(config or {})
+    return settings
+
+
+def configure_logging(config=None, stream=None):
+    """
+    Install the stricto handler (idempotent: re-running replaces it).
+
+    Args:
+        config: dict overriding env/defaults, e.g. {"level": "WARNING", "format": "json", "sample": 0.01}
+        stream: where records go (default: stderr)
+
+    Returns:
+        the "stricto" root logger
+    """
+    settings = _settings(config)
+    root = logging.getLogger(ROOT_LOGGER)
+
+    for handler in list(root.handlers):
+        if getattr(handler, "_stricto", False):
+            root.removeHandler(handler)
+
+    handler = logging.StreamHandler(stream or sys.stderr)
+    handler._stricto = True
+    handler.setFormatter(JsonFormatter() if str(settings["format"]).lower() == "json" else TextFormatter())
+    sample = float(settings["sample"])
+    if sample < 1.0:
+        handler.addFilter(SamplingFilter(sample))
+
+    root.addHandler(handler)
+    root.setLevel(_level(settings["level"]))
+    root.propagate = False
+
+    # Forget overrides from a previous configure_logging() call
+    for name, logger in logging.root.manager.loggerDict.items():
+        if name.startswith(ROOT_LOGGER + ".") and isinstance(logger, logging.Logger):
+            logger.setLevel(logging.NOTSET)
+
+    for override in filter(None, (part.strip() for part in str(settings["levels"]).split(","))):
+        component, _, level = override.partition("=")
+        get_logger(component.strip()).setLevel(_level(level))
+
+    return root
+
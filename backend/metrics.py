@@ -0,0 +1,182 @@
+"""
+Prometheus-style metrics for the brain pipeline (text exposition format, no
+client library needed).
+
+    stricto_stage_seconds{stage}                 histogram: time per pipeline stage
+    stricto_request_seconds{endpoint}            histogram: whole request
+    stricto_requests_total{endpoint,subject,user_type,exam_stage}
+    stricto_fallback_total{path}                 GA skip / generic fallback tasks
+    stricto_response_cache_*                     hit/miss/304 counters, read at scrape time
+
+Metrics are off unless configure_metrics(True) (STRICTO_METRICS=1). While off,
+stage() hands out one shared no-op context manager and inc()/observe() return
+immediately, so instrumented code pays a function call per stage.
+
+Counts are per worker process: scrape each worker, or aggregate in Prometheus.
+"""
+import os
+import threading
+import time
+from bisect import bisect_left
+
+# Seconds; stages are sub-millisecond, requests a few ms, p99 outliers much longer
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+_enabled = False
+
+
+def enabled():
+    return _enabled
+
+
+def configure_metrics(enable=None):
+    """Turn collection on/off (None = STRICTO_METRICS env var, default off)."""
+    global _enabled
+    if enable is None:
+        enable = os.environ.get("STRICTO_METRICS", "0") == "1"
+    _enabled = bool(enable)
+    return _enabled
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _label_text(names, values):
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+class Counter:
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        if not _enabled:
+            return
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def value(self, *label_values):
+        return self._values.get(label_values, 0)
+
+    def expose(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        lines.extend(f"{self.name}{_label_text(self.labels, values)} {count}" for values, count in items)
+        return lines
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram:
+    def __init__(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}  # label values -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, seconds, *label_values):
+        if not _enabled:
+            return
+        slot = bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[slot] += 1
+            series[-1] += seconds
+
+    def count(self, *label_values):
+        series = self._series.get(label_values)
+        return sum(series[:-1]) if series else 0
+
+    def expose(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((values, list(series)) for values, series in self._series.items())
+        for values, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), series[:-1]):
+                cumulative += count
+                labels = _label_text(self.labels + ("le",), values + (bound,))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _label_text(self.labels, values)
+            lines.append(f"{self.name}_sum{labels} {series[-1]:.6f}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+
+STAGE_SECONDS = Histogram("stricto_stage_seconds", "Time spent per brain pipeline stage", ("stage",))
+REQUEST_SECONDS = Histogram("stricto_request_seconds", "Request handling time", ("endpoint",))
+REQUESTS = Counter("stricto_requests_total", "Requests by profile shape", ("endpoint", "subject", "user_type", "exam_stage"))
+FALLBACKS = Counter("stricto_fallback_total", "Responses served from a fallback path", ("path",))
+
+METRICS = (STAGE_SECONDS, REQUEST_SECONDS, REQUESTS, FALLBACKS)
+
+
+class _Stage:
+    __slots__ = ("name", "started")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        STAGE_SECONDS.observe(time.perf_counter() - self.started, self.name)
+        return False
+
+
+class _NoStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NO_STAGE = _NoStage()
+
+
+def stage(name):
+    """`with stage("strategy"): ...` times the block into stricto_stage_seconds (no-op while disabled)."""
+    return _Stage(name) if _enabled else _NO_STAGE
+
+
+def render(extra=()):
+    """
+    Prometheus text exposition of every metric.
+
+    Args:
+        extra: (name, type, help, value) tuples computed at scrape time (e.g. cache counters)
+    """
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.expose())
+    for name, kind, help_text, value in extra:
+        lines.extend((f"# HELP {name} {help_text}", f"# TYPE {name} {kind}", f"{name} {value}"))
+    return "\n".join(lines) + "\n"
+
+
+def reset():
+    for metric in METRICS:
+        metric.reset()
@@ -0,0 +1,117 @@
+"""
+On-demand request profiling.
+
+A request is profiled when it carries "X-Stricto-Profile: 1" or falls in the
+sampled fraction. The whole view (generate_task / generate_plan and the JSON
+encoding) runs under cProfile. The stats are dumped to a rotating local directory
+as <time>_<endpoint>_<fingerprint>_<ms>ms.prof. The fingerprint is the response
+cache key of the request body, so a capture can be matched to the profile shape.
+
+Load a capture with `python -m pstats <file>` or snakeviz, or read the text
+summary from /admin/profiles/<name>?format=text.
+"""
+import cProfile
+import io
+import os
+import pstats
+import re
+import threading
+from collections import namedtuple
+from datetime import datetime
+
+from logging_setup import get_logger
+
+log = get_logger("PROFILE")
+
+CAPTURE_NAME = re.compile(r"^(?P<time>\d{8}-\d{6}-\d{6})_(?P<endpoint>[\w.-]+)_(?P<fingerprint>[0-9a-f]+)_(?P<ms>\d+)ms\.prof$")
+
+# Sort keys accepted by pstats.Stats.sort_stats (full names)
+SORT_KEYS = frozenset(pstats.Stats.sort_arg_dict_default)
+
+Capture = namedtuple("Capture", ["name", "created", "endpoint", "fingerprint", "ms", "size"])
+
+
+class ProfileStore:
+    """
+    Rotating directory of cProfile captures.
+
+    Args:
+        directory: where .prof files go (created on first save)
+        keep: newest captures kept (at least 1); older ones are deleted on save
+    """
+
+    def __init__(self, directory, keep=50):
+        if keep < 1:
+            raise ValueError(f"keep must be at least 1, got {keep}")
+        self.directory = str(directory)
+        self.keep = keep
+        self._lock = threading.Lock()
+
+    def _captures(self):
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return sorted(name for name in names if CAPTURE_NAME.match(name))
+
+    def save(self, profile, endpoint, fingerprint, seconds):
+        """Dump a finished cProfile.Profile; returns the capture name."""
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        endpoint = re.sub(r"[^\w.-]", "-", endpoint or "unknown")
+        name = f"{stamp}_{endpoint}_{fingerprint[:12]}_{int(seconds * 1000)}ms.prof"
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            profile.dump_stats(os.path.join(self.directory, name))
+            captures = self._captures()
+            for old in captures[:max(0, len(captures) - self.keep)]:
+                os.remove(os.path.join(self.directory, old))
+        log.info("Profile captured: %s", name)
+        return name
+
+    def list(self):
+        """Captures, newest first."""
+        captures = []
+        for name in reversed(self._captures()):
+            match = CAPTURE_NAME.match(name)
+            try:
+                size = os.path.getsize(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                continue  # rotated away meanwhile
+            created = datetime.strptime(match["time"], "%Y%m%d-%H%M%S-%f")
+            captures.append(Capture(name, created.isoformat(timespec="seconds"), match["endpoint"], match["fingerprint"], int(match["ms"]), size))
+        return captures
+
+    def path(self, name):
+        """Absolute path of a capture, or None for unknown / malformed names."""
+        if not CAPTURE_NAME.match(name or ""):
+            return None
+        path = os.path.join(self.directory, name)
+        return path if os.path.isfile(path) else None
+
+    def text(self, name, limit=40, sort="cumulative"):
+        """
+        pstats summary of a capture (top `limit` functions by `sort`).
+
+        Raises:
+            ValueError: `limit` below 1, or `sort` not in SORT_KEYS
+        """
+        if limit < 1:
+            raise ValueError(f"Invalid limit: {limit} (must be at least 1)")
+        if sort not in SORT_KEYS:
+            raise ValueError(f"Invalid sort key: {sort} (one of {', '.join(sorted(SORT_KEYS))})")
+        path = self.path(name)
+        if path is None:
+            return None
+        out = io.StringIO()
+        pstats.Stats(path, stream=out).strip_dirs().sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+
+def start_profile():
+    """A running cProfile.Profile, or None if another profiler already owns this thread."""
+    profile = cProfile.Profile()
+    try:
+        profile.enable()
+    except ValueError:
+        return None
+    return profile
@@ -0,0 +1,239 @@
+"""
+Persistent per-user progress (SQLite, WAL mode).
+
+The request path no longer depends on clients shipping their whole state: topic
+pointers, completion rates and review schedules live here, keyed by (user, subject),
+and a plan request loads them with one indexed query.
+
+    progress     (user_id, subject) -> last topic ID, completion rate, review schedule
+    completions  completion events, indexed by (user_id, subject, completed_on)
+    reviews      next pending review per topic, indexed by due_day (batch jobs:
+                 "who has reviews due tomorrow")
+
+Each thread gets its own connection (one per worker thread, reused across requests).
+Completion events are buffered and written in batches; state upserts are batched
+per call. WAL lets readers run while a batch commits.
+"""
+import json
+import sqlite3
+import threading
+import time
+from datetime import date
+
+from logging_setup import get_logger
+from spaced_repetition import ReviewCalendar, get_policy
+
+log = get_logger("STORE")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS progress (
+    user_id         TEXT NOT NULL,
+    subject         TEXT NOT NULL,
+    last_topic_id   INTEGER,
+    completion_rate REAL,
+    review_schedule TEXT,
+    updated_at      REAL NOT NULL,
+    PRIMARY KEY (user_id, subject)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS completions (
+    user_id      TEXT NOT NULL,
+    subject      TEXT NOT NULL,
+    task         TEXT NOT NULL,
+    topic        TEXT,
+    minutes      INTEGER NOT NULL DEFAULT 0,
+    completed_on INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS completions_user_subject ON completions (user_id, subject, completed_on);
+
+CREATE TABLE IF NOT EXISTS reviews (
+    user_id TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    topic   TEXT NOT NULL,
+    due_day INTEGER NOT NULL,
+    stage   INTEGER NOT NULL,
+    PRIMARY KEY (user_id, subject, topic)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS reviews_due ON reviews (due_day);
+"""
+
+# Buffered completion events are flushed once this many are pending
+FLUSH_EVERY = 256
+
+
+class ProgressStore:
+    """
+    Args:
+        path: SQLite database file (":memory:" is per-connection, so tests should use a file)
+        flush_every: completion events buffered before a batched insert
+    """
+
+    def __init__(self, path, flush_every=FLUSH_EVERY):
+        self.path = str(path)
+        self.flush_every = flush_every
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+        self._pending = []
+        self._connect().executescript(SCHEMA)
+
+    def _connect(self):
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute("PRAGMA busy_timeout=30000")
+            self._local.db = db
+            with self._lock:
+                self._connections.append(db)
+        return db
+
+    def _transaction(self):
+        return _Transaction(self._connect())
+
+    # ============================================
+    # READS (one indexed query each)
+    # ============================================
+
+    def load_state(self, user_id, subjects=None):
+        """
+        Stored state as profile fields (same shape clients send):
+            {"topicProgress": {...}, "completionHistory": {...}, "reviewSchedule": {...}}
+
+        Args:
+            subjects: restrict to these subjects (None = all)
+        """
+        sql = "SELECT subject, last_topic_id, completion_rate, review_schedule FROM progress WHERE user_id = ?"
+        params = [user_id]
+        if subjects is not None:
+            subjects = list(subjects)
+            sql += f" AND subject IN ({','.join('?' * len(subjects))})"
+            params += subjects
+        state = {"topicProgress": {}, "completionHistory": {}, "reviewSchedule": {}}
+        for subject, last_topic_id, rate, schedule in self._connect().execute(sql, params):
+            if last_topic_id is not None:
+                state["topicProgress"][subject] = last_topic_id
+            if rate is not None:
+                state["completionHistory"][subject] = rate
+            if schedule:
+                state["reviewSchedule"][subject] = json.loads(schedule)
+        return state
+
+    def merge_profile(self, profile, subjects=None):
+        """`profile` with stored state filled in for its "userId" (fields sent by the client win)."""
+        user_id = profile.get("userId")
+        if user_id is None:
+            return profile
+        merged = dict(profile)
+        for field, stored in self.load_state(user_id, subjects).items():
+            if stored:
+                merged[field] = {**stored, **(profile.get(field) or {})}
+        return merged
+
+    def due_reviews(self, day, limit=None):
+        """(user_id, subject, topic, stage) with a review due on `day` (date or ordinal). Uses the due_day index."""
+        ordinal = day if isinstance(day, int) else day.toordinal()
+        sql = "SELECT user_id, subject, topic, stage FROM reviews WHERE due_day = ? ORDER BY user_id, subject"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        return self._connect().execute(sql, (ordinal,)).fetchall()
+
+    def completions(self, user_id, subject, since=None):
+        """Completion events for (user, subject), oldest first: (task, topic, minutes, completed_on date)."""
+        self.flush()  # include events still buffered by this process
+        since = 0 if since is None else since.toordinal()
+        rows = self._connect().execute(
+            "SELECT task, topic, minutes, completed_on FROM completions"
+            " WHERE user_id = ? AND subject = ? AND completed_on >= ? ORDER BY completed_on",
+            (user_id, subject, since),
+        )
+        return [(task, topic, minutes, date.fromordinal(day)) for task, topic, minutes, day in rows]
+
+    # ============================================
+    # WRITES (batched)
+    # ============================================
+
+    def save_state(self, user_id, state, policy=None):
+        """
+        Upsert per-subject state (the "state" of StrictoBrain.complete_task, or any
+        profile-shaped fragment) and refresh the due-date index, in one transaction.
+        Fields a subject does not mention keep their stored value.
+        """
+        topic_progress = state.get("topicProgress") or {}
+        rates = state.get("completionHistory") or {}
+        schedules = state.get("reviewSchedule") or {}
+        subjects = set(topic_progress) | set(rates) | set(schedules)
+        if not subjects:
+            return
+        now = time.time()
+        rows = [
+            (user_id, subject, topic_progress.get(subject), rates.get(subject),
+             json.dumps(schedules[subject], separators=(",", ":")) if subject in schedules else None, now)
+            for subject in subjects
+        ]
+        policy = policy or get_policy()
+        review_rows = [
+            (user_id, subject, topic, due_day, stage)
+            for subject, compact in schedules.items()
+            for topic, due_day, stage in ReviewCalendar.from_compact(compact, policy).next_reviews()
+        ]
+        with self._transaction() as db:
+            db.executemany(
+                "INSERT INTO progress (user_id, subject, last_topic_id, completion_rate, review_schedule, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT (user_id, subject) DO UPDATE SET"
+                " last_topic_id = COALESCE(excluded.last_topic_id, last_topic_id),"
+                " completion_rate = COALESCE(excluded.completion_rate, completion_rate),"
+                " review_schedule = COALESCE(excluded.review_schedule, review_schedule),"
+                " updated_at = excluded.updated_at",
+                rows,
+            )
+            if schedules:
+                db.executemany("DELETE FROM reviews WHERE user_id = ? AND subject = ?", [(user_id, s) for s in schedules])
+                db.executemany("INSERT INTO reviews (user_id, subject, topic, due_day, stage) VALUES (?, ?, ?, ?, ?)", review_rows)
+
+    def record_completion(self, user_id, task, completed_on=None):
+        """Buffer one completion event (a Task); written with the next batch."""
+        completed_on = (completed_on or date.today()).toordinal()
+        with self._lock:
+            self._pending.append((user_id, task.subject, task.task, task.topic, task.minutes, completed_on))
+            flush = len(self._pending) >= self.flush_every
+        if flush:
+            self.flush()
+
+    def flush(self):
+        """Write buffered completion events in one transaction."""
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if pending:
+            with self._transaction() as db:
+                db.executemany(
+                    "INSERT INTO completions (user_id, subject, task, topic, minutes, completed_on) VALUES (?, ?, ?, ?, ?, ?)",
+                    pending,
+                )
+            log.debug("Flushed %d completion events", len(pending))
+
+    def close(self):
+        """Flush buffered events and close every thread's connection (safe to call twice)."""
+        self.flush()
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for db in connections:
+            db.close()
+        self._local = threading.local()
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE ... COMMIT (ROLLBACK on error) on an autocommit connection."""
+
+    def __init__(self, db):
+        self.db = db
+
+    def __enter__(self):
+        self.db.execute("BEGIN IMMEDIATE")
+        return self.db
+
+    def __exit__(self, exc_type, exc, tb):
+        self.db.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
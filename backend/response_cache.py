@@ -0,0 +1,105 @@
+"""
+Response cache for the task/plan endpoints.
+
+A response depends only on the request body, today's date and the syllabus
+version, so identical requests on the same day are served from memory:
+
+    key  = sha1(canonical JSON body + date + syllabus version)
+    ETag = strong, sha1 of the response bytes
+
+The cache is an LRU bounded by entry count and is emptied when the date rolls over.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict, namedtuple
+from datetime import date
+
+CachedResponse = namedtuple("CachedResponse", ["body", "mimetype", "etag"])
+
+
+def request_fingerprint(payload, day, version):
+    """Canonical key: key order and whitespace in the request body do not matter."""
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha1(f"{canonical}|{day}|{version}".encode("utf-8")).hexdigest()
+
+
+def body_etag(body):
+    return hashlib.sha1(body).hexdigest()
+
+
+class ResponseCache:
+    """
+    Thread-safe LRU of rendered responses.
+
+    Args:
+        max_entries: size bound (least recently used entries are evicted)
+        today: callable returning the current date (rollover check)
+    """
+
+    def __init__(self, max_entries=10000, today=date.today):
+        self.max_entries = max_entries
+        self._today = today
+        self._entries = OrderedDict()
+        self._day = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.evictions = 0
+        self.rollovers = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _roll_over(self):
+        day = self._today()
+        if day != self._day:
+            if self._day is not None:
+                self.rollovers += 1
+            self._entries.clear()
+            self._day = day
+        return day
+
+    def key(self, payload, version):
+        """Fingerprint for `payload` today under syllabus `version` (rolls the cache over at midnight)."""
+        with self._lock:
+            day = self._roll_over()
+        return request_fingerprint(payload, day.isoformat(), version)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, body, mimetype="application/json"):
+        entry = CachedResponse(body, mimetype, body_etag(body))
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "not_modified": self.not_modified,
+            "evictions": self.evictions,
+            "rollovers": self.rollovers,
+        }
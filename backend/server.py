@@ -1,176 +1,719 @@
-from flask import Flask, jsonify, request
+"""
+Stricto ML server.
+
+    gunicorn "server:create_app()"     # app factory
+    gunicorn server:app                # module-level app (same thing, built on first access)
+
+Importing this module is cheap: no syllabus is read and pandas is never imported
+on the request path. The brain is built on the first request (or at create_app()
+with PRELOAD_BRAIN) from the binary syllabus cache when it is warm.
+"""
+from flask import Blueprint, Flask, Response, current_app, g, jsonify, request, send_file, stream_with_context
 from flask_cors import CORS
-import pandas as pd
-import os
+import atexit
 import datetime
-from brain_engine import StrictoBrain
+import json
+import math
+import os
+import random
+import time
+from functools import partial, wraps
+from analytics import ActivityRollup
+from brain_engine import StrictoBrain, normalize_subject, plan_note, resolve_exam_date
+from logging_setup import configure_logging, get_logger
+import metrics
+from metrics import FALLBACKS, REQUESTS, REQUEST_SECONDS, configure_metrics, stage
+from profiling import ProfileStore, start_profile
+from progress_store import ProgressStore
+from response_cache import ResponseCache, request_fingerprint
+from shared_index import load_shared_index
+from spaced_repetition import ReviewCalendar, get_policy
+from syllabus_loader import DEFAULT_SYLLABUS_DIR, SUBJECT_FILES, load_syllabus
+from syllabus_registry import ExamRegistry, discover_exams, normalize_exam
+from tasks import Task, plan_to_wire, tasks_to_wire
+from topic_search import row_to_wire
 
-app = Flask(__name__)
-CORS(app)
+init_log = get_logger("INIT")
+api_log = get_logger("API")
 
-# --- GLOBAL BRAIN STATE ---
-BRAIN = None
-TASK_DB = None
+api = Blueprint("stricto", __name__)
 
-def init_brain():
-    global BRAIN, TASK_DB
-    
-    print("[INIT] Loading Knowledge Base...")
-    
-    # 1. Load User Syllabus Files (topics_*.csv)
-    project_root = os.path.dirname(os.path.abspath(__file__)) # currently in backend/
-    parent_dir = os.path.join(project_root, "..")
+# create_app() config keys (env vars give the defaults)
+DEFAULT_CONFIG = {
+    "SYLLABUS_DIR": DEFAULT_SYLLABUS_DIR,
+    "SUBJECT_FILES": SUBJECT_FILES,
+    # Seconds between syllabus mtime polls (0 = only SIGHUP / admin reload)
+    "SYLLABUS_POLL_SECONDS": float(os.environ.get("STRICTO_SYLLABUS_POLL", 30)),
+    # Required X-Admin-Token for /admin/* when set
+    "ADMIN_TOKEN": os.environ.get("STRICTO_ADMIN_TOKEN"),
+    # Build the brain inside create_app() instead of on the first request
+    "PRELOAD_BRAIN": os.environ.get("STRICTO_PRELOAD_BRAIN", "0") == "1",
+    # Rendered task/plan responses kept per worker (0 = no response cache)
+    "RESPONSE_CACHE_SIZE": int(os.environ.get("STRICTO_RESPONSE_CACHE_SIZE", 10000)),
+    # SQLite file for server-side user progress (None = stateless: clients send their state)
+    "PROGRESS_DB": os.environ.get("STRICTO_PROGRESS_DB"),
+    # Longest /get-calendar horizon in days
+    "CALENDAR_MAX_DAYS": int(os.environ.get("STRICTO_CALENDAR_MAX_DAYS", 731)),
+    # Largest page /topics/search returns
+    "SEARCH_MAX_LIMIT": int(os.environ.get("STRICTO_SEARCH_MAX_LIMIT", 100)),
+    # Directory for cProfile captures (None = profiling off)
+    "PROFILE_DIR": os.environ.get("STRICTO_PROFILE_DIR"),
+    # Fraction of requests profiled without the X-Stricto-Profile header
+    "PROFILE_SAMPLE": float(os.environ.get("STRICTO_PROFILE_SAMPLE", 0)),
+    # Newest captures kept in PROFILE_DIR
+    "PROFILE_KEEP": int(os.environ.get("STRICTO_PROFILE_KEEP", 50)),
+    # Collect /metrics (off: instrumentation is a no-op)
+    "METRICS": os.environ.get("STRICTO_METRICS", "0") == "1",
+    # Per-exam syllabi: <EXAMS_DIR>/<exam>/topics_<key>.csv, picked by the body's "exam" (None = one exam)
+    "EXAMS_DIR": os.environ.get("STRICTO_EXAMS_DIR"),
+    # Exam for requests that name none; served from SYLLABUS_DIR unless EXAMS_DIR has it
+    "DEFAULT_EXAM": os.environ.get("STRICTO_DEFAULT_EXAM", "default"),
+    # Estimated MB of loaded exam syllabi per worker before the least recently used are unloaded (0 = no limit)
+    "EXAM_MEMORY_MB": float(os.environ.get("STRICTO_EXAM_MEMORY_MB", 0)),
+    # Serve each syllabus from one memory-mapped index file shared by all workers (shared_index.py)
+    "SHARED_INDEX": os.environ.get("STRICTO_SHARED_INDEX", "0") == "1",
+    # ASGI mode (asgi_app.py): processes for calendar / batch work (0 = run on the event loop)
+    "ASGI_POOL_WORKERS": int(os.environ.get("STRICTO_ASGI_POOL_WORKERS", 2)),
+    # Pool jobs queued or running before new ones are refused (503)
+    "ASGI_POOL_QUEUE": int(os.environ.get("STRICTO_ASGI_POOL_QUEUE", 64)),
+    # Requests in progress per ASGI worker before new ones are refused (503)
+    "ASGI_MAX_IN_FLIGHT": int(os.environ.get("STRICTO_ASGI_MAX_IN_FLIGHT", 2048)),
+    # Largest request body in bytes (413) and seconds allowed to receive it (408)
+    "ASGI_MAX_BODY": int(os.environ.get("STRICTO_ASGI_MAX_BODY", 1 << 20)),
+    "ASGI_BODY_TIMEOUT": float(os.environ.get("STRICTO_ASGI_BODY_TIMEOUT", 30)),
+    # Profiles per /get-daily-plans batch
+    "ASGI_MAX_BATCH": int(os.environ.get("STRICTO_ASGI_MAX_BATCH", 1000)),
+    # dict for configure_logging() (None = STRICTO_LOG_* env vars)
+    "LOGGING": None,
+}
+
+
+def create_app(config=None):
+    """
+    Build the Flask app.
+
+    Args:
+        config: dict overriding DEFAULT_CONFIG (plus any Flask config)
+
+    Returns:
+        Flask app; its ExamRegistry lives in app.extensions["stricto_exams"] (the
+        default exam's SyllabusRegistry also in app.extensions["stricto"]),
+        its ResponseCache (or None) in app.extensions["stricto_cache"],
+        its ProgressStore (or None) in app.extensions["stricto_store"],
+        its ProfileStore (or None) in app.extensions["stricto_profiles"]
+    """
+    app = Flask(__name__)
+    app.config.update(DEFAULT_CONFIG)
+    app.config.update(config or {})
+    configure_logging(app.config["LOGGING"])
+    configure_metrics(app.config["METRICS"])
+    CORS(app, expose_headers=["ETag"])
+
+    # Active StrictoBrain + knowledge base per exam, swapped atomically on syllabus reload
+    exams = discover_exams(app.config["EXAMS_DIR"]) if app.config["EXAMS_DIR"] else {}
+    exams.setdefault(normalize_exam(app.config["DEFAULT_EXAM"]), (app.config["SYLLABUS_DIR"], app.config["SUBJECT_FILES"]))
+    load = load_shared_index if app.config["SHARED_INDEX"] else load_syllabus
+    app.extensions["stricto_exams"] = ExamRegistry(exams, app.config["DEFAULT_EXAM"], app.config["EXAM_MEMORY_MB"] * 1e6,
+                                                   load=load, brain_factory=partial(StrictoBrain, search=True))
+    app.extensions["stricto"] = app.extensions["stricto_exams"].shard()
+    cache_size = app.config["RESPONSE_CACHE_SIZE"]
+    app.extensions["stricto_cache"] = ResponseCache(cache_size) if cache_size > 0 else None
+    app.extensions["stricto_store"] = ProgressStore(app.config["PROGRESS_DB"]) if app.config["PROGRESS_DB"] else None
+    if app.extensions["stricto_store"] is not None:
+        # Nothing else closes the store under gunicorn / `python server.py`
+        atexit.register(app.extensions["stricto_store"].close)
+    app.extensions["stricto_profiles"] = ProfileStore(app.config["PROFILE_DIR"], app.config["PROFILE_KEEP"]) if app.config["PROFILE_DIR"] else None
+    app.register_blueprint(api)
+
+    if app.config["PRELOAD_BRAIN"]:
+        init_snapshot(app)
+    return app
+
+
+class SyllabusUnavailable(Exception):
+    """The first load of an exam's syllabus failed (answered 503 {"error"} by both serving modes)."""
+
+
+def init_snapshot(app, exam=None):
+    """
+    Active syllabus snapshot of `exam` (None = default), loading it on first use.
+    Raises SyllabusUnavailable when the first load of its syllabus fails.
+    """
+    exams = app.extensions["stricto_exams"]
+    init_log.info("Loading Knowledge Base (exam %s)...", exam or exams.default)
     
-    subjects = {
-        "math": "Math",
-        "english": "English",
-        "reasoning": "Reasoning",
-        "ga": "GA"
-    }
+    # 1. Load User Syllabus Files (topics_*.csv) + 2. Initialize Logic Engine
+    init_log.info("Initializing Stricto Brain Engine v2.0...")
+    try:
+        snapshot, loaded = exams.pin(exam)
+    except Exception as e:
+        init_log.exception("Syllabus of exam %s failed to load: %s", exam or exams.default, e)
+        raise SyllabusUnavailable(f"Syllabus unavailable: {e}") from e
+    if not loaded:
+        return snapshot  # another request got here first
     
-    all_topics = []
+    if not len(snapshot.brain.topic_index):
+        init_log.critical("No syllabus found! Brain will be empty.")
     
-    for filename_key, subject_name in subjects.items():
-        csv_path = os.path.join(parent_dir, f"topics_{filename_key}.csv")
-        if os.path.exists(csv_path):
-            try:
-                # Read user CSV
-                df = pd.read_csv(csv_path)
-                for _, row in df.iterrows():
-                    all_topics.append({
-                        "Subject": subject_name,
-                        "Topic": row.get('topic', 'Unknown'),
-                        "SubTopic": row.get('sub-topic', ''),
-                        "ID": row.get('id', '')
-                    })
-                print(f"[INFO] Loaded {len(df)} topics for {subject_name}")
-            except Exception as e:
-                print(f"[WARN] Failed to load {csv_path}: {e}")
+    # 3. Pick up syllabus edits without restarting workers
+    exams.watch(app.config["SYLLABUS_POLL_SECONDS"])
+    exams.install_sighup()
+    init_log.info("Brain Online (syllabus %s, %.0f ms).", snapshot.version, snapshot.load_seconds * 1000)
+    return snapshot
+
+
+def request_exam():
+    """Exam named by the request ("exam" in the JSON body, or ?exam= on GETs); None = default."""
+    payload = request.get_json(silent=True) if request.method == 'POST' else None
+    return payload.get('exam') if isinstance(payload, dict) else request.args.get('exam')
+
+
+def get_registry():
+    """SyllabusRegistry of the request's exam (see route_exam)."""
+    return g.get('stricto_registry') or current_app.extensions["stricto"]
+
+
+def get_snapshot():
+    """
+    Active syllabus snapshot of this request's exam (loaded on first use), pinned for
+    the rest of the request: the brain and the response cache key both come from it,
+    so a reload landing mid-request cannot pair one version's plan with another's key.
+    Holding it also keeps the brain alive if the exam is evicted mid-request.
+    Raises SyllabusUnavailable when the first load fails.
+    """
+    if 'stricto_snapshot' not in g:
+        snapshot = get_registry().snapshot
+        if snapshot is None:
+            snapshot = init_snapshot(current_app, g.get('stricto_exam'))
+        g.stricto_snapshot = snapshot
+    return g.stricto_snapshot
+
+
+def get_brain():
+    """Brain of the request's pinned snapshot (see get_snapshot)."""
+    snapshot = get_snapshot()
+    return snapshot.brain if snapshot else None
+
+
+def get_store():
+    return current_app.extensions["stricto_store"]
+
+
+def with_stored_state(payload, subjects=None):
+    """Request body with the stored progress of its "userId" filled in (no-op without a store)."""
+    store = get_store()
+    if store is None or not isinstance(payload, dict):
+        return payload
+    return store.merge_profile(payload, subjects)
+
+
+def cached_response(view):
+    """
+    Serve identical requests (same body, same day, same syllabus version) from the
+    response cache, with a strong ETag; If-None-Match on a match answers 304.
+    Error responses are never cached. Requests whose state lives in the progress
+    store ("userId" with a store configured) and profiled requests are not cached either.
+    """
+    @wraps(view)
+    def wrapper():
+        cache = current_app.extensions["stricto_cache"]
+        payload = request.get_json(silent=True)
+        if cache is None or g.get('stricto_profiling') or (get_store() is not None and isinstance(payload, dict) and 'userId' in payload):
+            return view()
+
+        key = cache.key(payload, get_snapshot().version)
+        entry = cache.get(key)
+        if entry is None:
+            response = current_app.make_response(view())
+            if response.status_code != 200 or (response.is_json and 'error' in (response.get_json() or {})):
+                return response
+            entry = cache.put(key, response.get_data(), response.mimetype)
+
+        if request.if_none_match.contains(entry.etag):
+            cache.not_modified += 1
+            response = Response(status=304)
         else:
-            print(f"[WARN] Syllabus file missing: {csv_path}")
+            response = Response(entry.body, mimetype=entry.mimetype)
+        response.set_etag(entry.etag)
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+    return wrapper
 
-    # Convert to DataFrame
-    TASK_DB = pd.DataFrame(all_topics)
-    
-    if TASK_DB.empty:
-        print("[CRITICAL] No syllabus found! Brain will be empty.")
-    
-    # 2. Initialize Logic Engine
-    print("[AI] Initializing Stricto Brain Engine v2.0...")
-    BRAIN = StrictoBrain(TASK_DB)
-    print("[AI] Brain Online.")
 
-# Auto-init on start
-init_brain()
+def wants_profile():
+    """X-Stricto-Profile: 1 (with the admin token, when one is set), or a PROFILE_SAMPLE draw."""
+    if request.headers.get('X-Stricto-Profile') == '1':
+        token = current_app.config["ADMIN_TOKEN"]
+        return not token or request.headers.get('X-Admin-Token') == token
+    sample = current_app.config["PROFILE_SAMPLE"]
+    return sample > 0 and random.random() < sample
+
+
+def profiled(view):
+    """
+    Run the view under cProfile when wants_profile() and save the capture under the
+    request fingerprint; the capture name comes back in the X-Stricto-Profile header.
+    """
+    @wraps(view)
+    def wrapper():
+        profiles = current_app.extensions["stricto_profiles"]
+        if profiles is None or not wants_profile():
+            return view()
+        profile = start_profile()
+        if profile is None:
+            return view()
+
+        g.stricto_profiling = True
+        started = time.perf_counter()
+        try:
+            response = current_app.make_response(view())
+        finally:
+            profile.disable()
+        snapshot = g.get('stricto_snapshot') or get_registry().snapshot
+        fingerprint = request_fingerprint(request.get_json(silent=True), datetime.date.today().isoformat(),
+                                          snapshot.version if snapshot else None)
+        response.headers['X-Stricto-Profile'] = profiles.save(profile, request.endpoint, fingerprint, time.perf_counter() - started)
+        return response
+    return wrapper
+
+
+def wants_compact(payload):
+    """Body field "wireFormat": "compact" -> tasks as {"fields": [...], "rows": [[...]]}"""
+    return payload.get('wireFormat') == 'compact'
+
+
+@api.before_request
+def start_timer():
+    if metrics.enabled():
+        g.request_started = time.perf_counter()
+
+@api.before_request
+def route_exam():
+    """Pick the request's syllabus shard; unknown exams get 400 before any work is done."""
+    exam = request_exam()
+    try:
+        g.stricto_registry = current_app.extensions["stricto_exams"].shard(exam)
+    except KeyError:
+        return jsonify({"error": f"Unknown exam: {exam}"}), 400
+    g.stricto_exam = exam
+
+
+@api.errorhandler(SyllabusUnavailable)
+def syllabus_unavailable(e):
+    return jsonify({"error": str(e)}), 503
+
+@api.after_request
+def observe_request(response):
+    if metrics.enabled() and 'request_started' in g:
+        REQUEST_SECONDS.observe(time.perf_counter() - g.request_started, request.endpoint)
+    return response
 
 
 # --- API ENDPOINTS ---
 
-@app.route('/get-daily-task', methods=['POST'])
-def get_task():
-    global BRAIN
-    
-    user_req = request.json
-    subject_raw = user_req.get('subject', 'English')
-    if subject_raw.upper() == 'GA':
-        subject = 'GA'
-    else:
-        subject = subject_raw.title()
+def daily_task(brain, user_req, store=None):
+    """
+    /get-daily-task response body (shared by the Flask view and asgi_app).
+
+    Args:
+        brain: StrictoBrain snapshot for the whole request (None = not loaded)
+        user_req: request body dict
+        store: ProgressStore filling in the state of a "userId", or None
+
+    Returns:
+        dict: {"tasks", "note"}, or {"error"}
+    """
+    subject = normalize_subject(user_req.get('subject', 'English'))
+    if store is not None and 'userId' in user_req:
+        # Stored progress for this one subject (one primary-key lookup); the body's fields win
+        stored = store.load_state(user_req['userId'], [subject])
+        user_req = dict(user_req, topicProgress={**stored['topicProgress'], **(user_req.get('topicProgress') or {})},
+                        completionHistory={**stored['completionHistory'], **(user_req.get('completionHistory') or {})})
+        if not user_req.get('reviewSchedule') and subject in stored['reviewSchedule']:
+            user_req['reviewSchedule'] = stored['reviewSchedule'][subject]
         
     level = user_req.get('level', 'weak').lower() # Interpreted as Proficiency Logic
     exam_stage = user_req.get('examStage', 'Prelims') 
     user_date_str = user_req.get('examDate', 'other')
     
     # --- DATE CALCULATION (Robust Banking Logic) ---
-    if not user_date_str or user_date_str.lower() == 'other' or user_date_str == '':
-        # Default to Banking Season Start (June 15th of current/next year)
-        today = datetime.date.today()
-        target_year = today.year
-        if today.month > 6: 
-            target_year += 1 # Next season
-        
-        exam_date = datetime.date(target_year, 6, 15)
-        system_note = "Auto-Target: Banking Season (June " + str(target_year) + ")"
-    else:
-        try:
-            # Try ISO Format first YYYY-MM-DD
-            exam_date = datetime.datetime.strptime(user_date_str, '%Y-%m-%d').date()
-            system_note = f"Target: {user_date_str}"
-        except ValueError:
-            try:
-                # Try Indian Format DD-MM-YYYY
-                exam_date = datetime.datetime.strptime(user_date_str, '%d-%m-%Y').date()
-                system_note = f"Target: {user_date_str}"
-            except ValueError:
-                # Fallback
-                exam_date = datetime.date.today() + datetime.timedelta(days=150)
-                system_note = "Invalid Date. Defaulting to 5 Months."
-
-    days_left = (exam_date - datetime.date.today()).days
-
-    # --- BEGINNER SYLLABUS ESTIMATION ---
-    if level == 'beginner' and days_left > 140:
-        system_note += " | Est. Syllabus Completion: 5 Months (Steady Pace)"
-    elif level == 'beginner' and days_left < 90:
-        system_note += " | ⚠️ Warning: Short Timeline for Beginner!"
-    if days_left < 20 and exam_stage == 'Prelims':
-        system_note = "CRITICAL MODE: Exam in < 20 days. New topics stopped. Revision & Mocks Only."
+    with stage("dates"):
+        exam_date, system_note = resolve_exam_date(user_date_str)
+        days_left = (exam_date - datetime.date.today()).days
 
     user_type = user_req.get('userType', 'repeater').lower() # 'beginner' or 'repeater'
     syllabus_percent = int(user_req.get('syllabusCompleted', 0))
     daily_hours = int(user_req.get('dailyHours', 6)) # Default 6 hours
     topic_progress = user_req.get('topicProgress', {}) # {Math: 15, English: 8}
 
-    print(f"[API] Request: Subject={subject}, Level={level}, Stage={exam_stage}, Days={days_left}, UserType={user_type}, Syll={syllabus_percent}%, Hours={daily_hours}, Progress={topic_progress}")
+    api_log.debug("Request: Subject=%s, Level=%s, Stage=%s, Days=%s, UserType=%s, Syll=%s%%, Hours=%s, Progress=%s",
+                  subject, level, exam_stage, days_left, user_type, syllabus_percent, daily_hours, topic_progress)
 
     try:
-        if BRAIN:
+        if brain:
+            # Spaced repetition: compact ReviewCalendar, or legacy {topic: "YYYY-MM-DD"}, under the requested policy
+            with stage("review_load"):
+                review_policy = get_policy(user_req.get('reviewPolicy'))
+                review_ease = review_policy.ease_for((user_req.get('completionHistory') or {}).get(subject))
+                review_source = ReviewCalendar.from_history(user_req.get('topicCompletionHistory'), review_policy, review_ease)
+                if user_req.get('reviewSchedule'):
+                    review_source = ReviewCalendar.from_compact(user_req['reviewSchedule'], review_policy, review_ease)
+
             # Generate Tasks using Rule Engine
-            generated_tasks = BRAIN.generate_task(subject, level, exam_stage, days_left, user_type, syllabus_percent, daily_hours, topic_progress)
+            generated_tasks = brain.generate_task(subject, level, exam_stage, days_left, user_type, syllabus_percent, daily_hours, topic_progress, topic_completion_history=review_source)
             
-            print(f"[API] Generated {len(generated_tasks)} tasks for {subject}")
+            api_log.info("Generated %d tasks for %s (%s, %s, %dD)", len(generated_tasks), subject, user_type, exam_stage, days_left)
+            REQUESTS.inc("get-daily-task", subject, user_type, exam_stage)
 
             # Fallback if empty (e.g. Brain decided to SKIP but we need to return something to not break UI?)
             # Actually dashboard handles empty logic? 
             # If generated_tasks is empty (e.g. GA + Urgent + Prelims), we should probably return a note.
             
             if not generated_tasks and subject == 'GA' and exam_stage == 'Prelims':
-                return jsonify({
-                    "tasks": [{
-                        "subject": "GA", 
-                        "topic": "Focus on Core Subjects", 
-                        "task": "Skipped per Strategy (Prelims/Urgent)", 
-                        "duration": "0 Min", 
-                        "impact": "Strategy", 
-                        "strategy": "SKIP"
-                    }],
+                FALLBACKS.inc("ga_skip")
+                skipped = Task("GA", None, "Skipped per Strategy (Prelims/Urgent)", 0, None, "SKIP",
+                               topic="Focus on Core Subjects", impact="Strategy")
+                return {
+                    "tasks": tasks_to_wire([skipped], wants_compact(user_req)),
                     "note": f"AI Plan: GA skipped to prioritize Math/Eng/Reas for Prelims."
-                })
+                }
             
             elif not generated_tasks:
                  # Generic Fallback
-                 print(f"[API] Fallback triggered for {subject}")
-                 generated_tasks.append({
-                        "subject": subject,
-                        "topic": "General Revision",
-                        "task": f"Review {subject} Notes",
-                        "duration": "1.0 Hrs",
-                        "impact": "Fallback",
-                        "strategy": "Fallback"
-                    })
-
-            return jsonify({
-                "tasks": generated_tasks,
-                "note": f"AI Plan ({days_left} days left): " + system_note
-            })
+                 generated_tasks = brain.fallback_tasks(subject)
+
+            return {
+                "tasks": tasks_to_wire(generated_tasks, wants_compact(user_req)),
+                "note": plan_note(system_note, days_left, user_type, exam_stage)
+            }
             
         else:
-            return jsonify({"error": "Brain not initialized."})
+            return {"error": "Brain not initialized."}
+
+    except Exception as e:
+        api_log.exception("Inference failed: %s", e)
+        return {"error": str(e)}
+
+@api.route('/get-daily-task', methods=['POST'])
+@profiled
+@cached_response
+def get_task():
+    # One snapshot for the whole request, even if a reload swaps the brain meanwhile
+    body = daily_task(get_brain(), request.json, get_store())
+    with stage("encode"):
+        return jsonify(body)
+
+def daily_plan(brain, profile):
+    """/get-daily-plan response body for a profile with its stored state merged in; {"error"} on failure."""
+    api_log.debug("Plan request: %s", profile)
+    
+    try:
+        if brain:
+            plan = brain.generate_plan(profile)
+            api_log.info("Generated %d tasks across %d subjects (%dD)", len(plan['tasks']), len(plan['subjects']), plan['days_left'])
+            REQUESTS.inc("get-daily-plan", "all", str(profile.get('userType', 'repeater')).lower(), profile.get('examStage', 'Prelims'))
+            return plan_to_wire(plan, wants_compact(profile))
+        else:
+            return {"error": "Brain not initialized."}
+    
+    except Exception as e:
+        api_log.exception("Plan inference failed: %s", e)
+        return {"error": str(e)}
+
+@api.route('/get-daily-plan', methods=['POST'])
+@profiled
+@cached_response
+def get_plan():
+    """Whole day's protocol (all subjects) in one round trip. Body: see StrictoBrain.generate_plan"""
+    body = daily_plan(get_brain(), with_stored_state(request.json or {}))
+    with stage("encode"):
+        return jsonify(body)
+
+def calendar_range(profile, max_days):
+    """
+    (start, end) of a /get-calendar request: "start" (default today) to "end"
+    (default the day before the exam), both inclusive.
+
+    Raises:
+        ValueError: unparseable dates, or more than `max_days` days
+    """
+    try:
+        start = datetime.datetime.strptime(profile['start'], '%Y-%m-%d').date() if profile.get('start') else datetime.date.today()
+        exam_date, _ = resolve_exam_date(profile.get('examDate'), start)
+        end = datetime.datetime.strptime(profile['end'], '%Y-%m-%d').date() if profile.get('end') else exam_date - datetime.timedelta(days=1)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid start/end: {e}") from e
+    horizon = (end - start).days + 1
+    if horizon > max_days:
+        raise ValueError(f"Calendar too long: {horizon} days (max {max_days})")
+    return start, end
+
+@api.route('/get-calendar', methods=['POST'])
+def get_calendar():
+    """
+    Day-by-day roadmap up to the exam, streamed as NDJSON (one day plan per line).
+    Body: a /get-daily-plan profile, plus optional "start" / "end" (YYYY-MM-DD, end inclusive).
+    See StrictoBrain.generate_calendar
+    """
+    brain = get_brain()
+    if not brain:
+        return jsonify({"error": "Brain not initialized."})
+
+    profile = with_stored_state(request.json or {})
+    try:
+        start, end = calendar_range(profile, current_app.config["CALENDAR_MAX_DAYS"])
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    api_log.info("Streaming %d-day calendar from %s", max((end - start).days + 1, 0), start)
+    return Response(stream_with_context(calendar_lines(brain, profile, start, end)), mimetype="application/x-ndjson")
+
+def calendar_lines(brain, profile, start, end):
+    """NDJSON lines of a calendar; a failure midway becomes a final {"error"} line."""
+    compact = wants_compact(profile)
+    try:
+        for day in brain.generate_calendar(profile, start, end):
+            yield json.dumps(plan_to_wire(day, compact), ensure_ascii=False, separators=(",", ":")) + "\n"
+    except Exception as e:
+        # Headers are already sent: report the failure as the last line
+        api_log.exception("Calendar generation failed: %s", e)
+        yield json.dumps({"error": str(e)}) + "\n"
+
+@api.route('/complete-task', methods=['POST'])
+@profiled
+def complete_task():
+    """
+    A task was done: re-plan its subject and return only the delta.
+    Body: a /get-daily-plan profile, plus "tasks" (the current plan, entries marked
+    "completed": true are done) and "completed" (the task just done).
+    With a progress store and a "userId", the new state is saved server-side.
+    See StrictoBrain.complete_task
+    """
+    brain = get_brain()
+    if not brain:
+        return jsonify({"error": "Brain not initialized."})
 
+    payload = with_stored_state(request.json or {})
+    try:
+        plan_tasks = [Task.from_dict(t) for t in payload.get('tasks') or []]
+        completed = Task.from_dict(payload['completed'])
+        done = [Task.from_dict(t) for t in payload.get('tasks') or [] if t.get('completed')]
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid task: {e}"}), 400
+
+    try:
+        delta = brain.complete_task(payload, plan_tasks, completed, done)
+        store = get_store()
+        if store is not None and 'userId' in payload:
+            store.save_state(payload['userId'], delta['state'], get_policy(payload.get('reviewPolicy')))
+            store.record_completion(payload['userId'], completed)
+            store.flush()  # the response acknowledges the completion, so it must be on disk
+        api_log.info("Completed %s task: +%d -%d ~%d", completed.subject, len(delta['added']), len(delta['removed']), len(delta['changed']))
+        compact = wants_compact(payload)
+        return jsonify({
+            "added": tasks_to_wire(delta['added'], compact),
+            "removed": tasks_to_wire(delta['removed'], compact),
+            "changed": {
+                "from": tasks_to_wire([before for before, _ in delta['changed']], compact),
+                "to": tasks_to_wire([after for _, after in delta['changed']], compact),
+            },
+            "state": delta['state'],
+        })
     except Exception as e:
-        print(f"[ERROR] Inference failed: {e}")
+        api_log.exception("Re-plan failed: %s", e)
         return jsonify({"error": str(e)})
 
+@api.route('/analytics', methods=['POST'])
+def analytics_summary():
+    """
+    Pre-aggregated charts for the analytics page.
+    Body: {"tasks": [new task records], "rollup": previous response's rollup (optional),
+           "date": "YYYY-MM-DD" (optional, default today)}
+    Returns the updated rollup (send it back next time with only new tasks), the chart
+    payloads (see ActivityRollup.summary) and the matching performance adjustments.
+    """
+    payload = request.json or {}
+    end = payload.get('date') or datetime.date.today().isoformat()
+    try:
+        # Bounded to the analytics window before anything is allocated
+        rollup = ActivityRollup.from_compact(payload.get('rollup'), normalize_subject, end)
+        rollup.ingest(payload.get('tasks') or [], end)
+        summary = rollup.summary(end)
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid history: {e}"}), 400
+
+    brain = get_brain()
+    adjustments = brain.get_performance_adjustment(summary['completion_rates']) if brain else {}
+    return jsonify(dict(summary, rollup=rollup.to_compact(), adjustments=adjustments))
+
+def search_params(args, max_limit):
+    """
+    TopicSearch.search keyword arguments from /topics/search query args.
+
+    Raises:
+        ValueError: non-numeric or non-finite bounds / paging, or an unknown mains value
+    """
+    try:
+        min_id = float(args['minId']) if args.get('minId') else None
+        max_id = float(args['maxId']) if args.get('maxId') else None
+        offset = int(args.get('offset', 0))
+        limit = int(args.get('limit', 20))
+        for bound in (min_id, max_id):
+            if bound is not None and not math.isfinite(bound):
+                raise ValueError(f"bound must be a finite number: {bound}")
+    except ValueError as e:
+        raise ValueError(f"Invalid search parameter: {e}") from e
+    mains = args.get('mains', '').lower()
+    if mains not in ('', 'true', 'false', '1', '0'):
+        raise ValueError(f"Invalid mains filter: {args['mains']} (true/false)")
+    return {
+        "query": args.get('q', ''),
+        "subject": normalize_subject(args['subject']) if args.get('subject') else None,
+        "min_id": min_id,
+        "max_id": max_id,
+        "mains": mains in ('true', '1') if mains else None,
+        "offset": max(0, offset),
+        "limit": max(0, min(limit, max_limit)),
+    }
+
+@api.route('/topics/search', methods=['GET'])
+def search_topics():
+    """
+    Syllabus topics matching ?q= (every word prefixes a word of Topic / SubTopic),
+    filtered by ?subject=, ?minId= / ?maxId= (inclusive) and ?mains=true|false,
+    paged by ?offset= / ?limit=. Results are in syllabus order.
+    """
+    brain = get_brain()
+    if not brain:
+        return jsonify({"error": "Brain not initialized."})
+    try:
+        params = search_params(request.args, current_app.config["SEARCH_MAX_LIMIT"])
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    with stage("search"):
+        total, page = brain.topic_search.search(**params)
+    with stage("encode"):
+        return jsonify({
+            "total": total,
+            "offset": params["offset"],
+            "limit": params["limit"],
+            "results": [row_to_wire(subject, row) for subject, row in page],
+        })
+
+# --- ADMIN ---
+
+def admin_denied():
+    token = current_app.config["ADMIN_TOKEN"]
+    if token and request.headers.get('X-Admin-Token') != token:
+        return jsonify({"error": "Forbidden"}), 403
+    return None
+
+@api.route('/admin/syllabus', methods=['GET'])
+def syllabus_status():
+    """Active syllabus version, load time and topic counts for this worker (?exam=, default exam
+    otherwise), plus every exam shard's state under "exams"."""
+    return admin_denied() or jsonify(dict(get_registry().status(), exams=current_app.extensions["stricto_exams"].status()))
+
+@api.route('/admin/syllabus/reload', methods=['POST'])
+def syllabus_reload():
+    """
+    Reload now (?force=0: only if a file changed). Failed loads keep the current syllabus.
+    An exam that is not loaded yet gets its first load through the ExamRegistry, like a
+    request would (memory accounting, eviction); if that fails the answer is a 503.
+    """
+    denied = admin_denied()
+    if denied:
+        return denied
+    force = request.args.get('force', '1') not in ('0', 'false')
+    exams = current_app.extensions["stricto_exams"]
+    exam = g.get('stricto_exam') or exams.default
+    registry = get_registry()
+    if registry.snapshot is None:
+        init_snapshot(current_app, exam)
+        reloaded = True
+    else:
+        reloaded = bool(exams.reload(force=force, exam=exam))
+    return jsonify(dict(registry.status(), reloaded=reloaded))
+
+@api.route('/admin/cache', methods=['GET'])
+def cache_status():
+    """Response cache hit/miss/304 counters for this worker."""
+    cache = current_app.extensions["stricto_cache"]
+    return admin_denied() or jsonify(cache.stats() if cache is not None else {"enabled": False})
+
+@api.route('/admin/profiles', methods=['GET'])
+def profile_list():
+    """Profile captures on this worker, newest first."""
+    denied = admin_denied()
+    if denied:
+        return denied
+    profiles = current_app.extensions["stricto_profiles"]
+    if profiles is None:
+        return jsonify({"enabled": False, "captures": []})
+    return jsonify({"enabled": True, "captures": [capture._asdict() for capture in profiles.list()]})
+
+@api.route('/admin/profiles/<name>', methods=['GET'])
+def profile_download(name):
+    """One capture: the .prof file, or a pstats summary with ?format=text (&sort=tottime&limit=40)."""
+    denied = admin_denied()
+    if denied:
+        return denied
+    profiles = current_app.extensions["stricto_profiles"]
+    path = profiles.path(name) if profiles is not None else None
+    if path is None:
+        return jsonify({"error": "No such capture"}), 404
+    if request.args.get('format') == 'text':
+        try:
+            limit = request.args.get('limit', '40')
+            if not limit.isdigit():
+                raise ValueError(f"Invalid limit: {limit}")
+            summary = profiles.text(name, int(limit), request.args.get('sort', 'cumulative'))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        return Response(summary, mimetype="text/plain")
+    return send_file(path, mimetype="application/octet-stream", as_attachment=True, download_name=name)
+
+@api.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Prometheus text format for this worker (404 while metrics are off)."""
+    denied = admin_denied()
+    if denied:
+        return denied
+    if not metrics.enabled():
+        return jsonify({"error": "Metrics disabled (STRICTO_METRICS=1)"}), 404
+    extra = []
+    cache = current_app.extensions["stricto_cache"]
+    if cache is not None:
+        stats = cache.stats()
+        extra += [
+            ("stricto_response_cache_hits_total", "counter", "Response cache hits", stats["hits"]),
+            ("stricto_response_cache_misses_total", "counter", "Response cache misses", stats["misses"]),
+            ("stricto_response_cache_not_modified_total", "counter", "304 answers to If-None-Match", stats["not_modified"]),
+            ("stricto_response_cache_hit_ratio", "gauge", "Response cache hit ratio", stats["hit_rate"]),
+            ("stricto_response_cache_entries", "gauge", "Cached responses", stats["entries"]),
+        ]
+    exams = current_app.extensions["stricto_exams"]
+    extra += [
+        ("stricto_syllabus_reloads_total", "counter", "Syllabus hot reloads", exams.reloads),
+        ("stricto_exam_shards_loaded", "gauge", "Exam syllabi loaded on this worker", len(exams.loaded())),
+        ("stricto_exam_shard_evictions_total", "counter", "Exam syllabi unloaded over the memory budget", exams.evictions),
+    ]
+    return Response(metrics.render(extra), mimetype="text/plain; version=0.0.4")
+
+# Module-level app for `gunicorn server:app` / `python server.py`, built on first
+# access: importing this module (asgi_app, its pool processes) creates no app or store
+_app = None
+
+
+def __getattr__(name):
+    global _app
+    if name != "app":
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    if _app is None:
+        _app = create_app()
+    return _app
+
+
 if __name__ == '__main__':
-    print("[INFO] Stricto ML Server Running on Port 5000...")
-    app.run(debug=True, port=5000)
+    init_log.info("Stricto ML Server Running on Port 5000...")
+    create_app().run(debug=os.environ.get("STRICTO_DEBUG", "0") == "1", port=5000)
@@ -0,0 +1,303 @@
+"""
+Memory-mapped topic index shared by every worker on a host.
+
+Each worker normally parses (or unpickles) the syllabus and builds its own
+TopicIndex: ~600 bytes per topic, paid again by every worker. With SHARED_INDEX
+the index of one syllabus version is packed once into a read-only file
+
+    <syllabus dir>/.stricto_cache/index-<version>.bin
+
+and every worker maps it. Lookups bisect straight over the mapped arrays and rows
+are materialised on access, so the pages live once in the OS page cache and a new
+worker only adds its own small working set. Build it in the gunicorn master with
+`--preload` (and STRICTO_PRELOAD_BRAIN=1); otherwise the first worker to boot
+builds it under a file lock while the others wait, then map it.
+
+Layout (native byte order, arrays 8-byte aligned):
+    b"STRIDX01" | uint32 header length | JSON header | arrays
+Per subject: ids (int64, or float64 when an ID is fractional), mains (uint8),
+next_core / core_before (int32), topic / sub-topic string numbers (int32).
+Strings: one sorted, de-duplicated UTF-8 table (int64 end offsets + blob); find()
+bisects it once and then compares string numbers, not text.
+"""
+import contextlib
+import glob
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import time
+from array import array
+from collections.abc import Sequence
+
+try:
+    import fcntl
+except ImportError:  # not POSIX: concurrent builders just race to replace the same content
+    fcntl = None
+
+from logging_setup import get_logger
+from syllabus_loader import DEFAULT_SYLLABUS_DIR, SUBJECT_FILES, load_syllabus, syllabus_version
+from topic_index import SubjectTopics, TopicIndex, TopicRow
+
+log = get_logger("INIT")
+
+MAGIC = b"STRIDX01"
+# Bump when the layout changes (old files are simply rebuilt)
+FORMAT_VERSION = 1
+
+
+# ==========================================
+# EXPORT
+# ==========================================
+
+def _padded(data):
+    return data + b"\0" * (-len(data) % 8)
+
+
+def export_index(index, path):
+    """
+    Pack a TopicIndex into `path` (written aside and atomically replaced).
+
+    Returns:
+        size of the file in bytes
+    """
+    strings = sorted(
+        {text for subject in index.subjects for row in index.subject(subject).rows for text in (row.topic, row.sub_topic)},
+        key=lambda text: text.encode("utf-8"),
+    )
+    numbers = {text: n for n, text in enumerate(strings)}
+    chunks, offset = [], 0
+
+    def add(data):
+        nonlocal offset
+        chunks.append(_padded(data))
+        span = [offset, len(data)]
+        offset += len(chunks[-1])
+        return span
+
+    header = {"format": FORMAT_VERSION, "byteorder": sys.byteorder, "subjects": {}}
+    for subject in index.subjects:
+        bucket = index.subject(subject)
+        rows = bucket.rows
+        id_type = "d" if any(isinstance(row.id, float) for row in rows) else "q"
+        header["subjects"][subject] = {
+            "id_type": id_type,
+            "ids": add(array(id_type, bucket.ids).tobytes()),
+            "mains": add(bytes(bool(row.mains) for row in rows)),
+            "next_core": add(array("i", bucket.next_core).tobytes()),
+            "core_before": add(array("i", bucket.core_before).tobytes()),
+            "topics": add(array("i", [numbers[row.topic] for row in rows]).tobytes()),
+            "sub_topics": add(array("i", [numbers[row.sub_topic] for row in rows]).tobytes()),
+        }
+    encoded = [text.encode("utf-8") for text in strings]
+    ends = array("q", [0])
+    for text in encoded:
+        ends.append(ends[-1] + len(text))
+    header["strings"] = {"ends": add(ends.tobytes()), "blob": add(b"".join(encoded))}
+
+    head = json.dumps(header).encode()
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_padded(MAGIC + struct.pack("<I", len(head)) + head))
+            for chunk in chunks:
+                f.write(chunk)
+            size = f.tell()
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp_path)
+        raise
+    return size
+
+
+# ==========================================
+# MAPPED INDEX
+# ==========================================
+
+class StringTable:
+    """Sorted UTF-8 strings in a mapping: number -> str, and str -> number by bisection."""
+
+    __slots__ = ("ends", "blob")
+
+    def __init__(self, ends, blob):
+        self.ends = ends
+        self.blob = blob
+
+    def __len__(self):
+        return len(self.ends) - 1
+
+    def _raw(self, number):
+        return self.blob[self.ends[number]:self.ends[number + 1]]
+
+    def __getitem__(self, number):
+        return str(self._raw(number), "utf-8")
+
+    def number(self, text):
+        """Number of `text` in the table, or None."""
+        key = text.encode("utf-8")
+        lo, hi = 0, len(self)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if bytes(self._raw(mid)) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo if lo < len(self) and self._raw(lo) == key else None
+
+
+class MappedRows(Sequence):
+    """A subject's rows over the mapped columns; each TopicRow is built on access."""
+
+    __slots__ = ("ids", "mains", "topics", "sub_topics", "strings", "fractional")
+
+    def __init__(self, ids, mains, topics, sub_topics, strings, fractional):
+        self.ids = ids
+        self.mains = mains
+        self.topics = topics
+        self.sub_topics = sub_topics
+        self.strings = strings
+        self.fractional = fractional
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, pos):
+        if isinstance(pos, slice):
+            return [self[i] for i in range(*pos.indices(len(self)))]
+        topic_id = self.ids[pos]
+        if self.fractional and topic_id.is_integer():
+            topic_id = int(topic_id)
+        strings = self.strings
+        return TopicRow(topic_id, strings[self.topics[pos]], strings[self.sub_topics[pos]], bool(self.mains[pos]))
+
+
+class MappedSubjectTopics(SubjectTopics):
+    """SubjectTopics whose arrays are memoryviews into the shared mapping."""
+
+    __slots__ = ()
+
+    def __init__(self, rows, next_core, core_before):
+        self.rows = rows
+        self.ids = rows.ids
+        self.next_core = next_core
+        self.core_before = core_before
+
+    def find(self, topic, sub_topic=None):
+        rows = self.rows
+        topic_number = rows.strings.number(topic)
+        sub_number = None if sub_topic is None else rows.strings.number(sub_topic)
+        if topic_number is None or (sub_topic is not None and sub_number is None):
+            return None
+        for pos, number in enumerate(rows.topics):
+            if number == topic_number and (sub_number is None or rows.sub_topics[pos] == sub_number):
+                return rows[pos]
+        return None
+
+
+class MappedTopicIndex(TopicIndex):
+    """
+    TopicIndex over a file written by export_index. Pickles as its path, so pool
+    workers (bulk plans, the ASGI pool) map the same file instead of copying it.
+    """
+
+    path = None
+    nbytes = 0
+
+    def __reduce__(self):
+        return open_index, (self.path,)
+
+
+def open_index(path):
+    """
+    Map an index file read-only.
+
+    Raises:
+        ValueError: not an index file, or one from another format version / byte order
+    """
+    with open(path, "rb") as f:
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mapping)
+    if view[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"{path}: not a topic index file")
+    (length,) = struct.unpack_from("<I", view, len(MAGIC))
+    start = len(MAGIC) + 4
+    header = json.loads(bytes(view[start:start + length]))
+    if header.get("format") != FORMAT_VERSION or header.get("byteorder") != sys.byteorder:
+        raise ValueError(f"{path}: index format {header.get('format')}/{header.get('byteorder')} not supported")
+    base = start + length + (-(start + length) % 8)
+
+    def column(span, typecode):
+        offset, size = span
+        return view[base + offset:base + offset + size].cast(typecode)
+
+    strings = StringTable(column(header["strings"]["ends"], "q"), column(header["strings"]["blob"], "B"))
+    subjects = {}
+    for subject, spans in header["subjects"].items():
+        rows = MappedRows(
+            column(spans["ids"], spans["id_type"]), column(spans["mains"], "B"),
+            column(spans["topics"], "i"), column(spans["sub_topics"], "i"),
+            strings, spans["id_type"] == "d",
+        )
+        subjects[subject] = MappedSubjectTopics(rows, column(spans["next_core"], "i"), column(spans["core_before"], "i"))
+
+    index = MappedTopicIndex.from_subjects(subjects)
+    index.path = path
+    index.nbytes = len(mapping)
+    return index
+
+
+# ==========================================
+# REGISTRY LOADER
+# ==========================================
+
+@contextlib.contextmanager
+def _build_lock(directory):
+    """Cross-process lock: one builder per host, the others wait for its file."""
+    if fcntl is None:
+        yield
+        return
+    with open(os.path.join(directory, "index.lock"), "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _remove_stale(directory, keep):
+    """Old versions' files (already-mapped ones stay valid until unmapped)."""
+    for path in glob.glob(os.path.join(directory, "index-*.bin")):
+        if os.path.abspath(path) != os.path.abspath(keep):
+            with contextlib.suppress(OSError):
+                os.unlink(path)
+
+
+def load_shared_index(syllabus_dir=DEFAULT_SYLLABUS_DIR, subjects=SUBJECT_FILES, directory=None):
+    """
+    SyllabusRegistry loader: the mapped index of the syllabus's current version,
+    built first if no process on this host has built it yet.
+
+    Args:
+        syllabus_dir: folder holding topics_*.csv
+        subjects: {filename key: Subject name}
+        directory: where index files live (default <syllabus_dir>/.stricto_cache)
+
+    Returns:
+        MappedTopicIndex (StrictoBrain takes it as its knowledge base)
+    """
+    directory = directory or os.path.join(syllabus_dir, ".stricto_cache")
+    path = os.path.join(directory, f"index-{syllabus_version(syllabus_dir, subjects)}.bin")
+    if not os.path.exists(path):
+        os.makedirs(directory, exist_ok=True)
+        with _build_lock(directory):
+            if not os.path.exists(path):  # nobody built it while we waited
+                started = time.perf_counter()
+                size = export_index(TopicIndex(load_syllabus(syllabus_dir, subjects)), path)
+                log.info("Built shared topic index %s (%.1f MB) in %.0fms",
+                         path, size / 2 ** 20, (time.perf_counter() - started) * 1000)
+                _remove_stale(directory, keep=path)
+    return open_index(path)
@@ -0,0 +1,371 @@
+from bisect import bisect_left, bisect_right, insort
+from datetime import date, datetime
+from functools import lru_cache
+
+import numpy as np
+
+from logging_setup import get_logger
+
+log = get_logger("SPACED")
+
+# 3/7/21 system: (days after completion, task label, review duration in hours)
+REVIEW_STAGES = (
+    (3, "3-Day Review", 0.5),    # First reinforcement
+    (7, "7-Day Review", 0.75),   # Second reinforcement
+    (21, "21-Day Review", 1.0),  # Long-term retention
+)
+
+COMPACT_VERSION = 2
+
+
+@lru_cache(maxsize=4096)
+def parse_day(date_str):
+    """'YYYY-MM-DD' -> proleptic ordinal (cached: histories repeat the same dates)"""
+    return datetime.strptime(date_str, '%Y-%m-%d').date().toordinal()
+
+
+def _ordinal(day):
+    if day is None:
+        return date.today().toordinal()
+    if isinstance(day, (int, np.integer)):
+        return int(day)
+    if isinstance(day, str):
+        return parse_day(day)
+    return day.toordinal()
+
+
+# ============================================
+# INTERVAL POLICIES
+# ============================================
+# A policy decides when each review stage of a topic falls due. Every policy offers
+# a scalar path (due_days: one topic, used by ReviewCalendar on the request path)
+# and a vectorized one (next_due: NumPy arrays of topics, used by schedule()).
+# grace_days: how long a missed review stays due (0 = only on its exact day).
+
+class FixedIntervalPolicy:
+    """
+    Reviews at fixed offsets from the completion date (default 3/7/21 days).
+
+    Args:
+        offsets: days after completion, one per review stage
+        durations: review duration in hours, one per stage
+        grace_days: days a missed review stays due (0 = the original exact-day rule)
+    """
+
+    def __init__(self, offsets=None, durations=None, grace_days=0):
+        self.offsets = tuple(offsets or (stage[0] for stage in REVIEW_STAGES))
+        self.durations = tuple(durations or (stage[2] for stage in REVIEW_STAGES))
+        self.grace_days = grace_days
+        self.stages = len(self.offsets)
+        self._offsets = np.asarray(self.offsets, dtype=np.int64)
+
+    def ease_for(self, completion_rate):
+        """Fixed intervals ignore performance."""
+        return 1.0
+
+    def due_days(self, completed, stage=0, last_review=None, ease=None):
+        """Due ordinals of stages `stage`.. for one topic."""
+        return [completed + offset for offset in self.offsets[stage:]]
+
+    def next_due(self, completed, stage, last_review, ease):
+        """Vectorized due ordinals of `stage` (arrays, stage < self.stages)."""
+        return completed + self._offsets[stage]
+
+
+class EaseFactorPolicy:
+    """
+    SM-2 style adaptive intervals: the first review comes `first_interval` days after
+    completion, review k comes `first_interval * ease ** k` days after the previous
+    review actually happened.
+
+    The ease factor comes from the subject's completion rate (completion_history):
+    0% -> min_ease (reviews bunch up), 100% -> max_ease (reviews spread out).
+
+    Args:
+        first_interval: days from completion to the first review
+        stages: number of reviews per topic
+        min_ease / max_ease: ease factor range
+        durations: review duration in hours per stage (the last one repeats)
+        grace_days: days a missed review stays due
+    """
+
+    def __init__(self, first_interval=3, stages=4, min_ease=1.3, max_ease=2.5, durations=(0.5, 0.75, 1.0), grace_days=7):
+        self.first_interval = first_interval
+        self.stages = stages
+        self.min_ease = min_ease
+        self.max_ease = max_ease
+        self.durations = tuple(durations)
+        self.grace_days = grace_days
+
+    def ease_for(self, completion_rate):
+        """Completion rate (0..1, scalar or array; None/NaN = unknown) -> ease factor"""
+        if completion_rate is None:
+            return self.max_ease
+        rate = np.asarray(completion_rate, dtype=float)
+        ease = self.min_ease + (self.max_ease - self.min_ease) * np.clip(rate, 0.0, 1.0)
+        ease = np.where(np.isnan(rate), self.max_ease, ease)
+        return float(ease) if ease.ndim == 0 else ease
+
+    def due_days(self, completed, stage=0, last_review=None, ease=None):
+        """Due ordinals of stages `stage`.. for one topic (later ones assume on-time reviews)."""
+        ease = self.max_ease if ease is None else ease
+        anchor = completed if stage == 0 or last_review is None else last_review
+        days = []
+        for pending in range(stage, self.stages):
+            anchor += max(1, round(self.first_interval * ease ** pending))
+            days.append(anchor)
+        return days
+
+    def next_due(self, completed, stage, last_review, ease):
+        """Vectorized due ordinals of `stage` (arrays, stage < self.stages)."""
+        gap = np.maximum(np.rint(self.first_interval * ease ** stage), 1).astype(np.int64)
+        return np.where(stage == 0, completed, last_review) + gap
+
+
+# Policies a request can pick by name ("reviewPolicy")
+REVIEW_POLICIES = {
+    "fixed": FixedIntervalPolicy(),
+    "fixed-carry": FixedIntervalPolicy(grace_days=7),
+    "ease": EaseFactorPolicy(),
+}
+DEFAULT_POLICY = "fixed"
+
+
+def get_policy(name=None):
+    """Look up a review policy by name (None = DEFAULT_POLICY)."""
+    try:
+        return REVIEW_POLICIES[name or DEFAULT_POLICY]
+    except KeyError:
+        raise ValueError(f"Unknown review policy: {name}") from None
+
+
+def schedule(policy, completed, stage=0, last_review=None, ease=None):
+    """
+    Due ordinals of every remaining review, for whole arrays of topics at once.
+
+    Args:
+        policy: interval policy
+        completed: completion ordinals, one per topic
+        stage: index of each topic's next pending review (scalar or array)
+        last_review: ordinal of each topic's last review (ignored at stage 0)
+        ease: ease factor per topic, or one for all (None = policy.ease_for(None))
+
+    Returns:
+        int64 array (topics x policy.stages); -1 for reviews already done.
+        Reviews after the next one assume every review happens on time.
+    """
+    completed = np.asarray(completed, dtype=np.int64)
+    stage = np.broadcast_to(np.asarray(stage, dtype=np.int64), completed.shape)
+    last = completed if last_review is None else np.asarray(last_review, dtype=np.int64)
+    ease = np.asarray(policy.ease_for(None) if ease is None else ease, dtype=float)
+
+    due = np.full((completed.size, policy.stages), -1, dtype=np.int64)
+    for column in range(policy.stages):
+        pending = stage <= column
+        due_day = policy.next_due(completed, np.full(completed.shape, column), last, ease)
+        due[:, column] = np.where(pending, due_day, -1)
+        last = np.where(pending, due_day, last)
+    return due
+
+
+def next_due(policy, completed, stage=0, last_review=None, ease=None):
+    """Next due ordinal per topic (same arguments as schedule()); -1 once every review is done."""
+    completed = np.asarray(completed, dtype=np.int64)
+    stage = np.broadcast_to(np.asarray(stage, dtype=np.int64), completed.shape)
+    last = completed if last_review is None else np.asarray(last_review, dtype=np.int64)
+    ease = np.asarray(policy.ease_for(None) if ease is None else ease, dtype=float)
+
+    due_day = policy.next_due(completed, np.minimum(stage, policy.stages - 1), last, ease)
+    return np.where(stage >= policy.stages, -1, due_day)
+
+
+def recompute_cohort(policy, completed, stage, last_review, completion_rate=None):
+    """
+    Re-plan review queues for a whole cohort (e.g. after switching policy).
+    Flat arrays, one element per (student, topic); completion_rate per element or None.
+
+    Returns:
+        int64 array of next due ordinals (-1 = finished)
+    """
+    return next_due(policy, completed, stage, last_review, policy.ease_for(completion_rate))
+
+
+class ReviewCalendar:
+    """
+    Spaced-repetition scheduler for one student's topics (one subject).
+
+    Reviews live in date-keyed buckets {due ordinal: [(topic, epoch, stage)]},
+    so "what is due today" costs only the number of due items, not the whole history.
+    Completing or reviewing a topic reschedules it under a new epoch; stale entries
+    are skipped on read and dropped by prune().
+
+    Args:
+        policy: interval policy (default: fixed 3/7/21, exact day only)
+        ease: ease factor for adaptive policies (see EaseFactorPolicy.ease_for)
+    """
+
+    def __init__(self, policy=None, ease=None):
+        self.policy = policy or get_policy()
+        self.ease = ease
+        self._topics = {}   # topic -> [completed, next stage, last review, epoch]
+        self._buckets = {}  # due ordinal -> [(topic, epoch, stage)]
+        self._days = []     # sorted bucket keys, for grace-window lookups
+        self._epoch = 0
+
+    def __len__(self):
+        return len(self._topics)
+
+    def __contains__(self, topic):
+        return topic in self._topics
+
+    @classmethod
+    def from_history(cls, topic_completion_history, policy=None, ease=None):
+        """
+        Build from the legacy request field {topic_name: "YYYY-MM-DD"}.
+        Invalid dates are logged and skipped.
+        """
+        calendar = cls(policy, ease)
+        for topic_name, completion_date_str in (topic_completion_history or {}).items():
+            try:
+                calendar.record_completion(topic_name, parse_day(completion_date_str))
+            except (TypeError, ValueError):
+                log.warning("Invalid date format for %s: %s", topic_name, completion_date_str)
+        return calendar
+
+    def _reschedule(self, topic, state, due_days=None):
+        self._epoch += 1
+        state[3] = self._epoch
+        if due_days is None:
+            due_days = self.policy.due_days(state[0], state[1], state[2], self.ease)
+        for stage, due_day in enumerate(due_days, state[1]):
+            bucket = self._buckets.get(due_day)
+            if bucket is None:
+                bucket = self._buckets[due_day] = []
+                insort(self._days, due_day)
+            bucket.append((topic, self._epoch, stage))
+
+    def record_completion(self, topic, completed_on=None):
+        """
+        Incremental update: `topic` was completed on `completed_on` (date/ordinal/str, default today).
+        Re-completing a topic restarts its review cycle.
+        """
+        completed = _ordinal(completed_on)
+        state = self._topics.get(topic)
+        if state is not None and state[0] == completed:
+            return
+        state = self._topics[topic] = [completed, 0, completed, 0]
+        self._reschedule(topic, state)
+
+    def record_review(self, topic, reviewed_on=None):
+        """
+        `topic` was reviewed on `reviewed_on` (default today). Counts for the latest stage
+        already due (missed earlier ones are skipped), or the next one if reviewed early.
+        """
+        state = self._topics.get(topic)
+        if state is None or state[1] >= self.policy.stages:
+            return
+        reviewed = _ordinal(reviewed_on)
+        due_days = self.policy.due_days(state[0], state[1], state[2], self.ease)
+        state[1] += max(bisect_right(due_days, reviewed), 1)
+        state[2] = reviewed
+        self._reschedule(topic, state)
+
+    def next_reviews(self):
+        """(topic, due ordinal, stage) of every topic's next pending review."""
+        for topic, state in self._topics.items():
+            if state[1] < self.policy.stages:
+                yield topic, self.policy.due_days(state[0], state[1], state[2], self.ease)[0], state[1]
+
+    def due(self, on=None):
+        """
+        Review tasks due on `on` (default today), plus missed ones still inside the
+        policy's grace window. One task per topic (its latest due stage).
+
+        Returns:
+            list of review task tuples: [(type, description, duration), ...]
+        """
+        day = _ordinal(on)
+        grace = self.policy.grace_days
+        if grace:
+            days = self._days[bisect_left(self._days, day - grace):bisect_right(self._days, day)]
+        else:
+            days = (day,) if day in self._buckets else ()
+
+        latest = {}
+        for due_day in days:
+            for topic, epoch, stage in self._buckets[due_day]:
+                state = self._topics.get(topic)
+                if state is None or state[3] != epoch or stage < state[1]:
+                    continue  # rescheduled since, or already reviewed
+                latest[topic] = (due_day - state[0], stage)
+
+        durations = self.policy.durations
+        review_tasks = []
+        for topic, (age, stage) in latest.items():
+            label = f"{age}-Day Review"
+            review_tasks.append(("Revision", f"{label}: {topic}", durations[min(stage, len(durations) - 1)]))
+            log.debug("Adding %s for %s", label.lower(), topic)
+        return review_tasks
+
+    def prune(self, before=None):
+        """Forget reviews that can no longer be due on/after `before` (default today), and topics with none left."""
+        cutoff = _ordinal(before) - self.policy.grace_days
+        expired = bisect_left(self._days, cutoff)
+        for due_day in self._days[:expired]:
+            del self._buckets[due_day]
+        del self._days[:expired]
+
+        live = {topic for bucket in self._buckets.values() for topic, epoch, _ in bucket
+                if topic in self._topics and self._topics[topic][3] == epoch}
+        for topic in [t for t in self._topics if t not in live]:
+            del self._topics[topic]
+
+    def set_policy(self, policy, ease=None):
+        """Switch interval policy and rebuild every topic's remaining reviews (one vectorized pass)."""
+        self.policy = policy
+        self.ease = ease
+        self._buckets = {}
+        self._days = []
+        if not self._topics:
+            return
+
+        completed, stage, last_review, _ = (np.array(column, dtype=np.int64) for column in zip(*self._topics.values()))
+        rows = schedule(policy, completed, stage, last_review, ease).tolist()
+        for (topic, state), row in zip(list(self._topics.items()), rows):
+            self._reschedule(topic, state, row[state[1]:])
+
+    def to_compact(self):
+        """
+        Compact, JSON-friendly form: topics plus day offsets from a base ordinal.
+        Buckets are rebuilt on load, so only completions (and review progress) are stored.
+        """
+        if not self._topics:
+            return {"v": COMPACT_VERSION, "base": 0, "topics": [], "days": []}
+        states = self._topics.values()
+        base = min(state[0] for state in states)
+        compact = {
+            "v": COMPACT_VERSION,
+            "base": base,
+            "topics": list(self._topics),
+            "days": [state[0] - base for state in states],
+        }
+        if any(state[1] for state in states):
+            compact["stages"] = [state[1] for state in states]
+            compact["reviewed"] = [state[2] - base for state in states]
+        return compact
+
+    @classmethod
+    def from_compact(cls, data, policy=None, ease=None):
+        """Rebuild from to_compact() output (v1 schedules, without review progress, still load)."""
+        calendar = cls(policy, ease)
+        if not data:
+            return calendar
+        if data.get("v") not in (1, COMPACT_VERSION):
+            raise ValueError(f"Unsupported review schedule version: {data.get('v')}")
+        base = data["base"]
+        stages = data.get("stages") or [0] * len(data["topics"])
+        reviewed = data.get("reviewed") or data["days"]
+        for topic, offset, stage, last in zip(data["topics"], data["days"], stages, reviewed):
+            state = calendar._topics[topic] = [base + offset, stage, base + last, 0]
+            calendar._reschedule(topic, state)
+        return calendar
@@ -0,0 +1,253 @@
+"""
+Syllabus loading: topics_<key>.csv files -> one knowledge-base table.
+
+CSVs are parsed with column operations (no per-row Python), validated, and the
+result is stored in a versioned binary cache. The cache is keyed by each file's
+size/mtime and content hash, so warm boots (every gunicorn worker after the first)
+skip CSV parsing entirely.
+
+Cache location: <syllabus_dir>/.stricto_cache/syllabus.pkl, or STRICTO_SYLLABUS_CACHE
+(a file path, or "off" to disable).
+
+pandas is only imported to parse CSVs (cold load) or when a DataFrame is asked for
+(load_task_db); the server's warm path, load_syllabus(), never imports it.
+"""
+import hashlib
+import os
+import pickle
+import tempfile
+
+from logging_setup import get_logger
+
+log = get_logger("INIT")
+
+# topics_<key>.csv -> Subject name used by the brain
+SUBJECT_FILES = {
+    "math": "Math",
+    "english": "English",
+    "reasoning": "Reasoning",
+    "ga": "GA"
+}
+
+# Syllabus CSVs live in the project root (one level above backend/)
+DEFAULT_SYLLABUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+# Bump when the cached layout (or the parsing rules) change
+CACHE_VERSION = 1
+
+REQUIRED_COLUMNS = ("id", "topic")
+COLUMNS = ("Subject", "Topic", "SubTopic", "ID")
+
+
+class SyllabusError(ValueError):
+    """A syllabus file that cannot be used (missing columns, bad or duplicate IDs)."""
+
+
+def read_syllabus_csv(csv_path, subject_name):
+    """
+    Parse and validate one topics_*.csv.
+
+    Args:
+        csv_path: file with columns id, topic[, sub-topic]
+        subject_name: value of the Subject column
+
+    Returns:
+        dict of columns {"Subject", "Topic", "SubTopic", "ID"} (lists)
+
+    Raises:
+        SyllabusError: missing columns, non-numeric or duplicate IDs
+    """
+    import pandas as pd
+
+    df = pd.read_csv(csv_path)
+    missing = [column for column in REQUIRED_COLUMNS if column not in df.columns]
+    if missing:
+        raise SyllabusError(f"{csv_path}: missing column(s) {', '.join(missing)}")
+
+    ids = pd.to_numeric(df['id'], errors='coerce')
+    bad = df['id'][ids.isna()]
+    if len(bad):
+        raise SyllabusError(f"{csv_path}: non-numeric id(s) {list(bad[:5])}")
+    duplicated = ids[ids.duplicated()]
+    if len(duplicated):
+        raise SyllabusError(f"{csv_path}: duplicate id(s) {sorted(set(duplicated))[:5]}")
+    if not ids.is_monotonic_increasing:
+        log.warning("%s: ids are not sorted (topics are served in id order)", csv_path)
+
+    sub_topics = df['sub-topic'] if 'sub-topic' in df.columns else pd.Series([''] * len(df))
+    return {
+        "Subject": [subject_name] * len(df),
+        "Topic": df['topic'].tolist(),
+        "SubTopic": sub_topics.tolist(),
+        "ID": ids.tolist(),
+    }
+
+
+def _file_hash(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def _sources(syllabus_dir, subjects):
+    """[(key, subject, path, (size, mtime_ns) or None)] for every configured subject."""
+    sources = []
+    for filename_key, subject_name in subjects.items():
+        csv_path = os.path.join(syllabus_dir, f"topics_{filename_key}.csv")
+        try:
+            st = os.stat(csv_path)
+            stamp = (st.st_size, st.st_mtime_ns)
+        except OSError:
+            stamp = None
+        sources.append((filename_key, subject_name, csv_path, stamp))
+    return sources
+
+
+def exam_subjects(syllabus_dir):
+    """
+    {filename key: Subject name} for the topics_<key>.csv files present in a directory
+    (known keys keep their SUBJECT_FILES name, others are title-cased: "polity" -> "Polity").
+    """
+    subjects = {}
+    for name in sorted(os.listdir(syllabus_dir)):
+        if name.startswith("topics_") and name.endswith(".csv"):
+            key = name[len("topics_"):-len(".csv")]
+            subjects[key] = SUBJECT_FILES.get(key, key.title())
+    return subjects
+
+
+def syllabus_stamps(syllabus_dir=DEFAULT_SYLLABUS_DIR, subjects=SUBJECT_FILES):
+    """{filename key: (size, mtime_ns) or None} - one stat() per file, for change polling."""
+    return {key: stamp for key, _, _, stamp in _sources(syllabus_dir, subjects)}
+
+
+def syllabus_version(syllabus_dir=DEFAULT_SYLLABUS_DIR, subjects=SUBJECT_FILES):
+    """Short content hash of every syllabus file: identical files give the same version on every worker."""
+    digest = hashlib.sha1()
+    for key, subject_name, csv_path, stamp in _sources(syllabus_dir, subjects):
+        digest.update(f"{key}={subject_name}:".encode())
+        digest.update(_file_hash(csv_path).encode() if stamp else b"-")
+    return digest.hexdigest()[:12]
+
+
+def _cache_path(syllabus_dir, cache_path):
+    if cache_path is None:
+        cache_path = os.environ.get("STRICTO_SYLLABUS_CACHE") or os.path.join(syllabus_dir, ".stricto_cache", "syllabus.pkl")
+    if cache_path is False or str(cache_path).lower() in ("off", "0", "none"):
+        return None
+    return cache_path
+
+
+def _read_cache(cache_path, sources):
+    """
+    Cached columns if every source file is unchanged, else None.
+    Files whose stamp moved but whose content hash still matches are re-stamped.
+    """
+    try:
+        with open(cache_path, 'rb') as f:
+            cached = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        log.warning("Ignoring unreadable syllabus cache %s: %s", cache_path, e)
+        return None
+
+    if cached.get("version") != CACHE_VERSION:
+        return None
+    entries = cached.get("files", {})
+    if [(key, subject) for key, subject, _, _ in sources] != [(key, entry["subject"]) for key, entry in entries.items()]:
+        return None
+
+    restamped = False
+    for key, _, csv_path, stamp in sources:
+        entry = entries[key]
+        if stamp == entry["stamp"]:
+            continue
+        # Touched (checkout, copy) but maybe not changed: fall back to the content hash
+        if stamp is None or entry["stamp"] is None or _file_hash(csv_path) != entry["sha1"]:
+            return None
+        restamped = True
+
+    if restamped:
+        hashes = {key: entry["sha1"] for key, entry in entries.items()}
+        _write_cache(cache_path, sources, hashes, cached["columns"])
+    return cached["columns"]
+
+
+def _write_cache(cache_path, sources, hashes, columns):
+    payload = {
+        "version": CACHE_VERSION,
+        "files": {
+            key: {"subject": subject, "stamp": stamp, "sha1": hashes.get(key)}
+            for key, subject, _, stamp in sources
+        },
+        "columns": columns,
+    }
+    cache_dir = os.path.dirname(os.path.abspath(cache_path))
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        # Atomic replace: workers booting together never read a half-written cache
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        log.warning("Could not write syllabus cache %s: %s", cache_path, e)
+
+
+def _parse_sources(sources):
+    columns = {column: [] for column in COLUMNS}
+    hashes = {}
+    for filename_key, subject_name, csv_path, stamp in sources:
+        if stamp is None:
+            log.warning("Syllabus file missing: %s", csv_path)
+            continue
+        try:
+            hashes[filename_key] = _file_hash(csv_path)
+            subject_columns = read_syllabus_csv(csv_path, subject_name)
+        except Exception as e:
+            log.warning("Failed to load %s: %s", csv_path, e)
+            continue
+        for column in COLUMNS:
+            columns[column].extend(subject_columns[column])
+        log.info("Loaded %d topics for %s", len(subject_columns["ID"]), subject_name)
+    return columns, hashes
+
+
+def load_syllabus(syllabus_dir=DEFAULT_SYLLABUS_DIR, subjects=SUBJECT_FILES, cache_path=None):
+    """
+    Load User Syllabus Files (topics_*.csv) as plain columns (pandas-free when the cache is warm)
+
+    Args:
+        syllabus_dir: directory holding topics_<key>.csv
+        subjects: {filename key: Subject name}
+        cache_path: binary cache file (None = default/env, False = no cache)
+
+    Returns:
+        dict of lists {"Subject", "Topic", "SubTopic", "ID"} (accepted by StrictoBrain/TopicIndex)
+    """
+    sources = _sources(syllabus_dir, subjects)
+    cache_path = _cache_path(syllabus_dir, cache_path)
+
+    columns = _read_cache(cache_path, sources) if cache_path else None
+    if columns is not None:
+        log.info("Loaded %d topics from syllabus cache", len(columns["ID"]))
+    else:
+        columns, hashes = _parse_sources(sources)
+        if cache_path:
+            _write_cache(cache_path, sources, hashes, columns)
+    return columns
+
+
+def load_task_db(syllabus_dir=DEFAULT_SYLLABUS_DIR, subjects=SUBJECT_FILES, cache_path=None):
+    """
+    Load User Syllabus Files (topics_*.csv) into one knowledge-base DataFrame (offline tools, analysis)
+
+    Returns:
+        DataFrame with columns Subject, Topic, SubTopic, ID
+    """
+    import pandas as pd
+
+    columns = load_syllabus(syllabus_dir, subjects, cache_path)
+    if not columns["ID"]:
+        return pd.DataFrame()
+    return pd.DataFrame(columns, columns=list(COLUMNS))
@@ -0,0 +1,357 @@
+"""
+Hot-reloadable syllabus: the active StrictoBrain lives in a registry instead of
+module globals, so syllabus edits are picked up without restarting workers.
+
+A reload builds a complete new brain (knowledge base + TopicIndex) off the request
+path and swaps it in with a single reference assignment. Requests grab
+registry.brain once and keep that snapshot until they finish.
+
+Triggers: mtime polling (watch(interval)), SIGHUP (install_sighup()), or reload().
+
+ExamRegistry shards syllabi by exam (SSC, Banking, UPSC, ...): one SyllabusRegistry
+per exam, loaded on first use and evicted least-recently-used under a memory budget.
+"""
+import signal
+import threading
+import os
+import time
+from collections import namedtuple
+from datetime import datetime
+
+from brain_engine import StrictoBrain
+from logging_setup import get_logger
+from syllabus_loader import DEFAULT_SYLLABUS_DIR, SUBJECT_FILES, exam_subjects, load_syllabus, syllabus_stamps, syllabus_version
+
+log = get_logger("SYLLABUS")
+
+# One immutable generation of the knowledge base
+SyllabusSnapshot = namedtuple("SyllabusSnapshot", ["brain", "task_db", "version", "stamps", "loaded_at", "load_seconds"])
+
+
+class SyllabusRegistry:
+    """
+    Holds the active syllabus snapshot and swaps it atomically on reload.
+
+    Args:
+        syllabus_dir: directory holding topics_<key>.csv
+        subjects: {filename key: Subject name}
+        load: loader (syllabus_dir, subjects) -> task_db (columns dict, DataFrame or a
+            prebuilt TopicIndex such as shared_index.load_shared_index's mapping)
+        brain_factory: task_db -> brain
+    """
+
+    def __init__(self, syllabus_dir=DEFAULT_SYLLABUS_DIR, subjects=SUBJECT_FILES, load=load_syllabus, brain_factory=StrictoBrain):
+        self.syllabus_dir = syllabus_dir
+        self.subjects = subjects
+        self._load = load
+        self._brain_factory = brain_factory
+        self._snapshot = None
+        self._reload_lock = threading.Lock()
+        self._watcher = None
+        self._stop = threading.Event()
+        self.reloads = 0
+        self.last_error = None
+
+    @property
+    def snapshot(self):
+        """Active SyllabusSnapshot (None before the first load)."""
+        return self._snapshot
+
+    @property
+    def brain(self):
+        snapshot = self._snapshot
+        return snapshot.brain if snapshot else None
+
+    def changed(self):
+        """True when any syllabus file's size/mtime differs from the active snapshot."""
+        snapshot = self._snapshot
+        return snapshot is None or syllabus_stamps(self.syllabus_dir, self.subjects) != snapshot.stamps
+
+    def reload(self, force=True):
+        """
+        Build a new snapshot and swap it in. Concurrent calls collapse into one.
+        A failed or empty load keeps the current snapshot.
+
+        Args:
+            force: reload even if no file changed
+
+        Returns:
+            True if a new snapshot was installed
+        """
+        with self._reload_lock:
+            if not force and not self.changed():
+                return False
+
+            started = time.perf_counter()
+            try:
+                # Stamps first: an edit landing mid-load is caught by the next poll
+                stamps = syllabus_stamps(self.syllabus_dir, self.subjects)
+                version = syllabus_version(self.syllabus_dir, self.subjects)
+                task_db = self._load(self.syllabus_dir, self.subjects)
+                brain = self._brain_factory(task_db)
+                if not len(brain.topic_index) and self._snapshot is not None and len(self._snapshot.brain.topic_index):
+                    raise ValueError("new syllabus is empty")
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                if self._snapshot is None:
+                    raise
+                log.error("Syllabus reload failed, keeping version %s: %s", self._snapshot.version, e)
+                return False
+
+            load_seconds = time.perf_counter() - started
+            previous = self._snapshot
+            self._snapshot = SyllabusSnapshot(brain, task_db, version, stamps, datetime.now(), load_seconds)
+            self.last_error = None
+            if previous is not None:
+                self.reloads += 1
+                log.info("Syllabus reloaded: %s -> %s (%d topics, %.0f ms)", previous.version, version, len(brain.topic_index), load_seconds * 1000)
+            return True
+
+    def reload_if_changed(self):
+        return self.reload(force=False)
+
+    def unload(self):
+        """Drop the active snapshot (requests holding its brain keep it); the next reload() starts over."""
+        with self._reload_lock:
+            self._snapshot = None
+
+    def watch(self, interval=30.0):
+        """Poll file mtimes every `interval` seconds from a daemon thread."""
+        if self._watcher is not None or interval <= 0:
+            return
+        self._stop.clear()
+
+        def poll():
+            while not self._stop.wait(interval):
+                try:
+                    self.reload_if_changed()
+                except Exception:
+                    log.exception("Syllabus watcher error")
+
+        self._watcher = threading.Thread(target=poll, name="syllabus-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+    def install_sighup(self):
+        """`kill -HUP <worker pid>` forces a reload (main thread only, POSIX only)."""
+        if not hasattr(signal, "SIGHUP") or threading.current_thread() is not threading.main_thread():
+            return False
+
+        def on_sighup(signum, frame):
+            # Never load inside the signal handler: hand off to a thread
+            threading.Thread(target=self.reload, name="syllabus-sighup", daemon=True).start()
+
+        signal.signal(signal.SIGHUP, on_sighup)
+        return True
+
+    def status(self):
+        """JSON-friendly summary of the active snapshot (admin endpoint)."""
+        snapshot = self._snapshot
+        if snapshot is None:
+            return {"version": None, "loaded": False, "last_error": self.last_error}
+        index = snapshot.brain.topic_index
+        return {
+            "version": snapshot.version,
+            "loaded": True,
+            "loaded_at": snapshot.loaded_at.isoformat(timespec="seconds"),
+            "load_ms": round(snapshot.load_seconds * 1000, 1),
+            "topics": len(index),
+            "subjects": {subject: len(index.subject(subject)) for subject in index.subjects},
+            "reloads": self.reloads,
+            "last_error": self.last_error,
+        }
+
+
+# ==========================================
+# EXAM SHARDS
+# ==========================================
+
+# Estimated resident bytes per topic (rows, index arrays, columns) plus per character
+# of topic text, measured with tracemalloc on a 100k-topic syllabus
+TOPIC_BYTES = 450
+TEXT_CHAR_BYTES = 4
+
+
+def normalize_exam(exam):
+    """'SSC' / ' ssc ' -> 'ssc'"""
+    return str(exam).strip().lower()
+
+
+def snapshot_bytes(snapshot):
+    """Estimated memory held by one loaded syllabus snapshot."""
+    index = snapshot.brain.topic_index
+    if getattr(index, "nbytes", 0):  # memory-mapped: the file's pages, shared between workers
+        return index.nbytes
+    text = sum(len(row.topic) + len(row.sub_topic) for subject in index.subjects for row in index.subject(subject).rows)
+    return TOPIC_BYTES * len(index) + TEXT_CHAR_BYTES * text
+
+
+def discover_exams(exams_dir):
+    """{exam: (directory, subjects)} for every <exams_dir>/<exam>/ holding topics_*.csv files."""
+    exams = {}
+    for name in sorted(os.listdir(exams_dir)):
+        directory = os.path.join(exams_dir, name)
+        if os.path.isdir(directory):
+            subjects = exam_subjects(directory)
+            if subjects:
+                exams[normalize_exam(name)] = (directory, subjects)
+    return exams
+
+
+class ExamRegistry:
+    """
+    Syllabus shards keyed by exam, each its own hot-reloadable SyllabusRegistry
+    (so a topic lives at (exam, subject)).
+
+    Nothing is read until an exam is first requested: startup and per-request cost
+    do not grow with the number of exams (routing is one dict lookup). Once the
+    estimated size of the loaded shards exceeds `memory_budget`, the least recently
+    used exams are unloaded; the default exam stays loaded.
+
+    Args:
+        exams: {exam: (syllabus_dir, {filename key: Subject name})}
+        default: exam for requests that name none (must be in `exams`)
+        memory_budget: bytes of loaded shards kept (0 = unlimited), see snapshot_bytes
+        load, brain_factory: passed to every SyllabusRegistry
+    """
+
+    def __init__(self, exams, default, memory_budget=0, load=load_syllabus, brain_factory=StrictoBrain):
+        self.default = normalize_exam(default)
+        self._shards = {normalize_exam(exam): SyllabusRegistry(directory, subjects, load, brain_factory)
+                        for exam, (directory, subjects) in exams.items()}
+        if self.default not in self._shards:
+            raise KeyError(f"default exam {default!r} has no syllabus")
+        self.memory_budget = memory_budget
+        self._last_used = {}
+        self._sizes = {}
+        self._load_lock = threading.Lock()
+        self._watcher = None
+        self._stop = threading.Event()
+        self.evictions = 0
+
+    @property
+    def exams(self):
+        return sorted(self._shards)
+
+    def shard(self, exam=None):
+        """SyllabusRegistry of `exam` (None = default), loaded or not. Raises KeyError for unknown exams."""
+        exam = self.default if exam is None else normalize_exam(exam)
+        registry = self._shards[exam]
+        self._last_used[exam] = time.monotonic()
+        return registry
+
+    def load(self, exam=None):
+        """
+        Load an exam's syllabus if it is not loaded yet, then evict over budget.
+
+        Returns:
+            True if this call loaded it (False: already loaded)
+        """
+        return self.pin(exam)[1]
+
+    def pin(self, exam=None):
+        """
+        Active snapshot of an exam, loaded first if needed (see load). Callers keep
+        this reference for the whole request instead of re-reading registry.snapshot:
+        another exam's load may evict this one at any moment, which only drops the
+        registry's reference.
+
+        Returns:
+            (snapshot, loaded): loaded is True if this call did the load
+        """
+        exam = self.default if exam is None else normalize_exam(exam)
+        registry = self.shard(exam)
+        snapshot = registry.snapshot
+        if snapshot is not None:
+            return snapshot, False
+        with self._load_lock:
+            snapshot = registry.snapshot
+            if snapshot is not None:
+                return snapshot, False
+            registry.reload(force=False)
+            snapshot = registry.snapshot
+            self._sizes[exam] = snapshot_bytes(snapshot)
+            log.info("Exam %s loaded: %d topics, ~%.1f MB", exam, len(snapshot.brain.topic_index), self._sizes[exam] / 1e6)
+            self._evict(keep=exam)
+        return snapshot, True
+
+    def _evict(self, keep):
+        if self.memory_budget <= 0:
+            return
+        loaded = [exam for exam, registry in self._shards.items() if registry.snapshot is not None]
+        total = sum(self._sizes.get(exam, 0) for exam in loaded)
+        for exam in sorted(loaded, key=lambda e: self._last_used.get(e, 0)):
+            if total <= self.memory_budget:
+                break
+            if exam in (keep, self.default):
+                continue
+            self._shards[exam].unload()
+            total -= self._sizes.pop(exam, 0)
+            self.evictions += 1
+            log.info("Exam %s unloaded (shards over %.1f MB budget)", exam, self.memory_budget / 1e6)
+
+    def loaded(self):
+        return [exam for exam in self.exams if self._shards[exam].snapshot is not None]
+
+    @property
+    def reloads(self):
+        return sum(registry.reloads for registry in self._shards.values())
+
+    def reload(self, force=True, exam=None):
+        """Reload every loaded exam (or only `exam`, if loaded); returns the exams that got a new snapshot."""
+        only = None if exam is None else normalize_exam(exam)
+        reloaded = [name for name in self.loaded() if only in (None, name) and self._shards[name].reload(force)]
+        for name in reloaded:
+            snapshot = self._shards[name].snapshot
+            if snapshot is not None:
+                self._sizes[name] = snapshot_bytes(snapshot)
+        return reloaded
+
+    def watch(self, interval=30.0):
+        """Poll the files of loaded exams every `interval` seconds from one daemon thread."""
+        if self._watcher is not None or interval <= 0:
+            return
+        self._stop.clear()
+
+        def poll():
+            while not self._stop.wait(interval):
+                try:
+                    self.reload(force=False)
+                except Exception:
+                    log.exception("Syllabus watcher error")
+
+        self._watcher = threading.Thread(target=poll, name="syllabus-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+    def install_sighup(self):
+        """`kill -HUP <worker pid>` reloads every loaded exam (main thread only, POSIX only)."""
+        if not hasattr(signal, "SIGHUP") or threading.current_thread() is not threading.main_thread():
+            return False
+
+        def on_sighup(signum, frame):
+            threading.Thread(target=self.reload, name="syllabus-sighup", daemon=True).start()
+
+        signal.signal(signal.SIGHUP, on_sighup)
+        return True
+
+    def status(self):
+        """Per-exam summary: loaded shards with their SyllabusRegistry.status(), plus memory use."""
+        return {
+            "default": self.default,
+            "memory_budget_mb": round(self.memory_budget / 1e6, 1),
+            "memory_mb": round(sum(self._sizes.values()) / 1e6, 1),
+            "evictions": self.evictions,
+            "exams": {exam: dict(self._shards[exam].status(), memory_mb=round(self._sizes.get(exam, 0) / 1e6, 1))
+                      for exam in self.exams},
+        }
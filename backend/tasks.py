@@ -0,0 +1,120 @@
+"""
+Task record used everywhere inside the brain.
+
+Tasks are immutable tuples with integer minutes and enum type/priority; they are
+turned into JSON-ready dicts (or compact rows) only at the API/CLI edge.
+"""
+from collections import namedtuple
+from enum import Enum
+
+
+class TaskType(str, Enum):
+    LEARNING = "Learning"
+    PRACTICE = "Practice"
+    REVISION = "Revision"
+    TEST = "Test"
+
+
+class Priority(str, Enum):
+    HIGH = "high"
+    NORMAL = "normal"
+
+
+# Column order of the compact wire format (see tasks_to_compact)
+TASK_FIELDS = ("subject", "type", "task", "minutes", "priority", "strategy", "topic", "sub_topic", "impact")
+
+
+class Task(namedtuple("Task", TASK_FIELDS, defaults=(None, None, None))):
+    """
+    One study task.
+
+    subject, task, strategy: str
+    type: TaskType (None for fallback tasks)
+    minutes: int
+    priority: Priority (None for fallback tasks)
+    topic, sub_topic: syllabus topic the task is bound to (None if not bound)
+    impact: fallback marker (None for rule-engine tasks)
+    """
+
+    __slots__ = ()
+
+    @property
+    def hours(self):
+        return self.minutes / 60
+
+    def to_dict(self):
+        """Legacy JSON shape ("duration": "1.5 Hrs") plus integer "minutes"."""
+        data = {
+            "subject": self.subject,
+            "task": self.task,
+            "duration": f"{round(self.minutes / 60, 2)} Hrs",
+            "minutes": self.minutes,
+            "strategy": self.strategy,
+        }
+        if self.type is not None:
+            data["type"] = self.type.value
+        if self.priority is not None:
+            data["priority"] = self.priority.value
+        if self.topic is not None:
+            data["topic"] = self.topic
+        if self.sub_topic is not None:
+            data["sub_topic"] = self.sub_topic
+        if self.impact is not None:
+            data["impact"] = self.impact
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        """Inverse of to_dict() (minutes from "minutes", else parsed from "duration")."""
+        minutes = data.get("minutes")
+        if minutes is None:
+            minutes = to_minutes(float(str(data.get("duration", "0")).split()[0]))
+        return cls(
+            data["subject"],
+            TaskType(data["type"]) if data.get("type") else None,
+            data["task"],
+            int(minutes),
+            Priority(data["priority"]) if data.get("priority") else None,
+            data.get("strategy"),
+            data.get("topic"),
+            data.get("sub_topic"),
+            data.get("impact"),
+        )
+
+    def to_row(self):
+        """Compact row in TASK_FIELDS order (enums as their values)."""
+        return [
+            self.subject,
+            self.type.value if self.type is not None else None,
+            self.task,
+            self.minutes,
+            self.priority.value if self.priority is not None else None,
+            self.strategy,
+            self.topic,
+            self.sub_topic,
+            self.impact,
+        ]
+
+
+def to_minutes(hours):
+    """Hours (float, e.g. 0.75 * 1.5) -> whole minutes."""
+    return int(round(hours * 60))
+
+
+def tasks_to_wire(tasks, compact=False):
+    """
+    Serialize tasks for a response.
+
+    Returns:
+        list of dicts, or (compact) {"fields": TASK_FIELDS, "rows": [[...], ...]}
+    """
+    if compact:
+        return {"fields": list(TASK_FIELDS), "rows": [task.to_row() for task in tasks]}
+    return [task.to_dict() for task in tasks]
+
+
+def plan_to_wire(plan, compact=False):
+    """A generate_plan() result with its tasks serialized (other keys unchanged)."""
+    if "tasks" not in plan:
+        return plan
+    return dict(plan, tasks=tasks_to_wire(plan["tasks"], compact))
@@ -0,0 +1,78 @@
+from datetime import date
+
+import pytest
+
+from analytics import MAX_SUBJECTS, ActivityRollup
+from brain_engine import StrictoBrain, normalize_subject
+
+TODAY = date(2025, 1, 10)
+
+HISTORY = [
+    {"category": "MATH", "created": "2025-01-10T08:00:00Z", "completed": True, "duration": "1.5 Hrs"},
+    {"category": "MATH", "created": "2025-01-10T09:00:00Z", "completed": False},
+    {"category": "MATH", "created": "2025-01-09T09:00:00Z", "completed": True, "minutes": 30},
+    {"subject": "English", "completedAt": "2025-01-04", "completed": True, "minutes": 40},
+    {"subject": "English", "created": "2024-11-01", "completed": True, "minutes": 40},
+    {"subject": "GA", "completed": True},  # no date: skipped
+]
+
+
+def test_rollups_match_the_history():
+    rollup = ActivityRollup(normalize_subject)
+    assert rollup.ingest(HISTORY) == 5
+    summary = rollup.summary(TODAY)
+    assert summary["weekly"] == [1, 0, 0, 0, 0, 1, 1]
+    assert summary["heatmaps"]["Math"]["counts"][-2:] == [1, 1]
+    assert summary["matrix"]["counts"][-71] == 1  # 2024-11-01, 70 days back
+    assert summary["velocity"]["done"][-1] == 3 and summary["velocity"]["minutes"][-1] == 160
+    assert summary["completion_rates"] == {"Math": 0.6667, "English": 1.0}
+
+    # Incremental updates land in the same cells as a batch ingest
+    rollup.add("Math", TODAY, completed=False)
+    assert rollup.completion_rates(TODAY)["Math"] == 0.5
+    assert ActivityRollup.from_compact(rollup.to_compact(), normalize_subject).summary(TODAY) == rollup.summary(TODAY)
+
+
+def test_rates_feed_performance_adjustment_and_plans():
+    rollup = ActivityRollup(normalize_subject)
+    rollup.ingest([{"subject": "Math", "created": "2025-01-09", "completed": i < 2} for i in range(5)])
+    brain = StrictoBrain({"Subject": ["Math"], "Topic": ["Algebra"], "SubTopic": ["Basics"], "ID": [1]})
+    assert brain.get_performance_adjustment(rollup.completion_rates(TODAY))["Math"]["task_multiplier"] == 0.7
+
+    profile = {"levels": {"Math": "weak"}, "examDate": "2025-12-01", "syllabusCompleted": 10}
+    with_activity = brain.generate_plan(dict(profile, activity=rollup.to_compact()), TODAY)
+    with_rate = brain.generate_plan(dict(profile, completionHistory={"Math": 0.4}), TODAY)
+    assert with_activity["tasks"] == with_rate["tasks"]
+
+
+def test_analytics_endpoint_round_trips_the_rollup(client):
+    first = client.post("/analytics", json={"tasks": HISTORY[:3], "date": "2025-01-10"}).json
+    second = client.post("/analytics", json={"tasks": HISTORY[3:], "rollup": first["rollup"], "date": "2025-01-10"}).json
+    assert second["weekly"] == [1, 0, 0, 0, 0, 1, 1]
+    assert second["adjustments"]["Math"]["completion_rate"] == 0.6667
+    assert client.post("/analytics", json={"tasks": [{"subject": "Math", "created": "soon"}]}).status_code == 400
+
+
+def test_compact_rollups_are_validated():
+    rollup = ActivityRollup.from_compact({"v": 1, "base": TODAY.toordinal(), "subjects": ["Math", "MATH", "english"],
+                                          "cells": [[1, 0, 2, 1, 30], [2, 0, 1, 1, 40]]}, normalize_subject, TODAY)
+    assert rollup.subjects == ["Math", "English"] and rollup.completion_rates(TODAY) == {"Math": 0.5, "English": 1.0}
+
+    for cells in ([[-1, 0, 1, 1, 0]], [[3, 0, 1, 1, 0]], [[0, 2, 1, 1, 0]], [[0, 2 ** 70, 1, 1, 0]]):
+        with pytest.raises(ValueError):
+            ActivityRollup.from_compact({"v": 1, "base": TODAY.toordinal(), "subjects": ["Math", "GA", "English"], "cells": cells}, normalize_subject, TODAY)
+    with pytest.raises(ValueError):
+        ActivityRollup.from_compact({"v": 1, "base": 10 ** 15, "subjects": ["Math"], "cells": [[0, 0, 1, 1, 0]]}, normalize_subject, TODAY)
+    with pytest.raises(ValueError):
+        ActivityRollup(str).ingest([{"subject": f"S{n}", "created": "2025-01-10"} for n in range(MAX_SUBJECTS + 1)])
+    # No window: the span itself is capped
+    with pytest.raises(ValueError):
+        ActivityRollup(str).ingest([{"subject": "Math", "created": "1000-01-01"}, {"subject": "Math", "created": "9999-12-31"}])
+
+
+def test_analytics_endpoint_bounds_the_window(client):
+    old = client.post("/analytics", json={"tasks": [{"subject": "Math", "created": "1000-01-01", "completed": True}], "date": "2025-01-10"})
+    assert old.status_code == 200 and old.json["rollup"]["cells"] == []  # outside the window: skipped
+    assert client.post("/analytics", json={"tasks": [{"subject": "Math", "created": "9999-12-31"}], "date": "2025-01-10"}).status_code == 400
+    huge = {"v": 1, "base": 1, "subjects": ["Math"], "cells": [[0, 3_000_000, 1, 1, 0]]}
+    assert client.post("/analytics", json={"rollup": huge, "date": "2025-01-10"}).status_code == 400
@@ -0,0 +1,132 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app(ADMIN_TOKEN="secret")
+
+
+def test_brain_is_built_on_first_request(app, client):
+    registry = app.extensions["stricto"]
+    assert registry.brain is None
+
+    plan = client.post("/get-daily-plan", json={"levels": {"Math": "weak"}, "examDate": "2030-01-01"}).json
+    assert plan["subjects"] == {"Math": len(plan["tasks"])}
+    assert registry.brain is not None
+
+    assert client.get("/admin/syllabus").status_code == 403
+    status = client.get("/admin/syllabus", headers={"X-Admin-Token": "secret"}).json
+    assert status["topics"] == 2 and status["version"] == registry.snapshot.version
+
+
+def test_requests_are_routed_to_their_exam_shard(make_app, tmp_path):
+    (tmp_path / "exams" / "upsc").mkdir(parents=True)
+    (tmp_path / "exams" / "upsc" / "topics_polity.csv").write_text("id,topic,sub-topic\n1,Constitution,Preamble\n")
+    app = make_app(EXAMS_DIR=tmp_path / "exams")
+    client = app.test_client()
+
+    tasks = client.post("/get-daily-task", json={"exam": "UPSC", "subject": "polity", "examDate": "2030-01-01"}).json["tasks"]
+    assert tasks[0]["topic"] == "Constitution"
+    # Only the exam asked for was loaded
+    assert app.extensions["stricto_exams"].loaded() == ["upsc"]
+    assert client.post("/get-daily-task", json={"exam": "cat"}).status_code == 400
+    assert client.post("/get-daily-plan", json={"levels": {"Math": "weak"}}).json["subjects"] == {"Math": 5}
+
+
+def test_evicted_or_broken_shards_do_not_fail_the_request(make_app, tmp_path, monkeypatch):
+    for exam in ("upsc", "banking"):
+        (tmp_path / "exams" / exam).mkdir(parents=True)
+        (tmp_path / "exams" / exam / "topics_polity.csv").write_text("id,topic,sub-topic\n1,Constitution,Preamble\n")
+    app = make_app(EXAMS_DIR=tmp_path / "exams", EXAM_MEMORY_MB=1e-9)
+    client = app.test_client()
+    exams = app.extensions["stricto_exams"]
+    evict = exams._evict
+
+    def evict_then_lose(keep):
+        # A concurrent request for another exam evicts this one as soon as it is loaded
+        evict(keep)
+        if keep == "upsc":
+            exams.shard("upsc").unload()
+
+    monkeypatch.setattr(exams, "_evict", evict_then_lose)
+    body = {"exam": "upsc", "subject": "polity", "examDate": "2030-01-01"}
+    assert client.post("/get-daily-task", json=body).json["tasks"][0]["topic"] == "Constitution"
+    assert "upsc" not in exams.loaded()
+
+    def broken(*args):
+        raise ValueError("bad syllabus")
+
+    monkeypatch.setattr(exams.shard("banking"), "_load", broken)
+    for path in ("/get-daily-task", "/get-daily-plan"):
+        response = client.post(path, json={"exam": "banking"})
+        assert response.status_code == 503 and response.json == {"error": "Syllabus unavailable: bad syllabus"}
+
+
+def test_admin_reload_of_an_unloaded_exam_is_accounted(make_app, tmp_path):
+    for exam in ("upsc", "banking"):
+        (tmp_path / "exams" / exam).mkdir(parents=True)
+        (tmp_path / "exams" / exam / "topics_polity.csv").write_text("id,topic,sub-topic\n1,Constitution,Preamble\n")
+    app = make_app(EXAMS_DIR=tmp_path / "exams", EXAM_MEMORY_MB=1e-9, ADMIN_TOKEN="secret")
+    client = app.test_client()
+    exams = app.extensions["stricto_exams"]
+    admin = {"X-Admin-Token": "secret"}
+    for exam in ("upsc", "banking"):
+        status = client.post(f"/admin/syllabus/reload?exam={exam}", headers=admin).json
+        assert status["loaded"] and status["reloaded"]
+        # Loaded through the ExamRegistry: sized, and the other shard evicted over budget
+        assert exams.loaded() == [exam] and exams.status()["exams"][exam]["memory_mb"] >= 0
+        assert exams._sizes.keys() == {exam}
+    assert exams.evictions == 1
+    # Resident shards are reloaded in place, only the one asked for
+    assert client.post("/admin/syllabus/reload?exam=banking&force=0", headers=admin).json["reloaded"] is False
+    assert client.post("/admin/syllabus/reload?exam=banking", headers=admin).json["reloaded"] is True
+    assert client.post("/admin/syllabus/reload?exam=cat", headers=admin).status_code == 400
+
+def test_task_and_plan_notes_agree_for_the_same_profile(client):
+    for user_type, level, beginner in (("beginner", "weak", True), ("repeater", "beginner", False)):
+        profile = {"subject": "Math", "level": level, "levels": {"Math": level}, "userType": user_type, "examDate": "2030-01-01"}
+        note = client.post("/get-daily-task", json=profile).json["note"]
+        assert note == client.post("/get-daily-plan", json=profile).json["note"]
+        assert ("Est. Syllabus Completion" in note) is beginner
+
+
+def test_import_does_not_load_pandas_or_syllabus():
+    code = "import sys, server; print('pandas' in sys.modules, server.app.extensions['stricto'].brain)"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.split() == ["False", "None"]
+
+
+def test_asgi_import_builds_no_second_app(tmp_path):
+    # What every ASGI pool process does: no module-level app, so no progress store opened
+    env = dict(os.environ, STRICTO_PROGRESS_DB=str(tmp_path / "progress.db"))
+    subprocess.run([sys.executable, "-c", "import asgi_app"], env=env, check=True)
+    assert not (tmp_path / "progress.db").exists()
+
+
+def test_calendar_streams_ndjson(client):
+    response = client.post("/get-calendar", json={
+        "levels": {"Math": "weak"}, "examDate": "2030-01-01", "start": "2029-12-01", "end": "2029-12-07",
+    })
+    assert response.mimetype == "application/x-ndjson"
+    days = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [d["date"] for d in days] == [f"2029-12-0{i}" for i in range(1, 8)]
+    assert all(d["tasks"] for d in days)
+
+    assert client.post("/get-calendar", json={"start": "soon"}).status_code == 400
+    assert client.post("/get-calendar", json={"start": "2020-01-01", "end": "2030-01-01"}).status_code == 400
+
+
+def test_complete_task_endpoint(client):
+    profile = {"levels": {"Math": "weak"}, "examDate": "2030-01-01"}
+    tasks = client.post("/get-daily-plan", json=profile).json["tasks"]
+    topic_task = next(t for t in tasks if t.get("topic") == "Algebra")
+
+    delta = client.post("/complete-task", json=dict(profile, tasks=tasks, completed=topic_task)).json
+    assert delta["state"]["topicProgress"] == {"Math": 1}
+    assert set(delta) == {"added", "removed", "changed", "state"}
+    assert client.post("/complete-task", json=dict(profile, tasks=tasks)).status_code == 400
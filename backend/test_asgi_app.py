@@ -0,0 +1,125 @@
+import asyncio
+import json
+import threading
+
+import pytest
+
+from asgi_app import create_asgi_app
+
+PROFILE = {"levels": {"Math": "weak"}, "examDate": "2030-01-01"}
+
+
+@pytest.fixture
+def config(app_config):
+    return dict(app_config, ASGI_POOL_WORKERS=0)
+
+
+def call(app, path, body=None, method="POST", headers=()):
+    """One request through the ASGI interface: (status, headers dict, body bytes)."""
+    async def run():
+        messages = [{"type": "http.request", "body": json.dumps(body).encode() if body is not None else b""}]
+        sent = []
+
+        async def receive():
+            return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+        async def send(message):
+            sent.append(message)
+
+        await app({"type": "http", "method": method, "path": path, "headers": list(headers)}, receive, send)
+        return sent
+
+    start, *body_messages = asyncio.run(run())
+    return start["status"], dict(start["headers"]), b"".join(m["body"] for m in body_messages)
+
+
+def test_daily_task_and_plan_match_the_flask_app(config):
+    app = create_asgi_app(config)
+    client = app.flask_app.test_client()
+    body = {"subject": "Math", "examDate": "2030-01-01", "topicProgress": {"Math": 1}}
+
+    status, headers, task = call(app, "/get-daily-task", body)
+    assert status == 200 and headers[b"access-control-allow-origin"] == b"*"
+    assert json.loads(task) == client.post("/get-daily-task", json=body).json
+    status, _, plan = call(app, "/get-daily-plan", PROFILE)
+    assert json.loads(plan) == client.post("/get-daily-plan", json=PROFILE).json
+
+    # Second identical request: cache hit, and 304 for the ETag the client holds
+    etag = headers[b"etag"]
+    status, _, cached = call(app, "/get-daily-task", body, headers=[(b"if-none-match", etag)])
+    assert status == 304 and cached == b""
+    assert app.cache.stats()["hits"] >= 1
+
+    assert call(app, "/nope", {})[0] == 404
+    assert call(app, "/get-daily-task", method="GET")[0] == 405
+    assert call(app, "/get-daily-task", method="OPTIONS")[0] == 204
+    assert call(app, "/get-daily-task", [1, 2])[0] == 400
+
+
+def test_calendar_and_batch_run_in_the_process_pool(config):
+    app = create_asgi_app(dict(config, ASGI_POOL_WORKERS=1))
+    try:
+        profile = dict(PROFILE, start="2029-12-20")
+        status, headers, body = call(app, "/get-calendar", profile)
+        assert status == 200 and headers[b"content-type"] == b"application/x-ndjson"
+        expected = app.flask_app.test_client().post("/get-calendar", json=profile).get_data()
+        assert body == expected and len(body.splitlines()) == 12
+        assert call(app, "/get-calendar", {"start": "soon"})[0] == 400
+
+        profiles = [PROFILE, {"levels": {"Math": "strong"}, "examDate": "2030-01-01", "wireFormat": "compact"}, {"dailyHours": "lots"}]
+        status, _, body = call(app, "/get-daily-plans", {"profiles": profiles})
+        plans = json.loads(body)["plans"]
+        assert status == 200 and len(plans) == 3
+        assert plans[0]["tasks"][0]["subject"] == "Math" and "rows" in plans[1]["tasks"]
+        assert "error" in plans[2]
+        assert app.pool.pending == 0
+    finally:
+        app.close()
+
+
+def test_admission_limits(config):
+    app = create_asgi_app(dict(config, ASGI_MAX_BODY=100, ASGI_MAX_BATCH=2))
+    assert call(app, "/get-daily-task", {"subject": "Math", "padding": "x" * 200})[0] == 413
+    assert call(app, "/get-daily-plans", {"profiles": [{}, {}, {}]})[0] == 413
+
+    app.in_flight = app.config["ASGI_MAX_IN_FLIGHT"]
+    status, headers, _ = call(app, "/get-daily-task", {})
+    assert status == 503 and headers[b"retry-after"] == b"1"
+    app.in_flight = 0
+
+    app.pool.pending = app.pool.max_pending
+    assert call(app, "/get-calendar", dict(PROFILE, start="2029-12-20"))[0] == 503
+    assert call(app, "/get-daily-task", {"subject": "Math"})[0] == 200  # inline work is still served
+    assert app.rejected == 2
+
+
+def test_syllabus_loads_and_store_lookups_run_off_the_event_loop(config, tmp_path, monkeypatch):
+    app = create_asgi_app(dict(config, PROGRESS_DB=str(tmp_path / "progress.db")))
+    app.store.save_state("u1", {"topicProgress": {"Math": 1}})
+    threads = []
+    for owner, name in ((app.exams, "pin"), (app.store, "load_state")):
+        def spy(*args, _original=getattr(owner, name), **kwargs):
+            threads.append(threading.get_ident())
+            return _original(*args, **kwargs)
+        monkeypatch.setattr(owner, name, spy)
+
+    task = json.loads(call(app, "/get-daily-task", {"userId": "u1", "subject": "Math", "examDate": "2030-01-01"})[2])
+    assert any(t.get("topic") == "Geometry" for t in task["tasks"])
+    plan = json.loads(call(app, "/get-daily-plan", dict(PROFILE, userId="u1"))[2])
+    assert "Algebra" not in {t.get("topic") for t in plan["tasks"]}
+    # asyncio.run() runs the loop on this thread
+    assert len(threads) == 3 and threading.get_ident() not in threads
+    app.close()
+
+
+def test_failed_syllabus_load_is_a_503_as_on_the_flask_app(config, monkeypatch):
+    app = create_asgi_app(config)
+
+    def broken(*args):
+        raise ValueError("bad syllabus")
+
+    monkeypatch.setattr(app.exams.shard(), "_load", broken)
+    status, _, body = call(app, "/get-daily-task", {"subject": "Math"})
+    flask = app.flask_app.test_client().post("/get-daily-task", json={"subject": "Math"})
+    assert (status, json.loads(body)) == (flask.status_code, flask.json) == (503, {"error": "Syllabus unavailable: bad syllabus"})
+    assert app.rejected == 0
@@ -0,0 +1,70 @@
+import json
+from datetime import date
+
+from bulk_plans import generate_plans_bulk, main
+from progress_store import ProgressStore
+
+TODAY = date(2025, 1, 10)
+
+
+def make_profiles():
+    profiles = []
+    for i, exam_date in enumerate(["2025-01-20", "2025-03-01", "2025-12-01", "other", "bad-date"]):
+        for user_type in ("beginner", "repeater"):
+            profiles.append({
+                "userId": f"{user_type}-{i}",
+                "levels": {"MATH": "weak", "GA": "strong"},
+                "examDate": exam_date,
+                "examStage": "Mains" if i % 2 else "Prelims",
+                "userType": user_type,
+                "syllabusCompleted": 20 * i,
+                "topicProgress": {"Math": i % 3},
+                "completionHistory": {"Math": 0.1 * i},
+            })
+    profiles.append({"dailyHours": "not-a-number"})
+    return profiles
+
+
+def test_bulk_matches_single_plans_in_input_order(brain):
+    profiles = make_profiles()
+    expected = [brain.generate_plan(p, TODAY) for p in profiles[:-1]]
+
+    plans = list(generate_plans_bulk(brain, profiles, TODAY, workers=1, chunk_size=3))
+
+    assert plans[:-1] == expected
+    assert "error" in plans[-1]
+
+
+def test_bulk_process_pool(brain):
+    profiles = make_profiles()[:-1]
+    plans = list(brain.generate_plans_bulk(profiles, TODAY, workers=2, chunk_size=4))
+    assert plans == [brain.generate_plan(p, TODAY) for p in profiles]
+
+
+def test_malformed_rows_do_not_abort_the_run(tmp_path, monkeypatch):
+    (tmp_path / "topics_math.csv").write_text("id,topic,sub-topic\n1,Algebra,Basics\n")
+    (tmp_path / "profiles.csv").write_text(
+        'userId,examDate,levels\n'
+        'a,2030-01-01,"{""Math"": ""weak""}"\n'
+        'b,2030-01-01,{},extra,fields\n'
+        'c,2030-01-01,{not json\n'
+        'd,2030-01-01,\n'
+        'e,2030-01-01,\n'
+    )
+    merge = ProgressStore.merge_profile
+
+    def broken_for_d(store, profile, subjects=None):
+        if profile.get("userId") == "d":
+            raise TypeError("bad stored state")
+        return merge(store, profile, subjects)
+
+    monkeypatch.setattr(ProgressStore, "merge_profile", broken_for_d)
+    main([str(tmp_path / "profiles.csv"), "-o", str(tmp_path / "plans.jsonl"), "--syllabus-dir", str(tmp_path),
+          "--workers", "1", "--date", "2025-01-11", "--progress-db", str(tmp_path / "progress.db")])
+
+    lines = [json.loads(line) for line in (tmp_path / "plans.jsonl").read_text().splitlines()]
+    assert [line["userId"] for line in lines] == ["a", "b", "c", "d", "e"]
+    assert "tasks" in lines[0]["plan"] and "tasks" in lines[4]["plan"]
+    assert lines[1]["plan"] == {"error": "line 3: 5 fields, the header has 3"}
+    assert lines[2]["plan"]["error"].startswith("line 4: ")
+    assert lines[3]["plan"] == {"error": "user d: stored progress: bad stored state"}
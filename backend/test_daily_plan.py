@@ -0,0 +1,97 @@
+from datetime import date
+
+from brain_engine import MAX_TASKS_LIMIT, resolve_exam_date
+
+TODAY = date(2025, 1, 10)
+
+
+def test_resolve_exam_date_formats():
+    assert resolve_exam_date("2025-03-01", TODAY)[0] == date(2025, 3, 1)
+    assert resolve_exam_date("01-03-2025", TODAY)[0] == date(2025, 3, 1)
+    assert resolve_exam_date("other", TODAY)[0] == date(2025, 6, 15)
+    assert resolve_exam_date(None, date(2025, 7, 1))[0] == date(2026, 6, 15)
+    assert resolve_exam_date("soon", TODAY)[0] == date(2025, 6, 9)
+
+
+def test_plan_covers_every_subject_in_one_call(brain):
+    plan = brain.generate_plan({"examDate": "2025-12-01", "userType": "beginner"}, today=TODAY)
+    assert plan["days_left"] == (date(2025, 12, 1) - TODAY).days
+    assert set(plan["subjects"]) == {"Math", "Reasoning", "English", "GA"}
+    assert all(count > 0 for count in plan["subjects"].values())
+
+
+def test_plan_matches_per_subject_generation(brain):
+    profile = {
+        "levels": {"MATH": "weak", "english": "strong"},
+        "examDate": "2025-12-01", "userType": "beginner", "syllabusCompleted": 10,
+        "topicProgress": {"Math": 1},
+    }
+    plan = brain.generate_plan(profile, today=TODAY)
+    days_left = plan["days_left"]
+    expected = (
+        brain.generate_task("Math", "weak", "Prelims", days_left, "beginner", 10, 6, {"Math": 1}, today=TODAY)
+        + brain.generate_task("English", "strong", "Prelims", days_left, "beginner", 10, 6, {"Math": 1}, today=TODAY)
+    )
+    assert plan["tasks"] == expected
+    assert plan["tasks"][1].task == "Foundation Concept Building: Geometry - Triangles"
+
+
+def test_task_limit_applies_to_whole_day(brain):
+    # Repeater, Prelims, < 30 days: 5+ tasks per subject -> 20+ before the cap
+    plan = brain.generate_plan({"examDate": "2025-01-25"}, today=TODAY)
+    assert len(plan["tasks"]) == MAX_TASKS_LIMIT
+    assert plan["note"].startswith("AI Plan (15 days left): CRITICAL MODE")
+
+
+def test_plan_includes_spaced_reviews_per_subject(brain):
+    profile = {
+        "levels": {"Math": "average", "English": "average"},
+        "examDate": "2025-12-01",
+        "topicCompletionHistory": {"Math": {"Algebra": "2025-01-07", "Ratio": "2025-01-03"}},
+    }
+    tasks = brain.generate_plan(profile, today=TODAY)["tasks"]
+    reviews = [t.task for t in tasks if "Review:" in t.task]
+    assert reviews == ["3-Day Review: Algebra", "7-Day Review: Ratio"]
+    assert all(t.subject == "Math" for t in tasks if "Review:" in t.task)
+
+
+def test_calendar_walks_the_horizon(brain):
+    profile = {"levels": {"Math": "weak", "English": "strong"}, "examDate": "2025-02-10", "userType": "repeater"}
+    days = list(brain.generate_calendar(profile, TODAY))
+    assert len(days) == 31 and days[0]["date"] == "2025-01-10" and days[-1]["days_left"] == 1
+
+    # Day one is exactly today's plan
+    assert days[0]["tasks"] == brain.generate_plan(profile, TODAY)["tasks"]
+    # The topic pointer moves on, and completed topics come back as spaced reviews
+    math_topics = [t.topic for t in days[0]["tasks"] + days[1]["tasks"] if t.subject == "Math" and t.topic]
+    assert math_topics[0] == "Algebra" and "Geometry" in math_topics
+    assert any(t.task.startswith("3-Day Review: Algebra") for day in days[:5] for t in day["tasks"])
+    assert profile == {"levels": {"Math": "weak", "English": "strong"}, "examDate": "2025-02-10", "userType": "repeater"}
+
+
+def test_complete_task_returns_only_the_delta(brain):
+    profile = {"levels": {"Math": "weak", "English": "strong"}, "examDate": "2025-12-01", "userType": "repeater",
+               "syllabusCompleted": 10, "completionHistory": {"Math": 0.45}}
+    plan = brain.generate_plan(profile, TODAY)["tasks"]
+    math = [t for t in plan if t.subject == "Math"]
+    revision = next(t for t in math if t.topic == "Algebra")
+
+    # One of three Math tasks done: the rate is not lowered, nothing changes
+    delta = brain.complete_task(profile, plan, revision, today=TODAY)
+    assert delta["state"]["topicProgress"] == {"Math": 1}
+    assert delta["state"]["reviewSchedule"]["Math"]["topics"] == ["Algebra"]
+    assert delta["state"]["completionHistory"] == {"Math": 0.45}
+    assert delta["added"] == delta["removed"] == delta["changed"] == []
+
+    # Every Math task done: the rate clears 50%, the tasks cut for struggling come back
+    others = [t for t in math if t is not revision]
+    delta = brain.complete_task(profile, plan, revision, done=others, today=TODAY)
+    assert delta["state"]["completionHistory"]["Math"] > 0.5
+    assert delta["added"] and all(t.subject == "Math" for t in delta["added"])
+    finished = {t.task for t in math}
+    assert not any(t.task in finished or t.task.startswith("Concept Revision") for t in delta["added"])
+
+    # Nothing in English depends on a Math completion
+    english = next(t for t in plan if t.subject == "English")
+    delta = brain.complete_task(profile, plan, english, today=TODAY)
+    assert delta["added"] == delta["removed"] == delta["changed"] == []
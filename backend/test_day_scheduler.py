@@ -0,0 +1,77 @@
+from datetime import date
+
+import pandas as pd
+
+from brain_engine import MAX_TASKS_LIMIT, StrictoBrain
+from day_scheduler import GRANULARITY, MOCK_CAP_MINUTES, _shrink, pack_day
+from tasks import Priority, Task, TaskType
+
+TODAY = date(2025, 1, 10)
+
+
+def task(subject, text, minutes, type=TaskType.PRACTICE, priority=Priority.NORMAL):
+    return Task(subject, type, text, minutes, priority, "Test")
+
+
+def test_fills_budget_exactly_and_keeps_habits():
+    tasks = [
+        task("English", "Editorial Reading (The Hindu)", 40, TaskType.LEARNING),
+        task("English", "Grammar Practice", 60),
+        task("Math", "Speed Calculation Drill", 20),
+        task("Math", "Concept Revision", 90, priority=Priority.HIGH),
+        task("Math", "Sectional Mock (Subject-wise)", 60, TaskType.TEST),
+    ]
+    packed = pack_day(tasks, 300)
+    assert packed.minutes == packed.budget == 300 and packed.slack == 0
+    texts = [t.task for t in packed.tasks]
+    assert texts[0].startswith("Editorial")
+    mock = next(t for t in packed.tasks if "Mock" in t.task)
+    assert mock.minutes <= MOCK_CAP_MINUTES
+    # Generation order is preserved
+    assert texts == [t.task for t in tasks if t.task in texts]
+
+
+def test_small_budget_trims_and_drops_low_rank():
+    tasks = [
+        task("English", "Editorial Reading (The Hindu)", 40, TaskType.LEARNING),
+        task("Math", "Concept Revision", 90, priority=Priority.HIGH),
+        task("Math", "Advanced Practice", 60),
+        task("GA", "Static GK", 60),
+    ]
+    packed = pack_day(tasks, 120)
+    assert packed.minutes == 120
+    assert [t.task for t in packed.tasks] == ["Editorial Reading (The Hindu)", "Concept Revision"]
+    assert packed.tasks[1].minutes == 80 and packed.dropped == 2
+
+    # Habits alone overrun the budget: they shrink instead of being dropped
+    packed = pack_day(tasks[:1] + [task("Math", "Speed Calculation Drill", 30)], 30)
+    assert len(packed.tasks) == 2 and packed.minutes <= 30
+
+
+def test_tiny_budgets_never_overrun():
+    habits = [task("English", "Editorial Reading (The Hindu)", 40, TaskType.LEARNING),
+              task("Math", "Speed Calculation Drill", 20), task("Math", "Concept Revision", 90)]
+    assert pack_day(habits, 0) == ([], 0, 0, 0, 3)
+    # One step for one habit only: the longer one stays
+    packed = pack_day(habits, GRANULARITY)
+    assert [t.task for t in packed.tasks] == ["Editorial Reading (The Hindu)"]
+    assert packed.minutes == GRANULARITY and packed.slack == 0 and packed.dropped == 2
+    assert pack_day(habits, 3).tasks == []
+    assert _shrink([0, 0], 10) == [0, 0]
+
+
+def test_packed_plan_honours_daily_hours():
+    brain = StrictoBrain(pd.DataFrame({
+        "Subject": ["Math", "English", "Reasoning", "GA"],
+        "Topic": ["Algebra", "Nouns", "Puzzles", "Static GK"],
+        "SubTopic": ["Basics", "Types", "Seating", "Dams"],
+        "ID": [1, 1, 1, 1],
+    }))
+    for hours in (0, 2, 6, 10):
+        profile = {"examDate": "2025-12-01", "dailyHours": hours, "syllabusCompleted": 70, "schedule": "packed"}
+        plan = brain.generate_plan(profile, TODAY)
+        assert plan["budget_minutes"] == hours * 60
+        assert sum(t.minutes for t in plan["tasks"]) == plan["planned_minutes"] <= hours * 60
+        assert len(plan["tasks"]) <= MAX_TASKS_LIMIT
+        assert any("Editorial" in t.task for t in plan["tasks"]) == (hours > 0)
+    assert "budget_minutes" not in brain.generate_plan({"examDate": "2025-12-01"}, TODAY)
@@ -0,0 +1,37 @@
+import base64
+import logging
+
+import brain_engine
+import golden
+from logging_setup import ROOT_LOGGER
+
+
+def test_engine_matches_golden_outputs():
+    root = logging.getLogger(ROOT_LOGGER)
+    level = root.level
+    root.setLevel(logging.INFO)
+    try:
+        differences = golden.check()
+        # Quiet only while the grid runs: later tests still see engine INFO lines
+        assert root.level == logging.INFO
+    finally:
+        root.setLevel(level)
+    assert not differences, golden.report(differences)
+
+
+def test_changed_cases_are_located(monkeypatch):
+    def entry(chunk_digest, case_digests):
+        return {"grid": golden.grid_fingerprint("task"), "cases": len(case_digests),
+                "chunks": [chunk_digest.hex()], "case_digests": base64.b64encode(case_digests).decode()}
+
+    before = {"task": entry(*golden.run_chunk("task", 0))}
+    assert golden.compare(before, before) == {}
+
+    # An "optimisation" that rounds durations differently
+    monkeypatch.setattr(brain_engine, "to_minutes", lambda hours: int(hours * 60) + 1)
+    diff = golden.compare(before, {"task": entry(*golden.run_chunk("task", 0))})["task"]
+    assert diff["chunks"] == [0] and diff["cases"]
+    assert "cases changed" in golden.report({"task": diff}, show=1)
+
+    stale = dict(before["task"], grid="0" * 16)
+    assert golden.compare({"task": stale}, before)["task"]["grid_changed"]
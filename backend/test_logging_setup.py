@@ -0,0 +1,51 @@
+import io
+import json
+import logging
+
+from logging_setup import configure_logging, get_logger
+
+
+def teardown_function():
+    configure_logging({"level": "WARNING"})
+
+
+def test_text_format_keeps_component_prefix():
+    stream = io.StringIO()
+    configure_logging({"level": "DEBUG"}, stream=stream)
+    get_logger("ADAPT").debug("%s: Low completion (%.0f%%)", "Math", 45.0)
+    assert stream.getvalue() == "[ADAPT] Math: Low completion (45%)\n"
+
+
+def test_component_overrides_and_lazy_formatting():
+    stream = io.StringIO()
+    configure_logging({"level": "WARNING", "levels": "SPACED=DEBUG"}, stream=stream)
+
+    class Exploding:
+        def __str__(self):
+            raise AssertionError("formatted a disabled record")
+
+    get_logger("PRIORITY").debug("%s", Exploding())
+    get_logger("SPACED").debug("Adding 3-day review for %s", "Algebra")
+    assert stream.getvalue() == "[SPACED] Adding 3-day review for Algebra\n"
+
+    configure_logging({"level": "WARNING"}, stream=stream)
+    assert not get_logger("SPACED").isEnabledFor(logging.DEBUG)
+
+
+def test_json_mode_samples_only_below_warning():
+    stream = io.StringIO()
+    configure_logging({"level": "DEBUG", "format": "json", "sample": 0.0}, stream=stream)
+    get_logger("API").info("dropped by sampling")
+    get_logger("SPACED").warning("Invalid date format for %s: %s", "Algebra", "10/01")
+
+    lines = stream.getvalue().splitlines()
+    assert len(lines) == 1
+    entry = json.loads(lines[0])
+    assert entry["component"] == "SPACED" and entry["level"] == "WARNING"
+    assert entry["msg"] == "Invalid date format for Algebra: 10/01"
+
+
+def test_env_configuration(monkeypatch):
+    monkeypatch.setenv("STRICTO_LOG_LEVEL", "error")
+    root = configure_logging(stream=io.StringIO())
+    assert root.level == logging.ERROR
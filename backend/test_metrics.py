@@ -0,0 +1,54 @@
+import pytest
+
+import metrics
+from metrics import Counter, Histogram, stage
+
+
+@pytest.fixture
+def enabled():
+    metrics.configure_metrics(True)
+    metrics.reset()
+    yield
+    metrics.configure_metrics(False)
+    metrics.reset()
+
+
+def test_histograms_and_counters_render_prometheus_text(enabled):
+    histogram = Histogram("t_seconds", "test", ("stage",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, "a")
+    histogram.observe(0.5, "a")
+    histogram.observe(5.0, "a")
+    counter = Counter("t_total", "test", ("path",))
+    counter.inc('say "hi"')
+
+    lines = histogram.expose() + counter.expose()
+    assert 't_seconds_bucket{stage="a",le="0.1"} 1' in lines
+    assert 't_seconds_bucket{stage="a",le="1.0"} 2' in lines
+    assert 't_seconds_bucket{stage="a",le="+Inf"} 3' in lines
+    assert 't_seconds_count{stage="a"} 3' in lines
+    assert 't_total{path="say \\"hi\\""} 1' in lines
+
+
+def test_disabled_metrics_are_a_no_op():
+    metrics.configure_metrics(False)
+    with stage("strategy"):
+        pass
+    metrics.FALLBACKS.inc("generic")
+    assert metrics.STAGE_SECONDS.count("strategy") == 0 and metrics.FALLBACKS.value("generic") == 0
+    assert stage("a") is stage("b")
+
+
+def test_metrics_endpoint_reports_stages_and_fallbacks(make_app, enabled):
+    app = make_app(METRICS=True)
+    client = app.test_client()
+    client.post("/get-daily-task", json={"subject": "Math", "examDate": "2030-01-01", "userType": "beginner"})
+    client.post("/get-daily-task", json={"subject": "Math", "examDate": "2030-01-01", "userType": "beginner"})
+    client.post("/get-daily-task", json={"subject": "GA", "examDate": "soon"})
+    app.extensions["stricto"].brain.fallback_tasks("GA")
+
+    text = client.get("/metrics").get_data(as_text=True)
+    assert 'stricto_requests_total{endpoint="get-daily-task",subject="Math",user_type="beginner",exam_stage="Prelims"} 1' in text
+    assert 'stricto_fallback_total{path="generic"} 1' in text
+    assert 'stricto_stage_seconds_count{stage="strategy"}' in text
+    assert 'stricto_request_seconds_count{endpoint="stricto.get_task"} 3' in text
+    assert "stricto_response_cache_hits_total 1" in text
@@ -0,0 +1,42 @@
+import pstats
+
+import pytest
+
+from profiling import ProfileStore
+
+
+def test_header_triggers_a_capture_listed_and_downloadable(make_app, tmp_path):
+    client = make_app(PROFILE_DIR=str(tmp_path / "profiles"), ADMIN_TOKEN="secret").test_client()
+    body = {"subject": "Math", "examDate": "2030-01-01"}
+
+    assert "X-Stricto-Profile" not in client.post("/get-daily-task", json=body).headers
+    # Without the admin token the header is ignored
+    assert "X-Stricto-Profile" not in client.post("/get-daily-task", json=body, headers={"X-Stricto-Profile": "1"}).headers
+    # Profiled even though the response is cached by now
+    response = client.post("/get-daily-task", json=body, headers={"X-Stricto-Profile": "1", "X-Admin-Token": "secret"})
+    name = response.headers["X-Stricto-Profile"]
+
+    admin = {"X-Admin-Token": "secret"}
+    captures = client.get("/admin/profiles", headers=admin).json["captures"]
+    assert [(c["name"], c["endpoint"]) for c in captures] == [(name, "stricto.get_task")]
+    download = client.get(f"/admin/profiles/{name}", headers=admin)
+    (tmp_path / "capture.prof").write_bytes(download.data)
+    assert any(func[2] == "generate_task" for func in pstats.Stats(str(tmp_path / "capture.prof")).stats)
+    assert "generate_task" in client.get(f"/admin/profiles/{name}?format=text", headers=admin).get_data(as_text=True)
+    assert client.get("/admin/profiles/../server.py", headers=admin).status_code == 404
+    for query in ("limit=lots", "limit=0", "sort=__class__"):
+        response = client.get(f"/admin/profiles/{name}?format=text&{query}", headers=admin)
+        assert response.status_code == 400 and "error" in response.json
+    assert "generate_task" in client.get(f"/admin/profiles/{name}?format=text&sort=tottime&limit=5", headers=admin).get_data(as_text=True)
+
+
+def test_sampling_rotates_the_directory(make_app, tmp_path):
+    client = make_app(PROFILE_DIR=str(tmp_path / "profiles"), PROFILE_SAMPLE=1.0, PROFILE_KEEP=3).test_client()
+    for hours in range(5):
+        client.post("/get-daily-plan", json={"examDate": "2030-01-01", "dailyHours": hours + 2})
+    captures = client.get("/admin/profiles").json["captures"]
+    assert len(captures) == 3 and len({c["fingerprint"] for c in captures}) == 3
+
+    for keep in (0, -1):
+        with pytest.raises(ValueError):
+            ProfileStore(tmp_path / "profiles", keep)
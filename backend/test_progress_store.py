@@ -0,0 +1,74 @@
+import threading
+from datetime import date
+
+from progress_store import ProgressStore
+from spaced_repetition import ReviewCalendar
+from tasks import Task, TaskType
+
+TODAY = date(2025, 1, 10)
+
+
+def test_state_round_trips_and_partial_updates_keep_other_fields(tmp_path):
+    store = ProgressStore(tmp_path / "progress.db")
+    calendar = ReviewCalendar()
+    calendar.record_completion("Algebra", TODAY)
+    store.save_state("u1", {"topicProgress": {"Math": 3}, "completionHistory": {"Math": 0.7},
+                            "reviewSchedule": {"Math": calendar.to_compact()}})
+    store.save_state("u1", {"topicProgress": {"Math": 4, "English": 2}})
+
+    state = store.load_state("u1")
+    assert state["topicProgress"] == {"Math": 4, "English": 2}
+    assert state["completionHistory"] == {"Math": 0.7}
+    assert ReviewCalendar.from_compact(state["reviewSchedule"]["Math"]).due(date(2025, 1, 13))
+    assert store.load_state("u1", ["English"])["topicProgress"] == {"English": 2}
+    assert store.due_reviews(date(2025, 1, 13)) == [("u1", "Math", "Algebra", 0)]
+
+    merged = store.merge_profile({"userId": "u1", "topicProgress": {"Math": 9}})
+    assert merged["topicProgress"] == {"Math": 9, "English": 2}
+    store.close()
+
+
+def test_completions_are_batched_across_threads(tmp_path):
+    store = ProgressStore(tmp_path / "progress.db", flush_every=50)
+    task = Task("Math", TaskType.LEARNING, "Concept: Algebra - Basics", 60, None, "X", "Algebra", "Basics")
+
+    def worker(user):
+        for _ in range(40):
+            store.record_completion(user, task, TODAY)
+
+    threads = [threading.Thread(target=worker, args=(f"u{i}",)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    store.flush()
+    assert len(store.completions("u2", "Math")) == 40
+    assert store.completions("u2", "Math")[0] == ("Concept: Algebra - Basics", "Algebra", 60, TODAY)
+    store.close()
+
+
+def test_server_loads_and_saves_state_by_user(make_app, tmp_path):
+    client = make_app(PROGRESS_DB=str(tmp_path / "progress.db")).test_client()
+    profile = {"userId": "u1", "levels": {"Math": "weak"}, "examDate": "2030-01-01"}
+    tasks = client.post("/get-daily-plan", json=profile).json["tasks"]
+    done = next(t for t in tasks if t.get("topic") == "Algebra")
+    client.post("/complete-task", json=dict(profile, tasks=tasks, completed=done))
+
+    # The next plan picks up the stored pointer without the client sending it
+    topics = {t.get("topic") for t in client.post("/get-daily-plan", json=profile).json["tasks"]}
+    assert "Geometry" in topics and "Algebra" not in topics
+    single = client.post("/get-daily-task", json={"userId": "u1", "subject": "Math", "examDate": "2030-01-01"}).json
+    assert any(t.get("topic") == "Geometry" for t in single["tasks"])
+
+
+def test_completions_survive_a_restart(make_app, tmp_path):
+    app = make_app(PROGRESS_DB=str(tmp_path / "progress.db"))
+    profile = {"userId": "u1", "levels": {"Math": "weak"}, "examDate": "2030-01-01"}
+    tasks = app.test_client().post("/get-daily-plan", json=profile).json["tasks"]
+    done = next(t for t in tasks if t.get("topic") == "Algebra")
+    app.test_client().post("/complete-task", json=dict(profile, tasks=tasks, completed=done))
+    # On disk as soon as the request returns, with nothing buffered
+    assert not app.extensions["stricto_store"]._pending
+
+    restarted = make_app(PROGRESS_DB=str(tmp_path / "progress.db"))
+    assert [topic for _, topic, _, _ in restarted.extensions["stricto_store"].completions("u1", "Math")] == ["Algebra"]
@@ -0,0 +1,68 @@
+from datetime import date, timedelta
+
+from response_cache import ResponseCache, request_fingerprint
+
+
+def test_fingerprint_is_canonical():
+    a = request_fingerprint({"subject": "Math", "topicProgress": {"Math": 3, "English": 1}}, "2025-01-10", "v1")
+    b = request_fingerprint({"topicProgress": {"English": 1, "Math": 3}, "subject": "Math"}, "2025-01-10", "v1")
+    assert a == b
+    assert a != request_fingerprint({"subject": "Math"}, "2025-01-10", "v1")
+    assert a != request_fingerprint({"subject": "Math", "topicProgress": {"Math": 3, "English": 1}}, "2025-01-11", "v1")
+
+
+def test_lru_bound_and_midnight_rollover():
+    today = [date(2025, 1, 10)]
+    cache = ResponseCache(max_entries=2, today=lambda: today[0])
+    keys = [cache.key({"n": n}, "v1") for n in range(3)]
+    for key in keys:
+        cache.put(key, key.encode())
+    assert cache.get(keys[0]) is None and cache.get(keys[2]).body == keys[2].encode()
+    assert cache.stats()["evictions"] == 1
+
+    today[0] += timedelta(days=1)
+    assert cache.key({"n": 2}, "v1") != keys[2] and len(cache) == 0
+
+
+def test_etag_and_304(client):
+    body = {"subject": "MATH", "level": "weak", "examDate": "2030-01-01", "topicProgress": {"Math": 1}}
+    first = client.post("/get-daily-task", json=body)
+    etag = first.headers["ETag"]
+    assert first.status_code == 200 and first.json["tasks"]
+
+    second = client.post("/get-daily-task", json=dict(reversed(list(body.items()))))
+    assert second.get_data() == first.get_data() and second.headers["ETag"] == etag
+
+    revalidated = client.post("/get-daily-task", json=body, headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304 and revalidated.get_data() == b""
+
+    stats = client.get("/admin/cache").json
+    assert (stats["hits"], stats["misses"], stats["not_modified"]) == (2, 1, 1)
+
+
+def test_errors_are_not_cached(client):
+    for _ in range(2):
+        assert "error" in client.post("/get-daily-task", json={"subject": "Math", "reviewSchedule": {"v": 99}}).json
+    assert client.get("/admin/cache").json["entries"] == 0
+
+
+def test_key_uses_the_snapshot_the_plan_was_built_from(client, tmp_path):
+    registry = client.application.extensions["stricto"]
+    body = {"subject": "Math", "level": "weak", "examDate": "2030-01-01"}
+    client.post("/get-daily-task", json=body)
+    (tmp_path / "topics_math.csv").write_text("id,topic,sub-topic\n1,Calculus,Basics\n2,Geometry,Triangles\n")
+
+    class ReloadAfterPin(type(registry)):
+        """A reload lands right after the next request reads the active snapshot."""
+        def _swap(self):
+            snapshot, self.__class__ = self._snapshot, type(registry)
+            self.reload()
+            return snapshot
+
+        snapshot = property(lambda self: self._swap())
+        brain = property(lambda self: self._swap().brain)
+
+    registry.__class__ = ReloadAfterPin
+    assert "Algebra" in client.post("/get-daily-task", json=body).get_data(as_text=True)
+    # The Algebra plan was cached under the old version, not the new one
+    assert "Calculus" in client.post("/get-daily-task", json=body).get_data(as_text=True)
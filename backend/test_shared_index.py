@@ -0,0 +1,55 @@
+import pickle
+
+from brain_engine import StrictoBrain
+from shared_index import export_index, load_shared_index, open_index
+from syllabus_registry import SyllabusRegistry, snapshot_bytes
+from topic_index import TopicIndex
+
+
+def make_db():
+    return {
+        "Subject": ["Math", "Math", "Math", "English", "English", "GA"],
+        "Topic": ["Algebra", "Mains level Algebra", "Géométrie", "Nouns", "Pronouns", "Finance"],
+        "SubTopic": ["Basics", "Drill", "Practice", "Basics", "", "Banking"],
+        "ID": [3, 5, 9.5, 1, 2, 1],
+    }
+
+
+def test_mapped_index_matches_in_memory_index(tmp_path):
+    index = TopicIndex(make_db())
+    export_index(index, tmp_path / "index.bin")
+    mapped = open_index(tmp_path / "index.bin")
+
+    assert len(mapped) == len(index) and mapped.subjects == index.subjects
+    for subject in ["Math", "English", "GA", "Reasoning"]:
+        for last_id in [None, 0, 1, 2, 3, 5, 9, 9.5, 10]:
+            for exclude_mains in (False, True):
+                assert mapped.next_topic(subject, last_id, exclude_mains) == index.next_topic(subject, last_id, exclude_mains)
+                assert mapped.remaining(subject, last_id, exclude_mains) == index.remaining(subject, last_id, exclude_mains)
+    assert mapped.find("Math", "Géométrie") == index.find("Math", "Géométrie") == (9.5, "Géométrie", "Practice", False)
+    assert mapped.find("English", "Nouns", "Basics").id == 1
+    assert mapped.find("English", "Nouns", "Drill") is None and mapped.find("GA", "Nope") is None
+
+    # Pickles as its path (what bulk_plans / the ASGI pool ship to workers)
+    assert pickle.loads(pickle.dumps(mapped)).next_topic("Math", 3) == index.next_topic("Math", 3)
+    assert StrictoBrain(mapped).topic_index is mapped
+
+
+def test_registry_serves_the_shared_index(make_app, tmp_path):
+    csv = tmp_path / "topics_math.csv"
+    csv.write_text("id,topic,sub-topic\n1,Algebra,Basics\n2,Geometry,Triangles\n")
+    registry = SyllabusRegistry(tmp_path, {"math": "Math"}, load=load_shared_index)
+    registry.reload()
+    first = registry.snapshot.task_db.path
+    assert registry.brain.topic_index.find("Math", "Geometry").id == 2
+    assert snapshot_bytes(registry.snapshot) == registry.brain.topic_index.nbytes
+
+    # Same version: the existing file is mapped again; a new version replaces it
+    assert load_shared_index(tmp_path, {"math": "Math"}).path == first
+    csv.write_text("id,topic,sub-topic\n1,Algebra,Basics\n2,Geometry,Triangles\n3,Calculus,Limits\n")
+    assert registry.reload()
+    assert len(registry.brain.topic_index) == 3
+    assert sorted(p.name for p in (tmp_path / ".stricto_cache").glob("index-*.bin")) == [f"index-{registry.snapshot.version}.bin"]
+
+    response = make_app(SHARED_INDEX=True).test_client().post("/get-daily-task", json={"subject": "Math", "topicProgress": {"Math": 2}})
+    assert response.status_code == 200 and "Calculus" in response.get_data(as_text=True)
@@ -0,0 +1,130 @@
+import random
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from brain_engine import StrictoBrain
+from spaced_repetition import REVIEW_POLICIES, ReviewCalendar, get_policy, recompute_cohort, schedule
+
+TODAY = date(2025, 1, 30)
+
+
+def legacy_reviews(history, today):
+    """The old scan: strptime every entry, fire on exactly 3/7/21 days."""
+    reviews = []
+    for topic, day in history.items():
+        since = (today - date.fromisoformat(day)).days
+        for offset, label, hours in ((3, "3-Day Review", 0.5), (7, "7-Day Review", 0.75), (21, "21-Day Review", 1.0)):
+            if since == offset:
+                reviews.append(("Revision", f"{label}: {topic}", hours))
+    return reviews
+
+
+def test_matches_legacy_scan():
+    rng = random.Random(3)
+    history = {f"Topic {i}": (TODAY - timedelta(days=rng.randint(0, 40))).isoformat() for i in range(300)}
+    calendar = ReviewCalendar.from_history(history)
+    for offset in range(-5, 30):
+        day = TODAY + timedelta(days=offset)
+        assert calendar.due(day) == legacy_reviews(history, day)
+
+
+def test_incremental_completion_restarts_cycle():
+    calendar = ReviewCalendar()
+    calendar.record_completion("Algebra", TODAY - timedelta(days=3))
+    assert calendar.due(TODAY) == [("Revision", "3-Day Review: Algebra", 0.5)]
+
+    calendar.record_completion("Algebra", TODAY - timedelta(days=1))
+    assert calendar.due(TODAY) == []
+    assert calendar.due(TODAY + timedelta(days=2)) == [("Revision", "3-Day Review: Algebra", 0.5)]
+
+
+def test_compact_round_trip_and_prune():
+    calendar = ReviewCalendar.from_history({"Old": "2024-01-01", "Algebra": "2025-01-23", "Nouns": "2025-01-09"})
+    calendar.prune(TODAY)
+    assert "Old" not in calendar and len(calendar) == 2
+
+    compact = calendar.to_compact()
+    assert compact["topics"] == ["Algebra", "Nouns"]
+    restored = ReviewCalendar.from_compact(compact)
+    assert restored.due(TODAY) == [("Revision", "7-Day Review: Algebra", 0.75), ("Revision", "21-Day Review: Nouns", 1.0)]
+
+
+def test_invalid_dates_are_skipped():
+    calendar = ReviewCalendar.from_history({"Bad": "30/01/2025", "Missing": None, "Algebra": "2025-01-27"})
+    assert len(calendar) == 1
+
+
+def test_brain_accepts_calendar_or_history():
+    brain = StrictoBrain(pd.DataFrame())
+    history = {"Algebra": "2025-01-27"}
+    expected = [("Revision", "3-Day Review: Algebra", 0.5)]
+    assert brain.get_spaced_repetition_tasks(history, "Math", TODAY) == expected
+    assert brain.get_spaced_repetition_tasks(ReviewCalendar.from_history(history), "Math", TODAY) == expected
+
+
+def test_carry_over_keeps_missed_review_until_done():
+    calendar = ReviewCalendar.from_history({"Algebra": "2025-01-20"}, get_policy("fixed-carry"))
+    # 3-day review was due on the 23rd: still due a few days later, then superseded by the 7-day one
+    assert calendar.due(date(2025, 1, 25)) == [("Revision", "3-Day Review: Algebra", 0.5)]
+    assert calendar.due(TODAY) == [("Revision", "7-Day Review: Algebra", 0.75)]
+
+    calendar.record_review("Algebra", TODAY)
+    assert calendar.due(TODAY) == []
+    assert calendar.due(date(2025, 2, 10)) == [("Revision", "21-Day Review: Algebra", 1.0)]
+
+    restored = ReviewCalendar.from_compact(calendar.to_compact(), get_policy("fixed-carry"))
+    assert restored.due(TODAY) == [] and restored.due(date(2025, 2, 10)) == calendar.due(date(2025, 2, 10))
+
+
+def test_ease_policy_spreads_reviews_with_completion_rate():
+    policy = get_policy("ease")
+    assert policy.ease_for(0.0) == policy.min_ease and policy.ease_for(None) == policy.max_ease
+    struggling = policy.due_days(TODAY.toordinal(), ease=policy.ease_for(0.2))
+    strong = policy.due_days(TODAY.toordinal(), ease=policy.ease_for(0.9))
+    assert struggling[0] == strong[0] == TODAY.toordinal() + 3
+    assert struggling[-1] < strong[-1]
+
+    # Late review: the next interval counts from the day it was actually done
+    calendar = ReviewCalendar(policy, policy.ease_for(0.9))
+    calendar.record_completion("Tenses", TODAY)
+    calendar.record_review("Tenses", TODAY + timedelta(days=5))
+    gap = policy.due_days(0, 1, 0, policy.ease_for(0.9))[0]
+    assert calendar.due(TODAY + timedelta(days=5 + gap))[0][1].startswith(f"{5 + gap}-Day Review")
+
+
+def test_vectorized_schedule_matches_scalar_path():
+    rng = np.random.default_rng(7)
+    count = 500
+    completed = rng.integers(TODAY.toordinal() - 60, TODAY.toordinal(), count)
+    rates = rng.random(count)
+    for policy in REVIEW_POLICIES.values():
+        stage = rng.integers(0, policy.stages + 1, count)
+        last_review = completed + rng.integers(0, 30, count)
+        ease = policy.ease_for(rates)
+        due = schedule(policy, completed, stage, last_review, ease)
+        nxt = recompute_cohort(policy, completed, stage, last_review, rates)
+        for i in range(count):
+            scalar = policy.due_days(int(completed[i]), int(stage[i]), int(last_review[i]), float(np.broadcast_to(ease, (count,))[i]))
+            assert [d for d in due[i].tolist() if d >= 0] == scalar
+            assert nxt[i] == (scalar[0] if scalar else -1)
+
+
+def test_set_policy_rebuilds_calendar():
+    history = {f"Topic {i}": (TODAY - timedelta(days=i)).isoformat() for i in range(40)}
+    calendar = ReviewCalendar.from_history(history)
+    calendar.set_policy(get_policy("ease"), 1.8)
+    rebuilt = ReviewCalendar.from_history(history, get_policy("ease"), 1.8)
+    for offset in range(-10, 40):
+        day = TODAY + timedelta(days=offset)
+        assert calendar.due(day) == rebuilt.due(day)
+
+
+def test_plan_uses_review_policy():
+    brain = StrictoBrain(pd.DataFrame())
+    profile = {"levels": {"Math": "weak"}, "examDate": "2025-06-15",
+               "topicCompletionHistory": {"Math": {"Algebra": "2025-01-25"}}}
+    reviews = lambda plan: [t.task for t in plan["tasks"] if "Review" in t.task]
+    assert reviews(brain.generate_plan(profile, TODAY)) == []
+    assert reviews(brain.generate_plan(dict(profile, reviewPolicy="fixed-carry"), TODAY)) == ["3-Day Review: Algebra"]
@@ -0,0 +1,48 @@
+import itertools
+
+import pandas as pd
+import pytest
+
+from brain_engine import (DAYS_LEFT_BANDS, STRATEGY_TABLE, SYLLABUS_PHASES,
+                          StrictoBrain, strategy_key, strategy_rules)
+
+SUBJECTS = ("Math", "English", "Reasoning", "GA", "Science")
+EXAM_STAGES = ("Prelims", "Mains", "Interview")
+USER_TYPES = ("beginner", "repeater", "intermediate")
+# Every integer around every cut point, plus far-away values
+DAYS_LEFT = sorted(set(range(-3, 125)) | {200, 365, 1000})
+SYLLABUS = sorted(set(range(-1, 102)) | {150})
+HOURS = (0, 4, 5, 6, 12)
+
+
+@pytest.mark.parametrize("subject", SUBJECTS)
+def test_table_matches_decision_tree_over_full_grid(subject):
+    brain = StrictoBrain(pd.DataFrame())
+    for exam_stage, user_type, days_left, syllabus, hours in itertools.product(
+            EXAM_STAGES, USER_TYPES, DAYS_LEFT, SYLLABUS, HOURS):
+        expected = strategy_rules(subject, exam_stage, days_left, syllabus, user_type, hours)
+        got = brain.get_strategy(subject, "weak", exam_stage, days_left, syllabus, user_type, hours)
+        assert list(got) == expected, (subject, exam_stage, user_type, days_left, syllabus, hours)
+
+
+def test_fractional_inputs_fall_in_the_right_bucket():
+    brain = StrictoBrain(pd.DataFrame())
+    for days_left in (19.5, 59.9, 60.5, 119.99):
+        for syllabus in (49.5, 79.9):
+            expected = strategy_rules("GA", "Prelims", days_left, syllabus, "beginner", 4.5)
+            assert list(brain.get_strategy("GA", None, "Prelims", days_left, syllabus, "beginner", 4.5)) == expected
+
+
+def test_table_returns_shared_immutable_tuples():
+    brain = StrictoBrain(pd.DataFrame())
+    first = brain.get_strategy("Math", "weak", "Prelims", 10)
+    assert isinstance(first, tuple) and all(isinstance(s, tuple) for s in first)
+    assert brain.get_strategy("Math", "strong", "Prelims", 15) is first
+
+
+def test_table_is_small():
+    subject_classes, stages, user_types, hours = 4, 2, 3, 2
+    day_buckets = len(DAYS_LEFT_BANDS) + 2  # the 60..120 band splits at the GA "<= 60" window
+    expected = subject_classes * stages * user_types * (len(SYLLABUS_PHASES) + 1) * day_buckets * hours
+    assert len(STRATEGY_TABLE) == expected
+    assert strategy_key("Reasoning", "Mains", 10) == strategy_key("Quant", "Final", 15)
@@ -0,0 +1,72 @@
+import os
+
+import pytest
+
+import syllabus_loader
+from syllabus_loader import SyllabusError, load_task_db, read_syllabus_csv
+
+SUBJECTS = {"math": "Math", "english": "English"}
+
+
+def write_syllabus(directory, key, text):
+    path = directory / f"topics_{key}.csv"
+    path.write_text(text)
+    return path
+
+
+@pytest.fixture
+def syllabus_dir(tmp_path):
+    write_syllabus(tmp_path, "math", "id,topic,sub-topic\n1,Algebra,Basics\n2,Geometry,\n")
+    write_syllabus(tmp_path, "english", "id,topic,sub-topic\n1,Nouns,Types\n")
+    return tmp_path
+
+
+def test_columns_and_missing_values(syllabus_dir):
+    db = load_task_db(syllabus_dir, SUBJECTS, cache_path=False)
+    assert list(db.columns) == ["Subject", "Topic", "SubTopic", "ID"]
+    assert db["Subject"].tolist() == ["Math", "Math", "English"]
+    assert db["ID"].tolist() == [1, 2, 1]
+    assert db["SubTopic"].isna().tolist() == [False, True, False]  # same as pd.read_csv
+
+
+def test_warm_load_skips_csv_parsing(syllabus_dir, monkeypatch):
+    cache = syllabus_dir / "cache" / "syllabus.pkl"
+    cold = load_task_db(syllabus_dir, SUBJECTS, cache)
+    assert cache.exists()
+
+    def no_parsing(*args):
+        raise AssertionError("CSV parsed on a warm boot")
+
+    monkeypatch.setattr(syllabus_loader, "read_syllabus_csv", no_parsing)
+    assert load_task_db(syllabus_dir, SUBJECTS, cache).equals(cold)
+
+    # Touched but unchanged: the content hash keeps the cache valid
+    path = syllabus_dir / "topics_math.csv"
+    os.utime(path, ns=(0, 0))
+    assert load_task_db(syllabus_dir, SUBJECTS, cache).equals(cold)
+    monkeypatch.setattr(syllabus_loader, "_file_hash", no_parsing)
+    assert load_task_db(syllabus_dir, SUBJECTS, cache).equals(cold)  # re-stamped: no re-hash either
+
+
+def test_changed_file_invalidates_cache(syllabus_dir):
+    cache = syllabus_dir / "syllabus.pkl"
+    load_task_db(syllabus_dir, SUBJECTS, cache)
+    write_syllabus(syllabus_dir, "math", "id,topic,sub-topic\n1,Algebra,Basics\n2,Geometry,\n3,Mensuration,Area\n")
+    assert len(load_task_db(syllabus_dir, SUBJECTS, cache)) == 4
+
+    cache.write_bytes(b"garbage")
+    assert len(load_task_db(syllabus_dir, SUBJECTS, cache)) == 4
+
+
+def test_invalid_files_are_rejected(tmp_path):
+    with pytest.raises(SyllabusError, match="duplicate"):
+        read_syllabus_csv(write_syllabus(tmp_path, "math", "id,topic\n1,A\n1,B\n"), "Math")
+    with pytest.raises(SyllabusError, match="non-numeric"):
+        read_syllabus_csv(write_syllabus(tmp_path, "math", "id,topic\n1,A\nx,B\n"), "Math")
+    with pytest.raises(SyllabusError, match="missing column"):
+        read_syllabus_csv(write_syllabus(tmp_path, "math", "topic\nA\n"), "Math")
+
+    # A broken subject is skipped, the rest still loads
+    write_syllabus(tmp_path, "english", "id,topic\n1,Nouns\n")
+    db = load_task_db(tmp_path, SUBJECTS, cache_path=False)
+    assert db["Subject"].tolist() == ["English"]
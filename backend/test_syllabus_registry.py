@@ -0,0 +1,83 @@
+import os
+import time
+
+import pytest
+
+from syllabus_registry import ExamRegistry, SyllabusRegistry, discover_exams
+
+SUBJECTS = {"math": "Math"}
+
+
+def write_math(directory, topics, mtime_ns=None):
+    path = directory / "topics_math.csv"
+    path.write_text("id,topic,sub-topic\n" + "".join(f"{i},{topic},\n" for i, topic in enumerate(topics, 1)))
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+@pytest.fixture
+def registry(tmp_path):
+    write_math(tmp_path, ["Algebra", "Geometry"], mtime_ns=1_000_000_000)
+    registry = SyllabusRegistry(tmp_path, SUBJECTS)
+    registry.reload()
+    yield registry
+    registry.stop()
+
+
+def test_reload_swaps_snapshot_atomically(registry, tmp_path):
+    old = registry.snapshot
+    in_flight = registry.brain
+    assert not registry.changed() and registry.reload_if_changed() is False
+
+    write_math(tmp_path, ["Algebra", "Geometry", "Mensuration"], mtime_ns=2_000_000_000)
+    assert registry.changed() and registry.reload_if_changed() is True
+
+    new = registry.snapshot
+    assert new.version != old.version and registry.reloads == 1
+    assert new.brain.topic_index.remaining("Math") == 3
+    # A request holding the old brain keeps its consistent view
+    assert in_flight.topic_index.remaining("Math") == 2
+
+    status = registry.status()
+    assert status["version"] == new.version and status["topics"] == 3 and status["subjects"] == {"Math": 3}
+
+
+def test_failed_reload_keeps_current_syllabus(registry, tmp_path):
+    version = registry.snapshot.version
+    (tmp_path / "topics_math.csv").unlink()
+    assert registry.reload() is False
+    assert registry.snapshot.version == version and registry.brain.topic_index.remaining("Math") == 2
+    assert "empty" in registry.status()["last_error"]
+
+
+def test_watcher_picks_up_edits(registry, tmp_path):
+    registry.watch(interval=0.01)
+    write_math(tmp_path, ["Algebra"], mtime_ns=3_000_000_000)
+    deadline = time.time() + 5
+    while registry.reloads == 0 and time.time() < deadline:
+        time.sleep(0.01)
+    assert registry.brain.topic_index.remaining("Math") == 1
+
+
+def test_exam_shards_load_lazily_and_evict_least_recently_used(tmp_path):
+    for exam, topics in (("ssc", ["Algebra"]), ("banking", ["Algebra", "Geometry"]), ("upsc", ["Algebra"])):
+        (tmp_path / exam).mkdir()
+        write_math(tmp_path / exam, topics)
+    (tmp_path / "upsc" / "topics_polity.csv").write_text("id,topic,sub-topic\n1,Constitution,Preamble\n")
+
+    exams = discover_exams(tmp_path)
+    assert exams["upsc"][1] == {"math": "Math", "polity": "Polity"}
+    registry = ExamRegistry(exams, "SSC", memory_budget=1)
+    assert registry.loaded() == []
+    with pytest.raises(KeyError):
+        registry.shard("cat")
+
+    assert registry.load() is True and registry.load("ssc") is False
+    assert registry.loaded() == ["ssc"]
+    registry.load("Banking")
+    assert registry.shard("banking").brain.topic_index.remaining("Math") == 2
+    # Over budget: the shard just loaded and the default stay, the least recently used goes
+    registry.load("upsc")
+    assert registry.loaded() == ["ssc", "upsc"] and registry.evictions == 1
+    assert registry.shard("upsc").brain.topic_index.remaining("Polity") == 1
+    assert registry.status()["exams"]["banking"]["loaded"] is False
@@ -0,0 +1,44 @@
+import json
+
+from tasks import TASK_FIELDS, Priority, Task, TaskType, plan_to_wire, tasks_to_wire
+
+TASK = Task("Math", TaskType.LEARNING, "Foundation: Algebra - Basics", 135, Priority.HIGH, "BEGINNER | Prelims | 25D", "Algebra", "Basics")
+
+
+def test_dict_keeps_legacy_shape():
+    assert TASK.to_dict() == {
+        "subject": "Math", "type": "Learning", "task": "Foundation: Algebra - Basics",
+        "duration": "2.25 Hrs", "minutes": 135, "priority": "high",
+        "strategy": "BEGINNER | Prelims | 25D", "topic": "Algebra", "sub_topic": "Basics",
+    }
+    fallback = Task("GA", None, "Review GA Notes", 60, None, "Fallback", topic="General Revision", impact="Fallback")
+    assert fallback.to_dict() == {
+        "subject": "GA", "task": "Review GA Notes", "duration": "1.0 Hrs", "minutes": 60,
+        "strategy": "Fallback", "topic": "General Revision", "impact": "Fallback",
+    }
+
+
+def test_compact_rows_are_smaller():
+    tasks = [TASK] * 10
+    compact = tasks_to_wire(tasks, compact=True)
+    assert compact["fields"] == list(TASK_FIELDS)
+    assert [dict(zip(compact["fields"], row))["minutes"] for row in compact["rows"]] == [135] * 10
+    assert len(json.dumps(compact)) < len(json.dumps(tasks_to_wire(tasks))) * 0.6
+    assert plan_to_wire({"error": "bad profile"}) == {"error": "bad profile"}
+
+
+def test_api_wire_formats(client):
+    body = {"levels": {"Math": "weak"}, "examDate": "2030-01-01"}
+
+    full = client.post("/get-daily-plan", json=body).json
+    compact = client.post("/get-daily-plan", json=dict(body, wireFormat="compact")).json
+    assert all(isinstance(task["minutes"], int) for task in full["tasks"])
+    rows = [dict(zip(compact["tasks"]["fields"], row)) for row in compact["tasks"]["rows"]]
+    assert [(r["task"], r["minutes"]) for r in rows] == [(t["task"], t["minutes"]) for t in full["tasks"]]
+
+
+def test_from_dict_round_trips():
+    task = Task("Math", TaskType.LEARNING, "Concept: Algebra - Basics", 90, Priority.HIGH, "BEGINNER", "Algebra", "Basics")
+    assert Task.from_dict(task.to_dict()) == task
+    legacy = {"subject": "GA", "task": "Review GA Notes", "duration": "1.5 Hrs", "strategy": "Fallback"}
+    assert Task.from_dict(legacy) == Task("GA", None, "Review GA Notes", 90, None, "Fallback")
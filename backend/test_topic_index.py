@@ -0,0 +1,68 @@
+import math
+
+import pandas as pd
+
+from brain_engine import StrictoBrain
+from topic_index import TopicIndex
+
+
+def make_db():
+    return pd.DataFrame({
+        "Subject": ["Math", "Math", "Math", "English", "English", "English", "GA"],
+        "Topic": ["Algebra", "Mains level Algebra", "Geometry", "Nouns", "Pronouns", "Articles", "Finance"],
+        "SubTopic": ["Basics", "Drill", "Practice: mains LEVEL set", "Basics", math.nan, "Basics", "Banking/Finance"],
+        "ID": [3, 5, 9, 1, 2, 4, 1],
+    })
+
+
+def legacy_pick(kb, subject, last_id, exclude_mains):
+    rows = kb[kb["Subject"] == subject]
+    if exclude_mains:
+        rows = rows[
+            ~rows["Topic"].str.contains("mains level", case=False, na=False) &
+            ~rows["SubTopic"].str.contains("mains level", case=False, na=False)
+        ]
+    if last_id is not None:
+        rows = rows[rows["ID"] > last_id]
+    return None if rows.empty else int(rows.iloc[0]["ID"])
+
+
+def test_next_topic_matches_pandas_masking():
+    kb = make_db()
+    index = TopicIndex(kb)
+    for subject in ["Math", "English", "GA", "Reasoning"]:
+        for last_id in [None, 0, 1, 2, 3, 4, 5, 8, 9, 10]:
+            for exclude_mains in (False, True):
+                row = index.next_topic(subject, last_id, exclude_mains)
+                expected = legacy_pick(kb, subject, last_id, exclude_mains)
+                assert (row.id if row else None) == expected, (subject, last_id, exclude_mains)
+
+
+def test_remaining_counts():
+    index = TopicIndex(make_db())
+    assert index.remaining("Math") == 3
+    assert index.remaining("Math", exclude_mains=True) == 1
+    assert index.remaining("Math", 3, exclude_mains=True) == 0
+    assert index.remaining("Reasoning") == 0
+
+
+def test_missing_cells_are_blank_not_nan():
+    index = TopicIndex(make_db())
+    assert index.next_topic("English", 1).sub_topic == ""
+    assert index.next_topic("GA").topic == "Finance"
+
+
+def test_generate_task_uses_next_topic():
+    brain = StrictoBrain(make_db())
+    tasks = brain.generate_task("Math", "average", "Prelims", 200, "beginner", 10, 6, {"Math": 3})
+    topics = {t.topic for t in tasks if t.topic is not None}
+    # Only "Geometry" is left after ID 3, but it is mains level -> no topic
+    assert topics == set()
+
+    tasks = brain.generate_task("Math", "average", "Prelims", 200, "repeater", 10, 6, {"Math": 3})
+    assert {t.topic for t in tasks if t.topic is not None} == {"Mains level Algebra"}
+
+
+def test_accepts_dict_of_columns():
+    index = TopicIndex({"Subject": ["Math"], "Topic": ["Algebra"], "SubTopic": ["Basics"], "ID": ["7"]})
+    assert index.next_topic("Math", 6).id == 7
@@ -0,0 +1,63 @@
+import random
+
+from topic_index import TopicIndex
+from topic_search import TopicSearch, tokenize
+
+
+def make_db(count=400, seed=3):
+    rng = random.Random(seed)
+    words = ["Nouns", "Noun-Verb", "Banking", "Bank", "Algebra", "Ratio", "Mains level", "Profit", "Syllogism"]
+    db = {"Subject": [], "Topic": [], "SubTopic": [], "ID": []}
+    for n in range(count):
+        db["Subject"].append(rng.choice(["Math", "English", "GA"]))
+        db["Topic"].append(f"{rng.choice(words)} {rng.choice(words)} {n}")
+        db["SubTopic"].append(rng.choice(["Practice: Basics", "Practice: Mains level drill", ""]))
+        db["ID"].append(n + 1)
+    return db
+
+
+def brute_force(index, query, subject=None, min_id=None, max_id=None, mains=None):
+    words = tokenize(query)
+    hits = []
+    for name in index.subjects:
+        for row in index.subject(name).rows:
+            tokens = tokenize(f"{row.topic} {row.sub_topic}")
+            if ((subject is None or name == subject)
+                    and (min_id is None or row.id >= min_id) and (max_id is None or row.id <= max_id)
+                    and (mains is None or row.mains == mains)
+                    and all(any(token.startswith(word) for token in tokens) for word in words)):
+                hits.append((name, row))
+    return hits
+
+
+def test_search_matches_a_full_scan():
+    index = TopicIndex(make_db())
+    search = TopicSearch(index)
+    rng = random.Random(5)
+    queries = ["", "noun", "NOUNS verb", "bank", "banking practice", "mains", "ratio 1", "zzz", "syl drill", "profit profit"]
+    for _ in range(300):
+        query = rng.choice(queries)
+        filters = {
+            "subject": rng.choice([None, "Math", "GA", "Reasoning"]),
+            "min_id": rng.choice([None, 50, 120.5]),
+            "max_id": rng.choice([None, 200, 10]),
+            "mains": rng.choice([None, True, False]),
+        }
+        offset, limit = rng.choice([0, 3, 40, 500]), rng.choice([0, 1, 20])
+        expected = brute_force(index, query, **filters)
+        assert search.search(query, offset=offset, limit=limit, **filters) == (len(expected), expected[offset:offset + limit]), (query, filters)
+
+
+def test_topics_search_endpoint(make_app, tmp_path):
+    (tmp_path / "topics_english.csv").write_text(
+        "id,topic,sub-topic\n1,Types of Nouns,Practice: Basics\n2,Pronouns,Practice: Drill\n3,Banking noun traps,Practice: Mains level\n")
+    client = make_app(SUBJECT_FILES={"english": "English"}).test_client()
+    body = client.get("/topics/search?q=noun&subject=english&limit=1").json
+    assert body["total"] == 2 and body["limit"] == 1
+    assert body["results"] == [{"subject": "English", "id": 1, "topic": "Types of Nouns", "subTopic": "Practice: Basics", "mains": False}]
+    assert [r["id"] for r in client.get("/topics/search?q=noun&mains=true").json["results"]] == [3]
+    assert client.get("/topics/search?minId=2&maxId=2").json["results"][0]["topic"] == "Pronouns"
+    assert client.get("/topics/search?limit=lots").status_code == 400
+    for bound in ("minId=nan", "maxId=inf", "minId=-Infinity"):
+        assert client.get(f"/topics/search?{bound}").status_code == 400
+    assert client.get("/topics/search?mains=maybe").status_code == 400
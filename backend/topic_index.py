@@ -0,0 +1,177 @@
+from bisect import bisect_right
+from collections import namedtuple
+
+# One syllabus row, exactly as the brain hands it to a task
+TopicRow = namedtuple("TopicRow", ["id", "topic", "sub_topic", "mains"])
+
+MAINS_MARKER = "mains level"
+
+
+def _clean_text(value):
+    """Normalise a syllabus cell to str ('' for missing/NaN values)."""
+    if value is None:
+        return ""
+    try:
+        if value != value:  # float NaN
+            return ""
+    except TypeError:  # pd.NA refuses boolean comparison
+        return ""
+    return str(value)
+
+
+def _coerce_id(value):
+    """Syllabus IDs are integers; CSV loading may hand us floats or strings."""
+    try:
+        as_float = float(value)
+    except (TypeError, ValueError):
+        return None
+    if as_float != as_float:
+        return None
+    return int(as_float) if as_float.is_integer() else as_float
+
+
+def _column(table, name):
+    """Read one column as a list from a DataFrame or a dict of columns."""
+    try:
+        if name not in table:
+            return None
+    except TypeError:
+        return None
+    return list(table[name])
+
+
+class SubjectTopics:
+    """
+    Immutable, ID-sorted topic list for ONE subject.
+
+    next_core[i] is the first position >= i that is NOT a "mains level" topic,
+    so beginner filtering is a single array hop instead of a DataFrame mask.
+    """
+
+    __slots__ = ("rows", "ids", "next_core", "core_before")
+
+    def __init__(self, rows):
+        rows = tuple(sorted(rows, key=lambda r: r.id))
+        size = len(rows)
+
+        next_core = [size] * (size + 1)
+        for pos in range(size - 1, -1, -1):
+            next_core[pos] = next_core[pos + 1] if rows[pos].mains else pos
+
+        core_before = [0] * (size + 1)
+        for pos, row in enumerate(rows):
+            core_before[pos + 1] = core_before[pos] + (0 if row.mains else 1)
+
+        self.rows = rows
+        self.ids = tuple(r.id for r in rows)
+        self.next_core = tuple(next_core)
+        self.core_before = tuple(core_before)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def position_after(self, last_id=None, exclude_mains=False):
+        """Position of the first topic with ID > last_id (len(self) if none)."""
+        pos = 0 if last_id is None else bisect_right(self.ids, last_id)
+        if exclude_mains:
+            pos = self.next_core[pos]
+        return pos
+
+    def remaining(self, last_id=None, exclude_mains=False):
+        """How many topics are still ahead of last_id."""
+        pos = 0 if last_id is None else bisect_right(self.ids, last_id)
+        if exclude_mains:
+            return self.core_before[-1] - self.core_before[pos]
+        return len(self.rows) - pos
+
+    def find(self, topic, sub_topic=None):
+        """TopicRow named `topic` (and `sub_topic`, if given), or None. Linear scan."""
+        for row in self.rows:
+            if row.topic == topic and (sub_topic is None or row.sub_topic == sub_topic):
+                return row
+        return None
+
+
+class TopicIndex:
+    """
+    Per-subject topic index built ONCE from the knowledge base.
+
+    Replaces the per-request pandas masking in StrictoBrain.generate_task:
+    "next topic after ID" is a bisect, the mains-level filter is precomputed.
+
+    Args:
+        task_db: DataFrame (or dict of columns) with Subject, Topic, SubTopic, ID
+    """
+
+    def __init__(self, task_db):
+        subjects = _column(task_db, "Subject") or []
+        topics = _column(task_db, "Topic") or [""] * len(subjects)
+        sub_topics = _column(task_db, "SubTopic") or [""] * len(subjects)
+        ids = _column(task_db, "ID")
+        if ids is None:
+            # No ID column: fall back to file order
+            ids = list(range(1, len(subjects) + 1))
+
+        grouped = {}
+        for subject, topic, sub_topic, raw_id in zip(subjects, topics, sub_topics, ids):
+            topic_id = _coerce_id(raw_id)
+            if topic_id is None:
+                continue
+            topic = _clean_text(topic)
+            sub_topic = _clean_text(sub_topic)
+            mains = MAINS_MARKER in topic.lower() or MAINS_MARKER in sub_topic.lower()
+            grouped.setdefault(subject, []).append(TopicRow(topic_id, topic, sub_topic, mains))
+
+        self._subjects = {subject: SubjectTopics(rows) for subject, rows in grouped.items()}
+
+    @classmethod
+    def from_subjects(cls, subjects):
+        """Index over prebuilt {subject: SubjectTopics} (e.g. memory-mapped ones, see shared_index)."""
+        index = cls.__new__(cls)
+        index._subjects = dict(subjects)
+        return index
+
+    def __contains__(self, subject):
+        return subject in self._subjects
+
+    def __len__(self):
+        return sum(len(bucket) for bucket in self._subjects.values())
+
+    @property
+    def subjects(self):
+        return tuple(self._subjects)
+
+    def subject(self, subject):
+        """SubjectTopics for a subject, or None if the syllabus has no such subject."""
+        return self._subjects.get(subject)
+
+    def next_topic(self, subject, last_id=None, exclude_mains=False):
+        """
+        First topic of `subject` with ID > last_id.
+
+        Args:
+            subject: "Math", "English", ...
+            last_id: last completed topic ID (None = start of syllabus)
+            exclude_mains: skip "mains level" topics (beginners below 80%)
+
+        Returns:
+            TopicRow or None when the subject is exhausted/unknown
+        """
+        bucket = self._subjects.get(subject)
+        if bucket is None:
+            return None
+        pos = bucket.position_after(last_id, exclude_mains)
+        if pos >= len(bucket.rows):
+            return None
+        return bucket.rows[pos]
+
+    def find(self, subject, topic, sub_topic=None):
+        """TopicRow named `topic` (and `sub_topic`, if given) in `subject`, or None."""
+        bucket = self._subjects.get(subject)
+        return bucket.find(topic, sub_topic) if bucket is not None else None
+
+    def remaining(self, subject, last_id=None, exclude_mains=False):
+        bucket = self._subjects.get(subject)
+        if bucket is None:
+            return 0
+        return bucket.remaining(last_id, exclude_mains)
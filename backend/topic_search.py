@@ -0,0 +1,192 @@
+"""
+Topic search over the syllabus: a token inverted index plus a sorted vocabulary
+(the prefix index) over Topic / SubTopic, built once per syllabus load.
+
+Every topic gets a document number; documents are numbered subject by subject in
+ID order (the TopicIndex order), so "sorted by document" is syllabus order and an
+ID range within a subject is one contiguous run of documents.
+
+    query      words, each matching any token it prefixes ("noun" -> "nouns"),
+               all of them required; empty = browse
+    filters    subject, ID range (inclusive), mains-level flag
+    paging     offset / limit over the matches in syllabus order
+
+Query cost follows the matches, not the syllabus: the rarest word's postings are
+the candidates, and other words intersect them (or are probed by bisection when
+their postings are much longer). The last few hundred queries' matches are kept,
+so paging and typeahead repeat no work. Browsing without words uses ID bisection
+and the precomputed core/mains counts, so it never scans.
+"""
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+
+TOKEN = re.compile(r"\w+")
+
+# Probe candidates one by one (bisect) rather than merge postings this many times longer
+PROBE_RATIO = 8
+
+# Distinct queries whose matches are kept per index
+MATCH_CACHE_SIZE = 256
+
+
+def tokenize(text):
+    """Lower-cased word tokens of `text`."""
+    return TOKEN.findall(text.lower())
+
+
+def _contains(posting, doc):
+    i = bisect_left(posting, doc)
+    return i < len(posting) and posting[i] == doc
+
+
+def _prefix_end(prefix):
+    """Smallest string greater than every string starting with `prefix`."""
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+class TopicSearch:
+    """
+    Args:
+        topic_index: TopicIndex (in-memory or mapped) to index
+    """
+
+    def __init__(self, topic_index):
+        self._index = topic_index
+        self._base = {}       # subject -> first document number
+        self._mains = {}      # subject -> positions of mains-level rows
+        mains_docs = []
+        postings = {}
+        doc = 0
+        for subject in topic_index.subjects:
+            self._base[subject] = doc
+            mains = array("i")
+            for pos, row in enumerate(topic_index.subject(subject).rows):
+                if row.mains:
+                    mains.append(pos)
+                    mains_docs.append(doc + pos)
+                for token in set(tokenize(f"{row.topic} {row.sub_topic}")):
+                    postings.setdefault(token, array("i")).append(doc + pos)
+            self._mains[subject] = mains
+            doc += len(topic_index.subject(subject).rows)
+        self._postings = postings
+        self._vocabulary = sorted(postings)
+        self._mains_docs = frozenset(mains_docs)
+        self._match = lru_cache(maxsize=MATCH_CACHE_SIZE)(self._match)
+
+    def __len__(self):
+        return len(self._vocabulary)
+
+    def _expand(self, word):
+        """Postings of every token that `word` prefixes."""
+        start = bisect_left(self._vocabulary, word)
+        end = bisect_left(self._vocabulary, _prefix_end(word), start)
+        return [self._postings[token] for token in self._vocabulary[start:end]]
+
+    def _match(self, words, mains):
+        """Sorted document numbers matching every word and the mains filter (cached: typeahead and paging repeat queries)."""
+        expanded = sorted(((sum(map(len, lists)), lists) for lists in map(self._expand, words)), key=lambda e: e[0])
+        if not expanded or expanded[0][0] == 0:
+            return ()
+        lists = expanded[0][1]
+        docs = lists[0] if len(lists) == 1 else sorted(set().union(*lists))
+        for size, lists in expanded[1:]:
+            if len(docs) * len(lists) * PROBE_RATIO < size:
+                docs = [doc for doc in docs if any(_contains(posting, doc) for posting in lists)]
+            else:
+                docs = sorted(set(docs).intersection(lists[0] if len(lists) == 1 else set().union(*lists)))
+        if mains is not None:
+            docs = sorted(self._mains_docs.intersection(docs) if mains else set(docs).difference(self._mains_docs))
+        return docs
+
+    def _span(self, subject, min_id, max_id):
+        """Positions [lo, hi) of `subject`'s rows with min_id <= ID <= max_id."""
+        ids = self._index.subject(subject).ids
+        lo = 0 if min_id is None else bisect_left(ids, min_id)
+        hi = len(ids) if max_id is None else bisect_right(ids, max_id)
+        return lo, max(lo, hi)
+
+    def search(self, query="", subject=None, min_id=None, max_id=None, mains=None, offset=0, limit=20):
+        """
+        Topics matching `query` and the filters, in syllabus order.
+
+        Args:
+            query: free text ("" = every topic)
+            subject: only this subject (None = all)
+            min_id, max_id: inclusive ID bounds (None = open)
+            mains: True = only mains-level topics, False = none of them, None = both
+            offset, limit: page of the matches
+
+        Returns:
+            (total matches, [(subject, TopicRow)] for the page)
+        """
+        subjects = [subject] if subject is not None else self._index.subjects
+        spans = [(name, *self._span(name, min_id, max_id)) for name in subjects if name in self._index]
+        words = tuple(sorted(set(tokenize(query or ""))))
+        total, page = 0, []
+        for name, lo, hi in spans:
+            bucket = self._index.subject(name)
+            positions = self._positions(name, lo, hi, mains) if not words else self._matched(name, lo, hi, mains, words)
+            count = len(positions)
+            skip = max(0, offset - total)
+            if skip < count and len(page) < limit:
+                page.extend((name, bucket.rows[pos]) for pos in positions[skip:skip + limit - len(page)])
+            total += count
+        return total, page
+
+    def _positions(self, subject, lo, hi, mains):
+        """Sliceable positions in [lo, hi) passing the mains filter, without a scan."""
+        if mains is None:
+            return range(lo, hi)
+        if mains:
+            flagged = self._mains[subject]
+            return flagged[bisect_left(flagged, lo):bisect_left(flagged, hi)]
+        return _CorePositions(self._index.subject(subject), lo, hi)
+
+    def _matched(self, subject, lo, hi, mains, words):
+        """Positions in [lo, hi) of documents matching `words` and the mains filter."""
+        base = self._base[subject]
+        docs = self._match(words, mains)
+        return _Shifted(docs, bisect_left(docs, base + lo), bisect_left(docs, base + hi), base)
+
+
+class _Shifted:
+    """docs[start:stop] as positions within a subject (doc - base), sliced lazily."""
+
+    def __init__(self, docs, start, stop, base):
+        self._docs = docs
+        self._start = start
+        self._stop = stop
+        self._base = base
+
+    def __len__(self):
+        return self._stop - self._start
+
+    def __getitem__(self, page):
+        start, stop, _ = page.indices(len(self))
+        return [doc - self._base for doc in self._docs[self._start + start:self._start + stop]]
+
+
+class _CorePositions:
+    """Positions of the non-mains rows in [lo, hi), sliceable without a scan (via core_before)."""
+
+    def __init__(self, bucket, lo, hi):
+        self._bucket = bucket
+        self._first = bucket.core_before[lo]
+        self._count = bucket.core_before[hi] - self._first
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, page):
+        start, stop, _ = page.indices(self._count)
+        core_before = self._bucket.core_before
+        # The k-th core row is the position just before core_before first exceeds first + k
+        return [bisect_left(core_before, self._first + k + 1) - 1 for k in range(start, stop)]
+
+
+def row_to_wire(subject, row):
+    """A search hit as the API returns it."""
+    return {"subject": subject, "id": row.id, "topic": row.topic, "subTopic": row.sub_topic, "mains": bool(row.mains)}
+
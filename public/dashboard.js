@@ -81,9 +81,8 @@ async function saveProfile() {
 // --- AI ENGINE (Python Bridge) ---
 // --- AI ENGINE (Python Bridge) ---
 // --- AI ENGINE (Python Bridge) ---
-async function fetchTaskFromPython(subjectName, userLevel) {
-    console.log("Asking Python Brain for task...");
-
+// Shared request fields for /get-daily-task and /get-daily-plan
+function buildBrainProfile() {
     // Extract Metadata from Global State (loaded from Profile)
     let examStage = 'Prelims';
     let examDate = null;
@@ -106,36 +105,50 @@ async function fetchTaskFromPython(subjectName, userLevel) {
         }
     }
 
-    // URL SWITCHING (DEV vs PROD)
+    return { examStage, examDate, userType, syllabusCompleted, dailyHours };
+}
+
+// URL SWITCHING (DEV vs PROD)
+function brainUrl(endpoint) {
     const IS_LOCALHOST = window.location.hostname === '127.0.0.1' || window.location.hostname === 'localhost';
 
     // Live Backend URL
-    const PROD_URL = "https://stricto-backend.onrender.com/get-daily-task";
-    const DEV_URL = "http://127.0.0.1:5000/get-daily-task";
+    const PROD_URL = "https://stricto-backend.onrender.com";
+    const DEV_URL = "http://127.0.0.1:5000";
 
-    const TARGET_URL = IS_LOCALHOST ? DEV_URL : PROD_URL;
+    return (IS_LOCALHOST ? DEV_URL : PROD_URL) + endpoint;
+}
 
+async function callBrain(endpoint, payload) {
     try {
-        const response = await fetch(TARGET_URL, {
+        // Same request as earlier today -> revalidate with the server's ETag (304 = reuse the saved answer)
+        const body = JSON.stringify(payload);
+        const cacheKey = `brainCache:${endpoint}:${body}`;
+        const saved = JSON.parse(sessionStorage.getItem(cacheKey) || 'null');
+        const headers = { 'Content-Type': 'application/json' };
+        if (saved) headers['If-None-Match'] = saved.etag;
+
+        const response = await fetch(brainUrl(endpoint), {
             method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({
-                subject: subjectName,
-                level: userLevel,
-                examStage: examStage,
-                examDate: examDate,
-                userType: userType,
-                syllabusCompleted: syllabusCompleted,
-                dailyHours: dailyHours
-            })
+            headers,
+            body
         });
 
-        if (!response.ok) {
+        let data;
+        if (response.status === 304 && saved) {
+            data = saved.data;
+        } else if (!response.ok) {
             throw new Error(`HTTP Error: ${response.status}`);
+        } else {
+            data = await response.json();
+            const etag = response.headers.get('ETag');
+            if (etag && !data.error) {
+                try {
+                    sessionStorage.setItem(cacheKey, JSON.stringify({ etag, data }));
+                } catch (e) { /* storage full: skip revalidation */ }
+            }
         }
 
-        const data = await response.json();
-
         if (data.error) {
             console.error("Brain Error:", data.error);
             return null;
@@ -154,6 +167,24 @@ async function fetchTaskFromPython(subjectName, userLevel) {
     }
 }
 
+async function fetchTaskFromPython(subjectName, userLevel) {
+    console.log("Asking Python Brain for task...");
+    return callBrain('/get-daily-task', {
+        subject: subjectName,
+        level: userLevel,
+        ...buildBrainProfile()
+    });
+}
+
+// ONE round trip for all subjects: levels = { MATH: 'weak', GA: 'average', ... } (order = priority)
+async function fetchPlanFromPython(levels) {
+    console.log("Asking Python Brain for daily plan...");
+    return callBrain('/get-daily-plan', {
+        levels: levels,
+        ...buildBrainProfile()
+    });
+}
+
 // --- CORE SCHEDULER LOGIC ---
 // --- AI PROTOCOL LOGIC ---
 async function initiateDailyProtocol(mood, hoursInput, specialReq) {
@@ -203,54 +234,53 @@ async function initiateDailyProtocol(mood, hoursInput, specialReq) {
 
     console.log(`\u{1F916} Contacting AI Brain for ${subjects.length} subjects...`);
 
-    // 7. PARALLEL TASK GENERATION
-    const promises = subjects.map(async (sub) => {
+    // 7. SINGLE-CALL PLAN GENERATION (all subjects, cross-subject task cap)
+    const weakList = (STATE.dna.subjects?.weak || []).map(s => s.toUpperCase());
+    const strongList = (STATE.dna.subjects?.strong || []).map(s => s.toUpperCase());
+
+    const levels = {};
+    subjects.forEach(sub => {
         // Proficiency Check
         let proficiency = 'average';
-        const weakList = (STATE.dna.subjects?.weak || []).map(s => s.toUpperCase());
-        const strongList = (STATE.dna.subjects?.strong || []).map(s => s.toUpperCase());
-
         if (weakList.some(w => w.includes(sub) || (sub === 'GA' && w.includes('GK')))) proficiency = 'weak';
         if (strongList.some(s => s.includes(sub) || (sub === 'GA' && s.includes('GK')))) proficiency = 'strong';
+        levels[sub] = proficiency;
+    });
 
-        // FETCH FROM PYTHON
-        const result = await fetchTaskFromPython(sub, proficiency);
-
-        if (result && !result.error && result.tasks) {
-            result.tasks.forEach(t => {
-                // DIVERSITY CHECK: Skip if topic was recently done
-                const isRecent = recentTopics.some(topic => topic.includes(t.task.toLowerCase().substring(0, 20)));
-                if (!isRecent || daysToExam < 7) { // Allow repetition in crisis mode
-                    // DURATION FIX: Backend sends "X.XX Hrs", convert to minutes
-                    let durationMinutes = 45; // Default
-                    if (t.duration && typeof t.duration === 'string') {
-                        const match = t.duration.match(/([0-9.]+)/); // Extract number
-                        if (match) {
-                            const hours = parseFloat(match[1]);
-                            durationMinutes = Math.round(hours * 60); // Convert to minutes
-                            durationMinutes = Math.round(durationMinutes / 5) * 5; // Round to nearest 5
-                        }
+    const result = await fetchPlanFromPython(levels);
+
+    if (result && !result.error && result.tasks) {
+        result.tasks.forEach(t => {
+            const sub = t.subject.toUpperCase();
+            // DIVERSITY CHECK: Skip if topic was recently done
+            const isRecent = recentTopics.some(topic => topic.includes(t.task.toLowerCase().substring(0, 20)));
+            if (!isRecent || daysToExam < 7) { // Allow repetition in crisis mode
+                // DURATION: integer minutes from the backend (older servers only send "X.XX Hrs")
+                let durationMinutes = 45; // Default
+                if (Number.isInteger(t.minutes)) {
+                    durationMinutes = Math.round(t.minutes / 5) * 5; // Round to nearest 5
+                } else if (t.duration && typeof t.duration === 'string') {
+                    const match = t.duration.match(/([0-9.]+)/); // Extract number
+                    if (match) {
+                        const hours = parseFloat(match[1]);
+                        durationMinutes = Math.round(hours * 60); // Convert to minutes
+                        durationMinutes = Math.round(durationMinutes / 5) * 5; // Round to nearest 5
                     }
-
-                    generatedTasks.push(createTask(
-                        t.task,
-                        sub,
-                        durationMinutes,
-                        t.priority || 'normal',
-                        { type: t.type, strategy: t.strategy }
-                    ));
                 }
-            });
-        }
-    });
 
-    await Promise.all(promises);
+                generatedTasks.push(createTask(
+                    t.task,
+                    sub,
+                    durationMinutes,
+                    t.priority || 'normal',
+                    { type: t.type, strategy: t.strategy }
+                ));
+            }
+        });
+    }
 
     // 8. OPTIMAL TASK ORDERING FOR MAXIMUM LEARNING EFFICIENCY
     // Psychology: Fresh mind → Weak subjects, Tired mind → Strong subjects
-    const weakList = (STATE.dna.subjects?.weak || []).map(s => s.toUpperCase());
-    const strongList = (STATE.dna.subjects?.strong || []).map(s => s.toUpperCase());
-
     generatedTasks.sort((a, b) => {
         // Priority 1: Daily Habits FIRST (Editorial, Calculation) - Warm-up
         const aIsHabit = a.title.includes('Editorial') || a.title.includes('Calculation Drill');